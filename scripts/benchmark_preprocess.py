@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark diff section processing across worker counts.
+
+Generates a synthetic diff of the requested size and times process_sections_parallel with 1 to N
+workers, reporting the speedup over a single worker.
+
+Usage:
+    python scripts/benchmark_preprocess.py --size-mb 100 --max-workers 8
+"""
+
+import argparse
+import os
+import random
+import time
+
+from gac.preprocess import process_sections_parallel, split_diff_into_sections
+
+
+def generate_diff(size_bytes: int, seed: int = 0) -> str:
+    """Build a synthetic diff of roughly size_bytes, mixing source, minified and binary sections."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    index = 0
+    while total < size_bytes:
+        kind = rng.random()
+        if kind < 0.05:
+            path = f"static/bundle{index}.min.js"
+            body = "+" + "var a=1;function b(){return a}" * rng.randint(50, 400) + "\n"
+        elif kind < 0.08:
+            path = f"assets/image{index}.png"
+            body = f"Binary files a/{path} and b/{path} differ\n"
+        else:
+            path = f"src/pkg{index % 50}/module{index}.py"
+            lines = [
+                f"+    value_{n} = compute(value_{n - 1}, {rng.randint(0, 999)})\n" for n in range(rng.randint(20, 200))
+            ]
+            body = f"@@ -1,{len(lines)} +1,{len(lines)} @@ def handler_{index}():\n" + "".join(lines)
+        section = f"diff --git a/{path} b/{path}\nindex 1234567..89abcde 100644\n--- a/{path}\n+++ b/{path}\n{body}"
+        parts.append(section)
+        total += len(section)
+        index += 1
+    return "".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=100, help="Size of the synthetic diff in MB")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 4, help="Largest worker count to try")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count (best time is reported)")
+    args = parser.parse_args()
+
+    diff = generate_diff(int(args.size_mb * 1024 * 1024))
+    sections = split_diff_into_sections(diff)
+    print(f"Synthetic diff: {len(diff) / 1024 / 1024:.1f} MB, {len(sections)} sections, {os.cpu_count()} CPUs")
+
+    worker_counts = sorted({1, *(2**n for n in range(1, args.max_workers.bit_length())), args.max_workers})
+    baseline = None
+    expected = None
+    for workers in worker_counts:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = process_sections_parallel(sections, max_workers=workers)
+            timings.append(time.perf_counter() - start)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise SystemExit(f"Results with {workers} workers differ from the single-worker run")
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{workers:>3} workers: {best:7.2f}s  speedup {baseline / best:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
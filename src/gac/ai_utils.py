@@ -4,33 +4,58 @@ This module provides utility functions that support the AI provider implementati
 """
 
 import logging
+import math
+import os
+import re
 import time
 from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import tiktoken
 from halo import Halo
 
-from gac.constants import Utility
+from gac.constants import Tokenizers, Utility
 from gac.errors import AIError
 
 logger = logging.getLogger(__name__)
 
 
 def count_tokens(content: str | list[dict[str, str]] | dict[str, Any], model: str) -> int:
-    """Count tokens in content using the model's tokenizer."""
+    """Count tokens in content using the model's tokenizer.
+
+    A local tokenizer file for the model's family is used when available; otherwise the family's
+    tiktoken base encoding is scaled by its calibration ratio.
+    """
     text = extract_text_content(content)
     if not text:
         return 0
 
     try:
+        family = resolve_tokenizer_family(model)
+        local_tokenizer = load_local_tokenizer(family, get_tokenizer_dir())
+        if local_tokenizer is not None:
+            return len(local_tokenizer.encode(text, add_special_tokens=False).ids)
+
         encoding = get_encoding(model)
-        return len(encoding.encode(text))
+        token_count = len(encoding.encode(text, disallowed_special=()))
+        _, ratio = Tokenizers.FAMILIES.get(family, Tokenizers.FAMILIES[Tokenizers.DEFAULT_FAMILY])
+        return token_count if ratio == 1.0 else math.ceil(token_count * ratio)
     except Exception as e:
         logger.error(f"Error counting tokens: {e}")
         return len(text) // 4
 
 
+def warm_tokenizer(model: str) -> None:
+    """Load the model's tokenizer ahead of its first use, so later token counts don't wait on it."""
+    try:
+        family = resolve_tokenizer_family(model)
+        if load_local_tokenizer(family, get_tokenizer_dir()) is None:
+            get_encoding(model)
+    except Exception as e:
+        logger.debug(f"Could not preload tokenizer for {model}: {e}")
+
+
 def extract_text_content(content: str | list[dict[str, str]] | dict[str, Any]) -> str:
     """Extract text content from various input formats."""
     if isinstance(content, str):
@@ -42,14 +67,82 @@ def extract_text_content(content: str | list[dict[str, str]] | dict[str, Any]) -
     return ""
 
 
-@lru_cache(maxsize=1)
+@lru_cache(maxsize=128)
+def resolve_tokenizer_family(model: str) -> str:
+    """Resolve a provider:model string to its tokenizer family.
+
+    Args:
+        model: Model identifier in provider:model format (a bare model name is also accepted)
+
+    Returns:
+        Tokenizer family name, a key of Tokenizers.FAMILIES
+    """
+    provider, _, model_name = model.partition(":") if ":" in model else ("", "", model)
+    model_name = model_name.lower()
+
+    for pattern, family in Tokenizers.MODEL_PATTERNS:
+        if re.search(pattern, model_name):
+            return family
+
+    return Tokenizers.PROVIDER_FAMILIES.get(provider.lower(), Tokenizers.DEFAULT_FAMILY)
+
+
+@lru_cache(maxsize=32)
 def get_encoding(model: str) -> tiktoken.Encoding:
-    """Get the appropriate encoding for a given model."""
+    """Get the tiktoken base encoding for a given model."""
     model_name = model.split(":")[-1] if ":" in model else model
+    family = resolve_tokenizer_family(model)
+
+    if family.startswith("openai") or family == Tokenizers.DEFAULT_FAMILY:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            pass
+
+    encoding_name, _ = Tokenizers.FAMILIES.get(family, (Utility.DEFAULT_ENCODING, 1.0))
+    return tiktoken.get_encoding(encoding_name)
+
+
+def get_tokenizer_dir() -> Path:
+    """Get the directory local tokenizer files are read from, GAC_TOKENIZER_DIR or the default."""
+    return Path(os.getenv("GAC_TOKENIZER_DIR", Tokenizers.DEFAULT_DIR)).expanduser()
+
+
+@lru_cache(maxsize=16)
+def load_local_tokenizer(family: str, tokenizer_dir: Path) -> Any | None:
+    """Lazily load a local tokenizer file for a tokenizer family.
+
+    Files are looked up as `<family>.json` in the tokenizer directory and require the optional
+    `tokenizers` package. Only openly licensed families are considered.
+
+    Args:
+        family: Tokenizer family name
+        tokenizer_dir: Directory holding tokenizer files, part of the cache key so that changing
+            it doesn't return a tokenizer loaded from the previous one
+
+    Returns:
+        A loaded tokenizer, or None if no usable local tokenizer exists
+    """
+    if family not in Tokenizers.LOCAL_FAMILIES:
+        return None
+
+    tokenizer_path = tokenizer_dir / f"{family}.json"
+    if not tokenizer_path.is_file():
+        return None
+
     try:
-        return tiktoken.encoding_for_model(model_name)
-    except KeyError:
-        return tiktoken.get_encoding(Utility.DEFAULT_ENCODING)
+        from tokenizers import Tokenizer
+    except ImportError:
+        logger.debug(f"Found {tokenizer_path} but the 'tokenizers' package is not installed")
+        return None
+
+    try:
+        tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        logger.debug(f"Loaded local tokenizer for {family} from {tokenizer_path}")
+        return tokenizer
+    except Exception as e:
+        logger.warning(f"Failed to load local tokenizer {tokenizer_path}: {e}")
+        return None
 
 
 def _classify_error(error_str: str) -> str:
@@ -19,6 +19,7 @@ from gac.errors import handle_error
 from gac.init_cli import init as init_cli
 from gac.language_cli import language as language_cli
 from gac.main import main
+from gac.scan_cli import scan as scan_cli
 from gac.utils import setup_logging
 
 config = load_config()
@@ -64,6 +65,11 @@ logger = logging.getLogger(__name__)
 # Advanced options
 @click.option("--no-verify", is_flag=True, help="Skip pre-commit and lefthook hooks when committing")
 @click.option("--skip-secret-scan", is_flag=True, help="Skip security scan for secrets in staged changes")
+@click.option(
+    "--speculative",
+    is_flag=True,
+    help="Generate the commit message while hooks run, regenerating it if they change the staged files",
+)
 # Other options
 @click.option("--version", is_flag=True, help="Show the version of the Git Auto Commit (gac) tool")
 @click.pass_context
@@ -85,6 +91,7 @@ def cli(
     verbose: bool = False,
     no_verify: bool = False,
     skip_secret_scan: bool = False,
+    speculative: bool = False,
 ) -> None:
     """Git Auto Commit - Generate commit messages with AI."""
     if ctx.invoked_subcommand is None:
@@ -122,6 +129,7 @@ def cli(
                 no_verify=no_verify,
                 skip_secret_scan=skip_secret_scan or bool(config.get("skip_secret_scan", False)),
                 language=resolved_language,
+                speculate=speculative or bool(config.get("speculative_generation", False)),
             )
         except Exception as e:
             handle_error(e, exit_program=True)
@@ -146,6 +154,7 @@ def cli(
             "verbose": verbose,
             "no_verify": no_verify,
             "skip_secret_scan": skip_secret_scan,
+            "speculative": speculative,
         }
 
 
@@ -153,6 +162,7 @@ cli.add_command(config_cli)
 cli.add_command(init_cli)
 cli.add_command(language_cli)
 cli.add_command(diff_cli)
+cli.add_command(scan_cli)
 
 if __name__ == "__main__":
     cli()
@@ -37,8 +37,23 @@ def load_config() -> dict[str, str | int | float | bool | None]:
         in ("true", "1", "yes", "on"),
         "skip_secret_scan": os.getenv("GAC_SKIP_SECRET_SCAN", str(EnvDefaults.SKIP_SECRET_SCAN)).lower()
         in ("true", "1", "yes", "on"),
+        "speculative_generation": os.getenv("GAC_SPECULATIVE_GENERATION", "false").lower()
+        in ("true", "1", "yes", "on"),
+        "secret_scan_entropy": os.getenv("GAC_SECRET_SCAN_ENTROPY", "false").lower() in ("true", "1", "yes", "on"),
+        "entropy_base64_threshold": float(os.environ["GAC_ENTROPY_BASE64_THRESHOLD"])
+        if os.getenv("GAC_ENTROPY_BASE64_THRESHOLD")
+        else None,
+        "entropy_hex_threshold": float(os.environ["GAC_ENTROPY_HEX_THRESHOLD"])
+        if os.getenv("GAC_ENTROPY_HEX_THRESHOLD")
+        else None,
         "verbose": os.getenv("GAC_VERBOSE", str(EnvDefaults.VERBOSE)).lower() in ("true", "1", "yes", "on"),
         "system_prompt_path": os.getenv("GAC_SYSTEM_PROMPT_PATH"),
+        "model_catalog_path": os.getenv("GAC_MODEL_CATALOG_PATH"),
+        "diff_token_limit": int(os.environ["GAC_DIFF_TOKEN_LIMIT"]) if os.getenv("GAC_DIFF_TOKEN_LIMIT") else None,
+        "diff_format": os.getenv("GAC_DIFF_FORMAT"),
+        "diff_context_lines": int(os.environ["GAC_DIFF_CONTEXT_LINES"])
+        if os.getenv("GAC_DIFF_CONTEXT_LINES")
+        else None,
         "language": os.getenv("GAC_LANGUAGE"),
         "translate_prefixes": os.getenv("GAC_TRANSLATE_PREFIXES", "false").lower() in ("true", "1", "yes", "on"),
     }
@@ -0,0 +1,225 @@
+"""Key-path diffs of structured configuration files.
+
+Line diffs of large JSON, YAML and TOML files are noisy, and reordered keys show up as many
+removed and re-added lines. This module parses both versions of a configuration file and
+describes the change by key path instead, e.g. ``spec.replicas: 3 → 5`` or
+``+dependencies.httpx: "^0.28"``. Files that can't be read or parsed keep their line diff.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Any
+
+from gac.constants import ConfigDiff
+from gac.diff_sections import changed_lines, section_blob_ids, section_filename, split_hunks
+from gac.git import read_blobs
+from gac.scan_cache import ScanCache
+
+logger = logging.getLogger(__name__)
+
+_PLAIN_KEY_RE = re.compile(r"^[\w-]+$")
+
+
+class ConfigParseError(Exception):
+    """A configuration file could not be parsed."""
+
+
+def config_format(filename: str) -> str | None:
+    """Get the configuration format of a file path, or None if it is not a supported format."""
+    return ConfigDiff.FORMATS.get(os.path.splitext(filename)[1].lower())
+
+
+def parse_config(content: str, config_type: str) -> Any:
+    """Parse a configuration file.
+
+    Args:
+        content: File content
+        config_type: Format, as given by config_format
+
+    Returns:
+        The parsed document. YAML files with several documents give a list of documents
+
+    Raises:
+        ConfigParseError: If the content is invalid, or the parser for its format (PyYAML, or tomli
+            before Python 3.11) is not installed
+    """
+    if config_type == "json":
+        try:
+            return json.loads(content)
+        except ValueError as e:
+            raise ConfigParseError(str(e)) from e
+
+    if config_type == "toml":
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            try:
+                import tomli as tomllib
+            except ImportError as e:
+                raise ConfigParseError("the 'tomli' package is required to parse TOML on Python 3.10") from e
+        try:
+            return tomllib.loads(content)
+        except ValueError as e:
+            raise ConfigParseError(str(e)) from e
+
+    try:
+        import yaml
+    except ImportError as e:
+        raise ConfigParseError("the 'PyYAML' package is not installed (install gac[yaml])") from e
+    try:
+        documents = list(yaml.safe_load_all(content))
+    except yaml.YAMLError as e:
+        raise ConfigParseError(str(e)) from e
+    return documents[0] if len(documents) == 1 else documents
+
+
+def _join_path(path: str, key: object) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    name = str(key)
+    if not _PLAIN_KEY_RE.match(name):
+        name = json.dumps(name)
+    return f"{path}.{name}" if path else name
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, dict):
+        return f"{{{len(value)} keys}}" if value else "{}"
+    if isinstance(value, list) and any(isinstance(item, dict | list) for item in value):
+        return f"[{len(value)} items]"
+    text = json.dumps(value, default=str, ensure_ascii=False)
+    if len(text) > ConfigDiff.MAX_VALUE_LENGTH:
+        text = text[: ConfigDiff.MAX_VALUE_LENGTH - 1] + "…"
+    return text
+
+
+def _is_scalar_list(value: Any) -> bool:
+    return isinstance(value, list) and not any(isinstance(item, dict | list) for item in value)
+
+
+def _hashable(value: Any) -> object:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def diff_key_paths(old: Any, new: Any, path: str = "") -> list[str]:
+    """Describe the differences between two parsed documents by key path.
+
+    Mappings are compared key by key, ignoring order. Lists of scalars are compared as sets of
+    items, other lists item by item when their length is unchanged.
+
+    Args:
+        old: Old document
+        new: New document
+        path: Key path of the documents within their file
+
+    Returns:
+        Changes such as 'spec.replicas: 3 → 5', '+dependencies.httpx: "^0.28"' or '-scripts.lint'
+    """
+    # == alone treats 1, 1.0 and True as equal, so equal values are also compared as serialized
+    if old == new and _hashable(old) == _hashable(new):
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in old:
+            if key not in new:
+                changes.append(f"-{_join_path(path, str(key))}")
+        for key, value in new.items():
+            child = _join_path(path, str(key))
+            if key not in old:
+                changes.append(f"+{child}: {_format_value(value)}")
+            else:
+                changes.extend(diff_key_paths(old[key], value, child))
+        return changes
+
+    if _is_scalar_list(old) and _is_scalar_list(new) and (old or new):
+        old_items = {_hashable(item): item for item in old}
+        new_items = {_hashable(item): item for item in new}
+        if old_items.keys() == new_items.keys():
+            return [f"{path or '(root)'}: reordered"]
+        removed = [f"-{path}[]: {_format_value(item)}" for key, item in old_items.items() if key not in new_items]
+        added = [f"+{path}[]: {_format_value(item)}" for key, item in new_items.items() if key not in old_items]
+        return removed + added
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        return [
+            change
+            for index in range(len(old))
+            for change in diff_key_paths(old[index], new[index], _join_path(path, index))
+        ]
+
+    return [f"{path or '(root)'}: {_format_value(old)} → {_format_value(new)}"]
+
+
+def _cache_key(old_blob: bytes | None, new_blob: bytes | None, config_type: str) -> str:
+    """Key a blob pair's changes in the scan cache by the blobs' content and the summary version."""
+    digests = [hashlib.sha256(blob).hexdigest() if blob is not None else "" for blob in (old_blob, new_blob)]
+    return "\0".join((ConfigDiff.CACHE_KEY_PREFIX, str(ConfigDiff.SUMMARY_VERSION), config_type, *digests))
+
+
+def _blob_pair_changes(old_id: str | None, new_id: str | None, config_type: str) -> tuple[str, ...] | None:
+    """Key-path changes between two blobs, or None if either can't be read or parsed.
+
+    Changes are stored in the scan cache, so a blob pair seen by an earlier run (e.g. after a failed
+    hook or a declined message) is not parsed again.
+    """
+    blob_ids = [object_id for object_id in (old_id, new_id) if object_id]
+    blobs = read_blobs(blob_ids)
+    if any(object_id not in blobs for object_id in blob_ids):
+        return None
+    old_blob = blobs[old_id] if old_id else None
+    new_blob = blobs[new_id] if new_id else None
+    key = _cache_key(old_blob, new_blob, config_type)
+    with ScanCache() as cache:
+        cached = cache.get_many([key])
+        if key in cached:
+            return tuple(json.loads(cached[key]))
+        try:
+            old = parse_config(old_blob.decode("utf-8"), config_type) if old_blob is not None else {}
+            new = parse_config(new_blob.decode("utf-8"), config_type) if new_blob is not None else {}
+        except (ConfigParseError, UnicodeDecodeError) as e:
+            logger.debug(f"Keeping line diff for unparseable config: {e}")
+            return None
+        changes = tuple(diff_key_paths(old, new))
+        cache.put_many({key: json.dumps(changes)})
+    return changes
+
+
+def summarize_config_section(section: str) -> str | None:
+    """Replace a large configuration file diff with its key-path changes.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        The section's file header followed by the key-path changes, or None if the file is not a
+        supported configuration format, changes fewer than ConfigDiff.MIN_CHANGED_LINES lines, can't be
+        parsed, or its summary would not be shorter than the line diff
+    """
+    filename = section_filename(section)
+    config_type = config_format(filename) if filename else None
+    if config_type is None:
+        return None
+
+    header, hunks = split_hunks(section)
+    line_count = sum(len(changed_lines(hunk)) for hunk in hunks)
+    if line_count < ConfigDiff.MIN_CHANGED_LINES:
+        return None
+
+    old_id, new_id = section_blob_ids(section)
+    if old_id is None and new_id is None:
+        return None
+    changes = _blob_pair_changes(old_id, new_id, config_type)
+    if changes is None:
+        return None
+
+    listed = list(changes[: ConfigDiff.MAX_CHANGES]) or ["no semantic changes (reordering or formatting only)"]
+    if len(changes) > ConfigDiff.MAX_CHANGES:
+        listed.append(f"... and {len(changes) - ConfigDiff.MAX_CHANGES} more changes")
+    items = "\n".join(f"  {change}" for change in listed)
+    summary = f"{header.rstrip()}\n[Config change by key path, {line_count} changed lines summarized:\n{items}]\n"
+    return summary if len(summary) < len(section) else None
@@ -38,11 +38,362 @@ class Utility:
     """General utility constants."""
 
     DEFAULT_ENCODING: str = "cl100k_base"  # llm encoding
-    DEFAULT_DIFF_TOKEN_LIMIT: int = 15000  # Maximum tokens for diff processing
+    DEFAULT_DIFF_TOKEN_LIMIT: int = 15000  # Maximum tokens for diff processing when the model is not cataloged
+    MIN_DIFF_TOKEN_LIMIT: int = 1000  # Smallest diff budget derived from a model's context window
     MAX_WORKERS: int = os.cpu_count() or 4  # Maximum number of parallel workers
     MAX_DISPLAYED_SECRET_LENGTH: int = 50  # Maximum length for displaying secrets
 
 
+class Entropy:
+    """Optional high-entropy string detection in the secret scan."""
+
+    MIN_LENGTH: int = 20  # Shorter strings are too short for entropy to tell random from not
+    BASE64_THRESHOLD: float = 4.5  # Bits per character; the maximum for base64 is 6
+    HEX_THRESHOLD: float = 3.0  # Bits per character; the maximum for hex is 4
+    MIN_VECTORIZED_BATCH: int = 64  # Smaller batches are scored in pure Python, NumPy setup costs more
+
+
+class SecretsBaseline:
+    """Accepted secret scan findings, committed to the repository."""
+
+    FILENAME: str = ".gac-secrets-baseline"  # Looked up at the repository root
+    VERSION: int = 1  # Format version written to the file
+
+
+class HistoryScan:
+    """Secret scanning of commit ranges with `gac scan --range`."""
+
+    CHUNK_BYTES: int = 64 * 1024 * 1024  # Patch text collected from the log before each scan
+    SARIF_SCHEMA: str = "https://json.schemastore.org/sarif-2.1.0.json"
+    SARIF_FINGERPRINT_KEY: str = "gacSecretFingerprint/v1"
+    INFORMATION_URI: str = "https://github.com/cellwebb/gac"
+    REPORT_MATCH_PREFIX_LENGTH: int = 6  # Characters of each match kept in JSON reports, the rest is redacted
+
+
+class SecretRulePacks:
+    """External secret rules in gitleaks' TOML format, listed in GAC_SECRET_RULE_PACKS."""
+
+    LOADER_VERSION: int = 1  # Bump when loading changes, so rule packs cached by older versions are rebuilt
+    CACHE_KEY_PREFIX: str = "rule-pack"  # Rule packs share the secret scan cache database
+    # Go regex character classes with no Python equivalent, as their bracket expression contents
+    POSIX_CLASSES: dict[str, str] = {
+        "[:alnum:]": "A-Za-z0-9",
+        "[:alpha:]": "A-Za-z",
+        "[:digit:]": "0-9",
+        "[:lower:]": "a-z",
+        "[:upper:]": "A-Z",
+        "[:space:]": r"\s",
+        "[:xdigit:]": "0-9A-Fa-f",
+        "[:word:]": r"\w",
+    }
+
+
+class SecretScanCache:
+    """On-disk cache of secret scan results per staged blob pair."""
+
+    PATH: str = "~/.cache/gac/secret-scan.sqlite3"  # Overridable with GAC_SECRET_SCAN_CACHE
+    MAX_ENTRIES: int = 50000  # Least recently used results beyond this are evicted
+    TIMEOUT_SECONDS: float = 5.0  # How long to wait on another process holding the database lock
+    QUERY_BATCH_SIZE: int = 500  # Keys looked up per query, under SQLite's bound parameter limit
+    # Bumped when stored values change shape. Older databases are cleared on open, which also
+    # removes the plaintext matches and source lines that format 1 stored
+    SCHEMA_VERSION: int = 2
+    DIRECTORY_MODE: int = 0o700
+    FILE_MODE: int = 0o600
+
+
+class Parallelism:
+    """Strategy selection for parallel diff section processing."""
+
+    PROCESS_THRESHOLD_BYTES: int = 8 * 1024 * 1024  # Diffs smaller than this are processed inline
+    BATCH_BYTES: int = 4 * 1024 * 1024  # Largest batch of sections sent to a worker process at once
+
+
+class Pipeline:
+    """Concurrent execution of the commit workflow's stages."""
+
+    MAX_WORKERS: int = 8  # Threads running stages at once; stages mostly wait on subprocesses and I/O
+
+
+class Tokenizers:
+    """Tokenizer registry used for token budgeting.
+
+    Models are resolved to a tokenizer family. Each family counts tokens with a tiktoken base encoding
+    scaled by a calibration ratio, unless a local tokenizer file for the family is available.
+    """
+
+    DEFAULT_FAMILY: str = "default"
+    DEFAULT_DIR: str = "~/.cache/gac/tokenizers"  # Overridable with GAC_TOKENIZER_DIR
+
+    # Regex patterns matched against the model name (provider-agnostic, since aggregators such as
+    # openrouter, groq and together host many families). Checked in order, first match wins.
+    MODEL_PATTERNS: list[tuple[str, str]] = [
+        (r"claude", "claude"),
+        (r"gemma", "gemma"),
+        (r"gemini", "gemini"),
+        (r"glm", "glm"),
+        (r"llama-?2", "llama2"),
+        (r"llama", "llama"),
+        (r"qwen|qwq", "qwen"),
+        (r"mistral|mixtral|codestral|devstral|magistral|ministral|pixtral", "mistral"),
+        (r"deepseek", "deepseek"),
+        (r"kimi|moonshot", "kimi"),
+        (r"minimax|abab", "minimax"),
+        (r"gpt-4o|gpt-4\.1|gpt-5|gpt-oss|chatgpt|(?:^|/)o\d", "openai-o200k"),
+        (r"gpt-3\.5|gpt-4", "openai-cl100k"),
+    ]
+
+    # Provider defaults used when the model name does not identify a family
+    PROVIDER_FAMILIES: dict[str, str] = {
+        "anthropic": "claude",
+        "custom-anthropic": "claude",
+        "deepseek": "deepseek",
+        "gemini": "gemini",
+        "minimax": "minimax",
+        "mistral": "mistral",
+        "openai": "openai-o200k",
+        "zai": "glm",
+        "zai-coding": "glm",
+    }
+
+    # Family -> (tiktoken base encoding, calibration ratio relative to that encoding)
+    FAMILIES: dict[str, tuple[str, float]] = {
+        "default": ("cl100k_base", 1.0),
+        "openai-o200k": ("o200k_base", 1.0),
+        "openai-cl100k": ("cl100k_base", 1.0),
+        "claude": ("cl100k_base", 1.18),
+        "gemini": ("o200k_base", 1.05),
+        "gemma": ("o200k_base", 1.05),
+        "glm": ("cl100k_base", 1.0),
+        "llama": ("cl100k_base", 0.97),
+        "llama2": ("cl100k_base", 1.3),
+        "qwen": ("cl100k_base", 0.98),
+        "mistral": ("cl100k_base", 1.1),
+        "deepseek": ("cl100k_base", 1.05),
+        "kimi": ("cl100k_base", 1.0),
+        "minimax": ("cl100k_base", 1.05),
+    }
+
+    # Families whose tokenizers are openly licensed; a `<family>.json` file (Hugging Face tokenizers
+    # format) placed in the tokenizer directory is used instead of the ratio estimate. Gemini's
+    # tokenizer is not published, only that of the open Gemma models, so gemini keeps the estimate.
+    LOCAL_FAMILIES: set[str] = {"deepseek", "gemma", "glm", "kimi", "llama", "llama2", "mistral", "qwen"}
+
+
+class PromptBudget:
+    """Token budgeting for prompt components."""
+
+    DEFAULT_TOKEN_LIMIT: int = 20000  # Total prompt budget when the model is not cataloged
+    MIN_HINT_TOKENS: int = 500  # Hint tokens granted before other components
+    MIN_DIFF_STAT_TOKENS: int = 300  # Diff stat tokens granted before other components
+    MIN_STATUS_TOKENS: int = 200  # Git status tokens granted before other components
+    DIFF_STAT_SHARE: float = 0.1  # Share of the budget the diff stat may take ahead of the diff
+    STATUS_SHARE: float = 0.05  # Share of the budget the git status may take ahead of the diff
+
+
+class Rollup:
+    """Directory rollups for listings of many changed files."""
+
+    MAX_LISTING_ENTRIES: int = 200  # Status and diff stat listings longer than this are rolled up
+    MAX_SKIPPED_ENTRIES: int = 8  # Entries in the rolled-up note of files skipped for token limits
+    FLAT_SKIPPED_FILES: int = 5  # Skipped files listed individually before rolling up
+
+
+class HunkDedupe:
+    """Deduplication of repeated hunks across files."""
+
+    MIN_CLUSTER_SIZE: int = 3  # Files that must share a hunk before it is deduplicated
+    MAX_ROLLUP_ENTRIES: int = 5  # Entries in the rolled-up list of files a hunk was applied to
+    # Hunks smaller than both of these are only deduplicated when identical: with identifiers
+    # normalized, unrelated short changes such as `-x = 1` / `+x = 2` look alike
+    MIN_NEAR_CHANGED_LINES: int = 3
+    MIN_NEAR_CHANGED_CHARS: int = 40  # Non-whitespace characters of the changed lines
+    # Words kept as-is when identifiers are normalized, so unrelated one-line changes don't collide
+    KEYWORDS: frozenset[str] = frozenset(
+        (
+            "as async await break case catch class const continue def default del do else enum except export "
+            "extends false finally fn for from func function if impl import in interface is lambda let mut new "
+            "nil none not null package pass private protected pub public raise require return self static struct "
+            "super switch this throw true try type use var void while with yield"
+        ).split()
+    )
+
+
+class Structure:
+    """Structural summaries of source files."""
+
+    # File extension -> language of the symbol extractor
+    LANGUAGES: dict[str, str] = {
+        ".py": "python",
+        ".pyi": "python",
+        ".js": "javascript",
+        ".jsx": "javascript",
+        ".mjs": "javascript",
+        ".cjs": "javascript",
+        ".ts": "typescript",
+        ".tsx": "typescript",
+        ".go": "go",
+        ".rs": "rust",
+        ".java": "java",
+    }
+    MAX_SUMMARIZED_FILES: int = 50  # Skipped files considered for structural summaries
+    MAX_SUMMARY_ITEMS: int = 25  # Changes listed per file before the rest are counted
+    MAX_SIGNATURE_LENGTH: int = 160  # Longer signatures are cut off in summaries
+    SKELETON_MIN_LINES: int = 300  # New files with more lines are skeletonized under token pressure
+    MAX_SKELETON_IMPORTS: int = 30  # Imports listed in a skeleton before the rest are counted
+    MAX_SKELETON_SYMBOLS: int = 200  # Definitions listed in a skeleton before the rest are counted
+
+
+class DiffFormat:
+    """Rendering of the diff in prompts."""
+
+    FORMATS: list[str] = ["unified", "compact"]
+    DEFAULT: str = "unified"
+    DEFAULT_CONTEXT_LINES: int = 1  # Unchanged lines kept around each change in the compact format
+    MERGE_GAP_LINES: int = 2  # Regions separated by at most this many unchanged lines are merged
+    MAX_BUDGET_SCALE: float = 2.0  # Upper bound on the truncation budget increase from compacting
+
+    # Pattern -> format used when GAC_DIFF_FORMAT is unset, matched like ModelCatalog.MODELS.
+    # Local runtimes serve small context windows, where the savings matter most.
+    MODEL_DEFAULTS: dict[str, str] = {
+        "ollama:*": "compact",
+        "lm-studio:*": "compact",
+    }
+
+
+class Formatting:
+    """Collapsing of formatting-only changes."""
+
+    MAX_ROLLUP_ENTRIES: int = 5  # Entries in the listing of reformatted files
+    PYTHON_SUFFIXES: frozenset[str] = frozenset({".py", ".pyi"})
+    # Files whose leading indentation is part of their meaning, besides Python
+    INDENTED_SUFFIXES: frozenset[str] = frozenset({".yaml", ".yml", ".mk"})
+    INDENTED_NAMES: frozenset[str] = frozenset({"Makefile", "GNUmakefile", "makefile"})
+
+
+class MovedCode:
+    """Detection of code moved between files."""
+
+    MIN_LINES: int = 5  # Consecutive non-blank lines that must match for a block to count as moved
+    MIN_WINDOW_CHARS: int = 80  # Windows with less code than this (e.g. closing braces) are not matched
+    MAX_LINE_LENGTH: int = 500  # Longer lines (minified or generated code) are not matched
+
+
+class RenameDetection:
+    """Rename and copy detection for the staged diff gac sends to the model."""
+
+    SIMILARITY: int = 50  # Minimum similarity percentage for a rename or copy (git's default)
+    LIMIT: int = 1000  # Overrides diff.renameLimit, which large refactors otherwise exceed
+    DIFF_ARGS: list[str] = [f"--find-renames={SIMILARITY}%", f"--find-copies={SIMILARITY}%", f"-l{LIMIT}"]
+
+
+class Lockfiles:
+    """Dependency summaries of lockfile changes."""
+
+    # Lockfile name -> format of its parser
+    FORMATS: dict[str, str] = {
+        "package-lock.json": "npm",
+        "npm-shrinkwrap.json": "npm",
+        "yarn.lock": "yarn",
+        "pnpm-lock.yaml": "pnpm",
+        "poetry.lock": "toml",
+        "uv.lock": "toml",
+        "Cargo.lock": "toml",
+        "go.sum": "gosum",
+        "Gemfile.lock": "bundler",
+    }
+    MAX_CHANGES: int = 30  # Dependency changes listed per lockfile before the rest are counted
+
+
+class ConfigDiff:
+    """Key-path summaries of configuration file changes."""
+
+    # File extension -> configuration format
+    FORMATS: dict[str, str] = {
+        ".json": "json",
+        ".toml": "toml",
+        ".yaml": "yaml",
+        ".yml": "yaml",
+    }
+    MIN_CHANGED_LINES: int = 20  # Smaller config diffs keep their line diff
+    MAX_CHANGES: int = 40  # Key-path changes listed per file before the rest are counted
+    MAX_VALUE_LENGTH: int = 60  # Longer values are cut off in summaries
+    SUMMARY_VERSION: int = 1  # Bump when summaries change, so ones cached by older versions are rebuilt
+    CACHE_KEY_PREFIX: str = "config-diff"  # Summaries share the secret scan cache database
+
+
+class Notebooks:
+    """Cell-level diffs of Jupyter notebooks."""
+
+    CONTEXT_LINES: int = 1  # Unchanged source lines shown around each edit in a cell
+    MAX_CELLS: int = 30  # Changed cells listed per notebook before the rest are counted
+    MAX_CELL_DIFF_LINES: int = 40  # Diff lines shown per cell before the rest are counted
+    MAX_METADATA_CHANGES: int = 10  # Metadata changes listed per notebook before the rest are counted
+
+
+class ModelCatalog:
+    """Bundled context windows used to derive prompt budgets.
+
+    Keys are fnmatch-style patterns matched against the full provider:model string. Exact keys win,
+    then patterns in order. User entries from GAC_MODEL_CATALOG_PATH take precedence over these.
+    """
+
+    DEFAULT_USER_PATH: str = "~/.gac.models.json"
+    SAFETY_MARGIN: float = 0.05  # Fraction of the context window kept free for tokenizer estimation error
+
+    # Pattern -> (context window, max output tokens)
+    MODELS: dict[str, tuple[int, int]] = {
+        # Local runtimes serve small context windows by default, whatever the model supports
+        "ollama:*": (8192, 2048),
+        "lm-studio:*": (8192, 2048),
+        # Anthropic
+        "*claude-3-haiku*": (200000, 4096),
+        "*claude-3-5-haiku*": (200000, 8192),
+        "*claude-3-5-sonnet*": (200000, 8192),
+        "*claude-3-7-sonnet*": (200000, 64000),
+        "*claude-sonnet-4*": (200000, 64000),
+        "*claude-opus-4*": (200000, 32000),
+        "*claude-haiku-4*": (200000, 64000),
+        "*claude*": (200000, 8192),
+        # Google
+        "*gemini-1.5-pro*": (2097152, 8192),
+        "*gemini-2.5*": (1048576, 65536),
+        "*gemini*": (1048576, 8192),
+        "*gemma*": (131072, 8192),
+        # OpenAI
+        "*gpt-5*": (400000, 128000),
+        "*gpt-4.1*": (1047576, 32768),
+        "*gpt-4o*": (128000, 16384),
+        "*gpt-oss*": (131072, 32768),
+        "*[:/]o1*": (200000, 100000),
+        "*[:/]o3*": (200000, 100000),
+        "*[:/]o4-mini*": (200000, 100000),
+        "*gpt-4-turbo*": (128000, 4096),
+        "*[:/]gpt-4": (8192, 4096),
+        "*gpt-3.5-turbo*": (16385, 4096),
+        # Open-weight and other hosted families
+        "*deepseek-reasoner*": (128000, 65536),
+        "*deepseek*": (128000, 8192),
+        "*glm-4.6*": (200000, 128000),
+        "*glm-4.5*": (128000, 96000),
+        "*glm*": (128000, 8192),
+        "*kimi-k2*": (131072, 16384),
+        "*llama-4*": (131072, 8192),
+        "*llama-3.1*": (131072, 8192),
+        "*llama-3.2*": (131072, 8192),
+        "*llama-3.3*": (131072, 8192),
+        "*qwen3-coder*": (262144, 65536),
+        "*qwen3*": (131072, 32768),
+        "*qwen*": (32768, 8192),
+        "*codestral*": (256000, 8192),
+        "*devstral*": (131072, 8192),
+        "*mistral-large*": (131072, 8192),
+        "*mistral-medium*": (131072, 8192),
+        "*minimax-m2*": (204800, 131072),
+        "*abab6.5s*": (245760, 8192),
+    }
+
+
 class FilePatterns:
     """Patterns for identifying special file types."""
 
@@ -0,0 +1,162 @@
+"""Deduplication of repeated hunks across files.
+
+Codemods and mass renames produce the same hunk in many files. This module fingerprints hunks with
+whitespace and identifiers normalized, clusters files sharing a fingerprint, and keeps a single
+representative hunk annotated with a rollup of the files it was applied to.
+"""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+
+from gac.constants import HunkDedupe
+from gac.diff_sections import changed_lines, section_filename, split_hunks
+from gac.rollup import FileChangeStat, format_rollup
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*")
+
+
+@dataclass
+class _HunkRef:
+    """Location of a hunk within the list of diff sections."""
+
+    section_index: int
+    hunk_index: int
+    filename: str
+    exact_key: str
+    additions: int
+    deletions: int
+
+
+def _normalize_whitespace(lines: list[str]) -> str:
+    return "\n".join(_WHITESPACE_RE.sub(" ", line).strip() for line in lines)
+
+
+def _normalize_identifiers(text: str) -> str:
+    """Rename identifiers to placeholders numbered by first appearance, keeping keywords."""
+    names: dict[str, str] = {}
+
+    def rename(match: re.Match[str]) -> str:
+        word = match.group(0)
+        if word.lower() in HunkDedupe.KEYWORDS:
+            return word
+        return names.setdefault(word, f"v{len(names)}")
+
+    return _IDENTIFIER_RE.sub(rename, text)
+
+
+def hunk_fingerprints(hunk: str) -> tuple[str, str] | None:
+    """Fingerprint the changed lines of a hunk.
+
+    Context lines and the @@ header are ignored, since they differ between files receiving the same
+    change.
+
+    Args:
+        hunk: A single diff hunk
+
+    Returns:
+        Tuple of (exact, near) fingerprints, where exact ignores whitespace and near also ignores
+        identifier names, or None if the hunk changes no lines
+    """
+    lines = changed_lines(hunk)
+    if not lines:
+        return None
+    exact = _normalize_whitespace(lines)
+    near = _normalize_identifiers(exact)
+    return _digest(exact), _digest(near)
+
+
+def _is_near_clusterable(lines: list[str]) -> bool:
+    """Check whether a hunk's changed lines are large enough to cluster with renamed copies."""
+    if len(lines) >= HunkDedupe.MIN_NEAR_CHANGED_LINES:
+        return True
+    characters = sum(len(_WHITESPACE_RE.sub("", line[1:])) for line in lines)
+    return characters >= HunkDedupe.MIN_NEAR_CHANGED_CHARS
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def deduplicate_hunks(sections: list[str]) -> list[str]:
+    """Replace hunks repeated across files with one annotated representative.
+
+    Hunks are clustered by their near fingerprint, or by their exact one when they are too small
+    for renamed copies to be told apart from unrelated changes. When at least HunkDedupe.MIN_CLUSTER_SIZE files
+    share a cluster, the first hunk is kept with a note listing the files it was applied to, and
+    the other copies are removed. Sections left without hunks are dropped.
+
+    Args:
+        sections: Git diff sections, one per file
+
+    Returns:
+        Diff sections with repeated hunks deduplicated
+    """
+    clusters: dict[str, list[_HunkRef]] = {}
+    split_sections: list[tuple[str, list[str]] | None] = []
+
+    for section_index, section in enumerate(sections):
+        filename = section_filename(section)
+        header, hunks = split_hunks(section)
+        if filename is None or not hunks:
+            split_sections.append(None)
+            continue
+        split_sections.append((header, hunks))
+        for hunk_index, hunk in enumerate(hunks):
+            fingerprints = hunk_fingerprints(hunk)
+            if fingerprints is None:
+                continue
+            exact_key, near_key = fingerprints
+            lines = changed_lines(hunk)
+            additions = sum(1 for line in lines if line.startswith("+"))
+            cluster_key = near_key if _is_near_clusterable(lines) else f"exact:{exact_key}"
+            clusters.setdefault(cluster_key, []).append(
+                _HunkRef(section_index, hunk_index, filename, exact_key, additions, len(lines) - additions)
+            )
+
+    removed: set[tuple[int, int]] = set()
+    notes: dict[tuple[int, int], str] = {}
+    for refs in clusters.values():
+        files: dict[str, FileChangeStat] = {}
+        for ref in refs:
+            stat = files.setdefault(ref.filename, FileChangeStat(ref.filename, 0, 0))
+            stat.additions = (stat.additions or 0) + ref.additions
+            stat.deletions = (stat.deletions or 0) + ref.deletions
+        if len(files) < HunkDedupe.MIN_CLUSTER_SIZE:
+            continue
+        representative = refs[0]
+        rollup = ", ".join(format_rollup(list(files.values()), HunkDedupe.MAX_ROLLUP_ENTRIES))
+        kind = "Same change" if len({ref.exact_key for ref in refs}) == 1 else "Similar change (names differ)"
+        notes[(representative.section_index, representative.hunk_index)] = (
+            f"[{kind} applied to {len(files)} files: {rollup}]"
+        )
+        removed.update((ref.section_index, ref.hunk_index) for ref in refs[1:])
+
+    if not removed:
+        return sections
+
+    logger.info(f"Deduplicated {len(removed)} repeated hunks into {len(notes)} representatives")
+
+    result = []
+    for section_index, section in enumerate(sections):
+        parts = split_sections[section_index]
+        if parts is None:
+            result.append(section)
+            continue
+        header, hunks = parts
+        kept = []
+        for hunk_index, hunk in enumerate(hunks):
+            key = (section_index, hunk_index)
+            if key in removed:
+                continue
+            if key in notes:
+                hunk = hunk.rstrip("\n") + f"\n{notes[key]}\n"
+            kept.append(hunk)
+        if kept:
+            result.append(header + "".join(kept))
+
+    return result
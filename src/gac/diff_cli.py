@@ -26,6 +26,7 @@ import sys
 
 import click
 
+from gac.constants import Utility
 from gac.errors import GitError, with_error_handling
 from gac.git import get_diff, get_staged_files
 from gac.preprocess import (
@@ -80,7 +81,9 @@ def _diff_implementation(
         if isinstance(diff_text, str):
             sections = split_diff_into_sections(diff_text)
             scored_sections = [(section, 1.0) for section in sections]
-            diff_text = smart_truncate_diff(scored_sections, max_tokens or 1000, "anthropic:claude-3-haiku-latest")
+            diff_text = smart_truncate_diff(
+                scored_sections, max_tokens or Utility.DEFAULT_DIFF_TOKEN_LIMIT, "anthropic:claude-3-haiku-latest"
+            )
 
     if color:
         # Use git's colored diff output
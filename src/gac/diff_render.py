@@ -0,0 +1,193 @@
+"""Compact rendering of preprocessed diffs for prompts.
+
+A unified diff repeats each path up to four times (``diff --git a/… b/…``, ``---``, ``+++``),
+carries blob hashes on its index line and shows three lines of context around every change. None
+of that helps a model describe the change. The compact format gives each file a single
+``## path`` header with its status, keeps a configurable number of context lines, and merges
+regions that are adjacent once context is trimmed.
+"""
+
+import fnmatch
+import logging
+import re
+from dataclasses import dataclass
+
+from gac.ai_utils import count_tokens
+from gac.constants import DiffFormat
+
+logger = logging.getLogger(__name__)
+
+_SECTION_START_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+_HUNK_START_RE = re.compile(r"^(?=@@ )", re.MULTILINE)
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@ ?(.*)$")
+_GIT_PATHS_RE = re.compile(r"^diff --git a/(.*) b/(.*)$")
+
+
+@dataclass
+class _Line:
+    """A line of a hunk with its position in the old and new file."""
+
+    text: str
+    hunk: int
+    old: int
+    new: int
+    is_change: bool
+
+    @property
+    def next_position(self) -> tuple[int, int]:
+        marker = self.text[:1]
+        return self.old + (marker in (" ", "-")), self.new + (marker in (" ", "+"))
+
+
+def resolve_diff_format(model: str, configured: str | None = None) -> str:
+    """Choose the diff format for a model.
+
+    Args:
+        model: Full provider:model string
+        configured: Format set by the user (GAC_DIFF_FORMAT), which takes precedence
+
+    Returns:
+        One of DiffFormat.FORMATS
+    """
+    if configured:
+        if configured in DiffFormat.FORMATS:
+            return configured
+        logger.warning(f"Unknown diff format '{configured}', expected one of {', '.join(DiffFormat.FORMATS)}")
+    for pattern, diff_format in DiffFormat.MODEL_DEFAULTS.items():
+        if fnmatch.fnmatch(model, pattern):
+            return diff_format
+    return DiffFormat.DEFAULT
+
+
+def _render_file_header(header: str) -> list[str]:
+    """Reduce a section's git header to one path line, followed by any notes it carries."""
+    path = None
+    tags: list[str] = []
+    notes: list[str] = []
+    old_mode = None
+    for line in header.rstrip("\n").split("\n"):
+        if match := _GIT_PATHS_RE.match(line):
+            path = match.group(2)
+        elif line.startswith(("index ", "similarity index ", "dissimilarity index ", "--- ", "+++ ")):
+            continue
+        elif line.startswith("new file mode"):
+            tags.append("new file")
+        elif line.startswith("deleted file mode"):
+            tags.append("deleted")
+        elif line.startswith(("rename from ", "copy from ")):
+            verb, _, source = line.partition(" from ")
+            tags.append(f"{'renamed' if verb == 'rename' else 'copied'} from {source}")
+        elif line.startswith(("rename to ", "copy to ")):
+            path = line.partition(" to ")[2]
+        elif line.startswith("old mode "):
+            old_mode = line[len("old mode ") :]
+        elif line.startswith("new mode "):
+            tags.append(f"mode {old_mode} → {line[len('new mode ') :]}")
+        elif line:
+            notes.append(line)
+    title = f"## {path}" + (f" ({', '.join(tags)})" if tags else "")
+    return [title, *notes]
+
+
+def _parse_hunks(hunks: list[str]) -> tuple[list[_Line], list[str]]:
+    """Number the lines of a section's hunks. Returns the lines and each hunk's function heading."""
+    lines: list[_Line] = []
+    headings: list[str] = []
+    for hunk_index, hunk in enumerate(hunks):
+        hunk_lines = hunk.rstrip("\n").split("\n")
+        match = _HUNK_HEADER_RE.match(hunk_lines[0])
+        old, new = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+        headings.append(match.group(3) if match else "")
+        for text in hunk_lines[1:]:
+            # "\ No newline at end of file" describes the line before it and is not a change
+            line = _Line(text, hunk_index, old, new, is_change=not text.startswith((" ", "\\")))
+            lines.append(line)
+            old, new = line.next_position
+    return lines, headings
+
+
+def _render_hunks(hunks: list[str], context_lines: int) -> list[str]:
+    """Render hunks with context trimmed to context_lines, merging regions that become adjacent."""
+    lines, headings = _parse_hunks(hunks)
+    keep = [False] * len(lines)
+    for index, line in enumerate(lines):
+        if not line.is_change:
+            continue
+        for neighbor in range(max(index - context_lines, 0), min(index + context_lines + 1, len(lines))):
+            if lines[neighbor].hunk == line.hunk:
+                keep[neighbor] = True
+
+    # Short gaps cost fewer tokens to show than the region header that would replace them
+    kept_indices = [index for index, kept in enumerate(keep) if kept]
+    for previous, current in zip(kept_indices, kept_indices[1:], strict=False):
+        gap = current - previous - 1
+        if 0 < gap <= DiffFormat.MERGE_GAP_LINES and lines[previous].hunk == lines[current].hunk:
+            for index in range(previous + 1, current):
+                keep[index] = True
+    # No newline markers are shown with the line they describe
+    for index in range(1, len(lines)):
+        if lines[index].text.startswith("\\") and keep[index - 1]:
+            keep[index] = True
+
+    output: list[str] = []
+    expected: tuple[int, int] | None = None
+    headed_hunks: set[int] = set()
+    for index, line in enumerate(lines):
+        if not keep[index]:
+            expected = None
+            continue
+        if expected != (line.old, line.new):
+            starts_file = expected is None and not output and line.old <= 1 and line.new <= 1
+            if not starts_file:
+                heading = "" if line.hunk in headed_hunks else headings[line.hunk]
+                output.append(f"@@ -{line.old} +{line.new} @@" + (f" {heading}" if heading else ""))
+            headed_hunks.add(line.hunk)
+        output.append(line.text)
+        expected = line.next_position
+    return output
+
+
+def render_compact_diff(diff: str, context_lines: int = DiffFormat.DEFAULT_CONTEXT_LINES) -> str:
+    """Render a unified diff in the compact format.
+
+    Notes added by preprocessing, such as summaries and markers, are kept as they are, and so is
+    any text before the first file.
+
+    Args:
+        diff: Unified diff, possibly preprocessed
+        context_lines: Unchanged lines kept around each change. Can't exceed the context in diff
+
+    Returns:
+        The diff in the compact format
+    """
+    if not diff:
+        return diff
+    parts = _SECTION_START_RE.split(diff)
+    rendered = [parts[0].rstrip("\n")] if parts[0].strip() else []
+    for section in parts[1:]:
+        header, *hunks = _HUNK_START_RE.split(section)
+        rendered.append("\n".join(_render_file_header(header) + _render_hunks(hunks, context_lines)))
+    return "\n".join(rendered) + "\n"
+
+
+def render_diff(diff: str, diff_format: str, context_lines: int, model: str) -> str:
+    """Render a preprocessed diff in the given format, logging the tokens the compact format saves.
+
+    Args:
+        diff: Unified diff, possibly preprocessed
+        diff_format: One of DiffFormat.FORMATS
+        context_lines: Unchanged lines kept around each change in the compact format
+        model: Model identifier for token counting
+
+    Returns:
+        The rendered diff
+    """
+    if diff_format != "compact" or not diff:
+        return diff
+    rendered = render_compact_diff(diff, context_lines)
+    unified_tokens = count_tokens(diff, model)
+    compact_tokens = count_tokens(rendered, model)
+    logger.info(
+        f"Compact diff format saved {unified_tokens - compact_tokens} tokens ({unified_tokens} → {compact_tokens})"
+    )
+    return rendered
@@ -0,0 +1,57 @@
+"""Helpers for working with the per-file sections of a git diff."""
+
+import re
+
+_FILENAME_RE = re.compile(r"diff --git a/(.*) b/")
+_HUNK_START_RE = re.compile(r"^(?=@@ )", re.MULTILINE)
+_INDEX_RE = re.compile(r"^index ([0-9a-f]+)\.\.([0-9a-f]+)", re.MULTILINE)
+
+
+def section_filename(section: str) -> str | None:
+    """Get the file path from a diff section header.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        The path of the file, or None if the section has no diff header
+    """
+    match = _FILENAME_RE.search(section)
+    return match.group(1) if match else None
+
+
+def split_hunks(section: str) -> tuple[str, list[str]]:
+    """Split a diff section into its file header and hunks.
+
+    Joining the header and hunks gives back the original section.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        Tuple of (header, hunks), where each hunk starts with its @@ line
+    """
+    parts = _HUNK_START_RE.split(section)
+    return parts[0], parts[1:]
+
+
+def changed_lines(hunk: str) -> list[str]:
+    """Get the added and removed lines of a hunk, with their +/- markers."""
+    return [line for line in hunk.split("\n") if line[:1] in ("+", "-")]
+
+
+def section_blob_ids(section: str) -> tuple[str | None, str | None]:
+    """Get the old and new blob IDs from a diff section's index line.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        Tuple of (old, new) blob IDs, where None means the file does not exist on that side or the
+        section has no index line
+    """
+    match = _INDEX_RE.search(section)
+    if not match:
+        return None, None
+    old_id, new_id = match.groups()
+    return (None if set(old_id) == {"0"} else old_id), (None if set(new_id) == {"0"} else new_id)
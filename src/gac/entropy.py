@@ -0,0 +1,139 @@
+"""Detection of high-entropy strings in added lines.
+
+Known token formats are matched by the patterns in gac.security. Credentials without a known
+format, such as random passwords and internal service keys, are recognizable by their Shannon
+entropy instead: random base64 and hex strings use their alphabets much more evenly than words
+and identifiers do. Candidate strings are collected for a whole section and scored in one batch,
+with NumPy over byte histograms when it is installed (the 'entropy' extra) and in pure Python
+otherwise.
+"""
+
+import logging
+import math
+import re
+import string
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from gac.constants import Entropy
+
+logger = logging.getLogger(__name__)
+
+# Quoted strings, and values assigned with = or :
+_TOKEN = rf"[A-Za-z0-9+/=_\-]{{{Entropy.MIN_LENGTH},}}"
+_CANDIDATE_RE = re.compile(rf"""["'`]({_TOKEN})["'`]|[=:]\s*({_TOKEN})""")
+_HEX_CHARS = frozenset(string.hexdigits)
+
+
+@dataclass(frozen=True)
+class EntropyThresholds:
+    """Minimum Shannon entropy, in bits per character, for a string to be reported."""
+
+    base64: float = Entropy.BASE64_THRESHOLD
+    hex: float = Entropy.HEX_THRESHOLD
+
+
+def thresholds_from_config(config: Mapping[str, object]) -> EntropyThresholds | None:
+    """Build the entropy detection settings from a loaded config.
+
+    Args:
+        config: Config from gac.config.load_config
+
+    Returns:
+        Thresholds, or None if entropy detection is disabled
+    """
+    if not config.get("secret_scan_entropy"):
+        return None
+    base64_threshold = config.get("entropy_base64_threshold")
+    hex_threshold = config.get("entropy_hex_threshold")
+    return EntropyThresholds(
+        base64=float(base64_threshold) if isinstance(base64_threshold, int | float) else Entropy.BASE64_THRESHOLD,
+        hex=float(hex_threshold) if isinstance(hex_threshold, int | float) else Entropy.HEX_THRESHOLD,
+    )
+
+
+def _numpy_entropies(candidates: list[str]) -> list[float] | None:
+    """Score candidates with one vectorized pass over their byte histograms, if NumPy is installed."""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    encoded = [candidate.encode("utf-8") for candidate in candidates]
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.int64)
+    owners = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    # One histogram bin per (candidate, byte value); only the bins that occur are scored
+    bins, counts = np.unique(owners * 256 + data, return_counts=True)
+    bin_owners = bins // 256
+    probabilities = counts / lengths[bin_owners]
+    terms = probabilities * np.log2(probabilities)
+    return [float(value) for value in -np.bincount(bin_owners, weights=terms, minlength=len(encoded))]
+
+
+def shannon_entropy(text: str) -> float:
+    """Compute the Shannon entropy of a string.
+
+    Args:
+        text: String to score
+
+    Returns:
+        Entropy in bits per character, 0.0 for an empty string
+    """
+    if not text:
+        return 0.0
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+
+def batch_entropies(candidates: list[str]) -> list[float]:
+    """Compute the Shannon entropy of many strings at once.
+
+    Args:
+        candidates: ASCII strings to score
+
+    Returns:
+        Entropy of each candidate in bits per character, in order
+    """
+    if not candidates:
+        return []
+    if len(candidates) >= Entropy.MIN_VECTORIZED_BATCH:
+        entropies = _numpy_entropies(candidates)
+        if entropies is not None:
+            return entropies
+    return [shannon_entropy(candidate) for candidate in candidates]
+
+
+def _is_candidate(text: str) -> bool:
+    """Keep strings mixing letters and digits; words and identifiers rarely do."""
+    return any(char.isdigit() for char in text) and any(char.isalpha() for char in text)
+
+
+def find_high_entropy_strings(
+    lines: list[tuple[int, str]], thresholds: EntropyThresholds
+) -> list[tuple[int, str, str]]:
+    """Find high-entropy base64 and hex strings in lines.
+
+    Args:
+        lines: (line number, text) pairs to search
+        thresholds: Minimum entropy per alphabet
+
+    Returns:
+        (line number, kind, string) of each finding in line order, where kind is 'base64' or 'hex'
+    """
+    candidates: list[tuple[int, str]] = []
+    for line_number, text in lines:
+        for match in _CANDIDATE_RE.finditer(text):
+            candidate = match.group(1) or match.group(2)
+            if _is_candidate(candidate):
+                candidates.append((line_number, candidate))
+
+    findings = []
+    for (line_number, candidate), entropy in zip(
+        candidates, batch_entropies([candidate for _, candidate in candidates]), strict=True
+    ):
+        kind = "hex" if _HEX_CHARS.issuperset(candidate) else "base64"
+        if entropy >= (thresholds.hex if kind == "hex" else thresholds.base64):
+            findings.append((line_number, kind, candidate))
+    return findings
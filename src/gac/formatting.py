@@ -0,0 +1,160 @@
+"""Detection of formatting-only changes.
+
+After a formatter run most of a diff is reindentation, reflowed lines and similar noise. This
+module compares the old and new sides of each hunk token by token, so whitespace between
+tokens, line breaks and the choice of single or double quotes don't count, while the contents of
+string literals do. Leading indentation still counts in indentation-sensitive files (Python, YAML,
+Makefiles), except on continuation lines inside brackets, and a trailing comma before a closing
+bracket is ignored except before ``)`` in Python, where ``(30,)`` is a tuple. Hunks that only
+reformat code are dropped, and files whose changes are all formatting are reported together as a
+single "reformatted N files" note.
+"""
+
+import logging
+import os
+import re
+
+from gac.constants import Formatting
+from gac.diff_sections import changed_lines, section_filename, split_hunks
+from gac.rollup import FileChangeStat, format_rollup
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(
+    r'(?P<string>"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+    r"|`(?:\\.|[^`\\])*`)"
+    r"|(?P<continuation>\\\n)|(?P<newline>\n)|(?P<space>[^\S\n]+)|(?P<word>\w+)|(?P<symbol>.)",
+    re.DOTALL,
+)
+
+
+def _file_rules(filename: str) -> tuple[bool, bool]:
+    """Get whether a file's indentation is significant and whether it is Python."""
+    name = os.path.basename(filename)
+    suffix = os.path.splitext(name)[1].lower()
+    python = suffix in Formatting.PYTHON_SUFFIXES
+    return python or suffix in Formatting.INDENTED_SUFFIXES or name in Formatting.INDENTED_NAMES, python
+
+
+def _string_token(literal: str) -> str:
+    """Key a string literal by its contents, so only the quote style may differ."""
+    if literal.startswith("`"):
+        return "\0template:" + literal[1:-1]
+    quote_length = 3 if literal[:3] in ('"""', "'''") and len(literal) >= 6 else 1
+    return "\0string:" + literal[quote_length:-quote_length]
+
+
+def _tokens(lines: list[str], indentation_sensitive: bool, python: bool) -> list[str]:
+    """Tokenize diff lines, dropping whitespace and line breaks that don't change the code."""
+    text = "\n".join(line[1:] for line in lines)
+    tokens: list[str] = []
+    depth = 0
+    at_line_start = True
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "newline":
+            at_line_start = True
+            continue
+        if kind in ("space", "continuation"):
+            continue
+        if at_line_start:
+            at_line_start = False
+            # Only lines starting a statement are indented meaningfully; continuation lines
+            # inside brackets are indented however the formatter likes
+            if indentation_sensitive and depth == 0:
+                tokens.append("\0indent:" + text[text.rfind("\n", 0, match.start()) + 1 : match.start()])
+        value = match.group(0)
+        if kind == "string":
+            tokens.append(_string_token(value))
+            continue
+        if value in "([{":
+            depth += 1
+        elif value in ")]}":
+            depth = max(depth - 1, 0)
+            if tokens and tokens[-1] == "," and not (python and value == ")"):
+                tokens.pop()
+        tokens.append(value)
+    return tokens
+
+
+def is_formatting_only_hunk(hunk: str, filename: str) -> bool:
+    """Check if a hunk only changes formatting.
+
+    The old and new sides of the hunk, context lines included, are each tokenized and compared,
+    so reindented, rewrapped and blank-line changes match, as do strings that only switch between
+    single and double quotes.
+    Trailing commas before closing brackets are ignored too, as formatters add and remove them.
+    The rules that depend on the language are described in the module docstring.
+
+    Args:
+        hunk: A single diff hunk
+        filename: Path of the hunk's file, which selects the language rules
+
+    Returns:
+        True if the hunk changes lines and the changes are formatting only
+    """
+    if not changed_lines(hunk):
+        return False
+    indentation_sensitive, python = _file_rules(filename)
+    # Compare whole sides, context included, so moving a statement past an unchanged line counts
+    body = [line for line in hunk.split("\n")[1:] if line[:1] in (" ", "-", "+")]
+    old = [line for line in body if not line.startswith("+")]
+    new = [line for line in body if not line.startswith("-")]
+    return _tokens(old, indentation_sensitive, python) == _tokens(new, indentation_sensitive, python)
+
+
+def collapse_formatting_changes(sections: list[str]) -> tuple[list[str], list[FileChangeStat]]:
+    """Drop formatting-only hunks, and files whose changes are all formatting.
+
+    Files keeping some hunks get a note counting the hunks dropped from them.
+
+    Args:
+        sections: Git diff sections, one per file
+
+    Returns:
+        Tuple of (remaining sections, change stats of the files dropped as formatting only)
+    """
+    result = []
+    reformatted: list[FileChangeStat] = []
+    dropped_hunks = 0
+    for section in sections:
+        filename = section_filename(section)
+        header, hunks = split_hunks(section)
+        if filename is None or not hunks:
+            result.append(section)
+            continue
+
+        kept = [hunk for hunk in hunks if not is_formatting_only_hunk(hunk, filename)]
+        if len(kept) == len(hunks):
+            result.append(section)
+        elif kept:
+            dropped = len(hunks) - len(kept)
+            dropped_hunks += dropped
+            noun = "hunk" if dropped == 1 else "hunks"
+            kept[-1] = kept[-1].rstrip("\n") + f"\n[{dropped} formatting-only {noun} omitted]\n"
+            result.append(header + "".join(kept))
+        else:
+            lines = [line for hunk in hunks for line in changed_lines(hunk)]
+            additions = sum(1 for line in lines if line.startswith("+"))
+            reformatted.append(FileChangeStat(filename, additions, len(lines) - additions))
+
+    if reformatted or dropped_hunks:
+        logger.info(f"Collapsed {len(reformatted)} reformatted files and {dropped_hunks} formatting-only hunks")
+    return result, reformatted
+
+
+def format_reformatted_note(reformatted: list[FileChangeStat]) -> str:
+    """Render the note listing files whose changes are formatting only.
+
+    Args:
+        reformatted: Change stats of the reformatted files
+
+    Returns:
+        A note such as '[Reformatted 12 files (formatting only): src/** 12 files +340/-310]', or
+        an empty string if no files were reformatted
+    """
+    if not reformatted:
+        return ""
+    noun = "file" if len(reformatted) == 1 else "files"
+    rollup = ", ".join(format_rollup(reformatted, Formatting.MAX_ROLLUP_ENTRIES))
+    return f"[Reformatted {len(reformatted)} {noun} (formatting only): {rollup}]"
@@ -7,17 +7,32 @@ It focuses on the core operations needed for commit generation.
 import logging
 import os
 import subprocess
+import tempfile
+from collections.abc import Iterator
 
+from gac.constants import RenameDetection
 from gac.errors import GitError
+from gac.rollup import FileChangeStat
 from gac.utils import run_subprocess
 
 logger = logging.getLogger(__name__)
 
 
-def run_git_command(args: list[str], silent: bool = False, timeout: int = 30) -> str:
-    """Run a git command and return the output."""
+def run_git_command(args: list[str], silent: bool = False, timeout: int = 30, optional_locks: bool = True) -> str:
+    """Run a git command and return the output.
+
+    Read-only commands running alongside others that write the index, such as git status while
+    hooks run git add, should pass optional_locks=False. Otherwise git takes the index lock to
+    refresh it when it can, and the writer fails on finding the lock taken.
+    """
     command = ["git"] + args
-    return run_subprocess(command, silent=silent, timeout=timeout, raise_on_error=False, strip_output=True)
+    env = None if optional_locks else {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+    return run_subprocess(command, silent=silent, timeout=timeout, raise_on_error=False, strip_output=True, env=env)
+
+
+def get_status() -> str:
+    """Get git status output without taking the index lock, so it can run alongside index writers."""
+    return run_git_command(["status"], optional_locks=False)
 
 
 def get_staged_files(file_type: str | None = None, existing_only: bool = False) -> list[str]:
@@ -50,6 +65,39 @@ def get_staged_files(file_type: str | None = None, existing_only: bool = False)
         return []
 
 
+def unstage_files(paths: list[str], timeout: int = 30) -> bool:
+    """Unstage files with a single git call, keeping their changes in the working tree.
+
+    Paths are passed on stdin, so any number of them fits in one call. On a branch without
+    commits, where there is no HEAD to restore from, the files are removed from the index.
+
+    Args:
+        paths: Repository-relative paths to unstage
+        timeout: Command timeout in seconds
+
+    Returns:
+        True if the files were unstaged
+    """
+    if not paths:
+        return True
+    # Paths are relative to the repository root and taken literally, whatever the working directory
+    pathspecs = "\0".join(f":(top,literal){path}" for path in paths).encode()
+    has_head = bool(run_git_command(["rev-parse", "--verify", "--quiet", "HEAD"], silent=True))
+    if has_head:
+        command = ["git", "restore", "--staged", "--pathspec-from-file=-", "--pathspec-file-nul"]
+    else:
+        command = ["git", "rm", "--cached", "--quiet", "-r", "--pathspec-from-file=-", "--pathspec-file-nul"]
+    try:
+        result = subprocess.run(command, input=pathspecs, capture_output=True, check=False, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error(f"Failed to unstage files: {e}")
+        return False
+    if result.returncode != 0:
+        logger.error(f"Failed to unstage files: {result.stderr.decode(errors='replace').strip()}")
+        return False
+    return True
+
+
 def get_diff(staged: bool = True, color: bool = True, commit1: str | None = None, commit2: str | None = None) -> str:
     """Get the diff between commits or working tree.
 
@@ -88,6 +136,210 @@ def get_diff(staged: bool = True, color: bool = True, commit1: str | None = None
         raise GitError(f"Failed to get diff: {str(e)}") from e
 
 
+def get_staged_blob_ids() -> dict[tuple[str, str], tuple[str, str]]:
+    """Get the blob IDs of each staged file pair from the index, without reading any content.
+
+    Renames and copies are detected as in the staged diff gac builds, so pairs match its sections.
+
+    Returns:
+        Mapping of (old path, new path) to (old blob ID, new blob ID), with the all-zero ID for a
+        side that does not exist. Empty if git fails.
+    """
+    try:
+        output = run_git_command(
+            ["diff", "--cached", "--raw", "--no-abbrev", "-z", *RenameDetection.DIFF_ARGS], optional_locks=False
+        )
+    except GitError:
+        return {}
+
+    # Each entry is ":<old mode> <new mode> <old id> <new id> <status>\0<path>\0", with a second
+    # path for renames and copies
+    blob_ids: dict[tuple[str, str], tuple[str, str]] = {}
+    fields = output.split("\0")
+    index = 0
+    while index < len(fields):
+        entry = fields[index].lstrip("\n").split()
+        index += 1
+        if len(entry) != 5 or not entry[0].startswith(":"):
+            continue
+        _, _, old_id, new_id, status = entry
+        paths_count = 2 if status[:1] in ("R", "C") else 1
+        paths = fields[index : index + paths_count]
+        index += paths_count
+        if len(paths) == paths_count:
+            blob_ids[(paths[0], paths[-1])] = (old_id, new_id)
+    return blob_ids
+
+
+def get_staged_numstat() -> list[FileChangeStat]:
+    """Get the added and removed lines of each staged file, with full paths.
+
+    Unlike git diff --stat, whose paths git shortens to '.../tail' when they don't fit, numstat
+    always gives the whole path, so files can be grouped by directory.
+
+    Returns:
+        Per-file change stats under the new path of renames and copies, with 0 for binary files.
+        Empty if git fails.
+    """
+    try:
+        output = run_git_command(
+            ["diff", "--cached", "--numstat", "-z", *RenameDetection.DIFF_ARGS], optional_locks=False
+        )
+    except GitError:
+        return []
+
+    # Each entry is "<added>\t<deleted>\t<path>\0", or "<added>\t<deleted>\t\0<old path>\0<new path>\0"
+    # for renames and copies. Binary files have '-' for both counts
+    changes = []
+    fields = output.split("\0")
+    index = 0
+    while index < len(fields):
+        entry = fields[index].lstrip("\n").split("\t")
+        index += 1
+        if len(entry) != 3:
+            continue
+        added, deleted, path = entry
+        if not path:
+            path = fields[index + 1] if index + 1 < len(fields) else ""
+            index += 2
+        if path:
+            changes.append(
+                FileChangeStat(path, int(added) if added.isdigit() else 0, int(deleted) if deleted.isdigit() else 0)
+            )
+    return changes
+
+
+def read_blobs(object_ids: list[str], timeout: int = 30) -> dict[str, bytes]:
+    """Read the contents of git blobs with a single cat-file process.
+
+    Args:
+        object_ids: Full or abbreviated blob object IDs
+        timeout: Command timeout in seconds
+
+    Returns:
+        Mapping of requested object ID to blob content. Missing objects and non-blob objects are
+        left out, as are all objects if git fails.
+    """
+    unique_ids = list(dict.fromkeys(object_ids))
+    if not unique_ids:
+        return {}
+
+    try:
+        result = subprocess.run(
+            ["git", "cat-file", "--batch"],
+            input=("\n".join(unique_ids) + "\n").encode(),
+            capture_output=True,
+            check=False,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug(f"Failed to read blobs: {e}")
+        return {}
+    if result.returncode != 0:
+        logger.debug(f"Failed to read blobs: {result.stderr.decode(errors='replace').strip()}")
+        return {}
+
+    # Each object is "<id> <type> <size>\n<content>\n", or "<id> missing\n" (or "ambiguous")
+    blobs: dict[str, bytes] = {}
+    output = result.stdout
+    position = 0
+    for object_id in unique_ids:
+        header_end = output.find(b"\n", position)
+        if header_end == -1:
+            break
+        header = output[position:header_end].split()
+        position = header_end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        if header[1] == b"blob":
+            blobs[object_id] = output[position : position + size]
+        position += size + 1
+    return blobs
+
+
+def iter_blob_lines(object_id: str) -> Iterator[str]:
+    """Stream the lines of a git blob without loading it into memory.
+
+    Args:
+        object_id: Full or abbreviated blob object ID
+
+    Yields:
+        Lines of the blob, with their line endings
+
+    Raises:
+        GitError: If git cannot be run or the blob cannot be read. Raised once the stream ends
+    """
+    try:
+        process = subprocess.Popen(
+            ["git", "cat-file", "blob", object_id],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except OSError as e:
+        raise GitError(f"Failed to read blob {object_id}: {e}") from e
+
+    with process:
+        assert process.stdout is not None
+        yield from process.stdout
+    if process.returncode != 0:
+        raise GitError(f"Failed to read blob {object_id}: git exited with code {process.returncode}")
+
+
+def iter_log_patches(revision_range: str) -> Iterator[tuple[str, str]]:
+    """Stream the patches of a range of commits without loading the whole log into memory.
+
+    Patches come from `git log -p --full-index`, newest commit first. Merge commits have no patch
+    and are left out.
+
+    Args:
+        revision_range: Commit range, such as 'v1.0..HEAD', or a single revision for its history
+
+    Yields:
+        (commit hash, patch) for each commit, where the patch is a diff with full blob IDs
+
+    Raises:
+        GitError: If git cannot be run or the range is invalid. Raised once the stream ends
+    """
+    # stderr goes to a file rather than a pipe: a pipe only read once stdout ends would fill up if
+    # git warned a lot, blocking git and this reader on each other
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(
+                ["git", "log", "-p", "--full-index", "--no-renames", "--no-color", "--no-ext-diff", "--format=%x00%H"]
+                + [revision_range, "--"],
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except OSError as e:
+            raise GitError(f"Failed to read history of {revision_range}: {e}") from e
+
+        # Each commit starts with a NUL and its hash, which no patch line can start with
+        with process:
+            assert process.stdout is not None
+            commit = None
+            lines: list[str] = []
+            for line in process.stdout:
+                if line.startswith("\0"):
+                    if commit is not None and len(lines) > 1:
+                        yield commit, "".join(lines)
+                    commit, lines = line[1:].strip(), []
+                else:
+                    lines.append(line)
+            if commit is not None and len(lines) > 1:
+                yield commit, "".join(lines)
+        stderr.seek(0)
+        error = stderr.read().decode("utf-8", errors="replace").strip()
+    if process.returncode != 0:
+        raise GitError(f"Failed to read history of {revision_range}: {error or f'exit code {process.returncode}'}")
+
+
 def get_repo_root() -> str:
     """Get absolute path of repository root."""
     result = subprocess.check_output(["git", "rev-parse", "--show-toplevel"])
@@ -106,6 +358,24 @@ def get_commit_hash() -> str:
     return result.decode().strip()
 
 
+def get_index_tree() -> str | None:
+    """Get the ID of the tree the index would commit, writing its tree objects if needed.
+
+    Comparing it before and after hooks run tells whether they changed the staged content.
+
+    Returns:
+        The tree ID, or None if the index cannot be written as a tree, e.g. during a merge
+        conflict
+    """
+    return run_git_command(["write-tree"], silent=True) or None
+
+
+def hooks_configured() -> bool:
+    """Check whether run_pre_commit_hooks or run_lefthook_hooks would find hooks to run."""
+    configs = [".pre-commit-config.yaml", ".lefthook.yml", "lefthook.yml", ".lefthook.yaml", "lefthook.yaml"]
+    return any(os.path.exists(config) for config in configs)
+
+
 def run_pre_commit_hooks() -> bool:
     """Run pre-commit hooks if they exist.
 
@@ -0,0 +1,180 @@
+"""Secret scanning of commit history.
+
+Audits a range of commits, for example before open-sourcing a repository, with the same scanner
+used on staged changes. The log is streamed from ``git log -p --full-index`` and scanned in chunks,
+so memory use doesn't grow with the size of the history. File changes repeated across commits,
+such as cherry-picks, are recognized by their path and blob IDs and scanned once. Findings can be
+reported as JSON or SARIF for code scanning tools.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+
+from gac import __version__
+from gac.constants import HistoryScan
+from gac.diff_sections import section_blob_ids
+from gac.entropy import EntropyThresholds
+from gac.git import iter_log_patches
+from gac.parallel import map_sections
+from gac.security import (
+    DetectedSecret,
+    extract_file_path_from_diff_section,
+    get_section_scanner,
+    split_scannable_sections,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HistoryFinding:
+    """A secret found in the patch of a commit, or in staged changes if commit is None."""
+
+    commit: str | None
+    secret: DetectedSecret
+
+
+def scan_history(
+    revision_range: str, max_workers: int | None = None, entropy_thresholds: EntropyThresholds | None = None
+) -> list[HistoryFinding]:
+    """Scan the patches of a range of commits for secrets.
+
+    Args:
+        revision_range: Commit range, such as 'v1.0..HEAD'
+        max_workers: Maximum number of worker processes. Defaults to the CPU count
+        entropy_thresholds: Also report high-entropy strings above these thresholds. Disabled
+            when None
+
+    Returns:
+        Findings, newest commit first and in diff order within a commit
+
+    Raises:
+        GitError: If the history cannot be read
+    """
+    scan = get_section_scanner(entropy_thresholds)
+    findings: list[HistoryFinding] = []
+    seen: set[tuple[str | None, str | None, str | None]] = set()
+    chunk_commits: list[str] = []
+    chunk_sections: list[str] = []
+    chunk_bytes = 0
+    commits = 0
+    repeated = 0
+
+    def scan_chunk() -> None:
+        nonlocal chunk_bytes
+        for commit, secrets in zip(chunk_commits, map_sections(scan, chunk_sections, max_workers), strict=True):
+            findings.extend(HistoryFinding(commit, secret) for secret in secrets)
+        chunk_commits.clear()
+        chunk_sections.clear()
+        chunk_bytes = 0
+
+    for commit, patch in iter_log_patches(revision_range):
+        commits += 1
+        for section in split_scannable_sections(patch):
+            old_id, new_id = section_blob_ids(section)
+            if new_id is None:
+                continue  # Deletions add no lines
+            key = (extract_file_path_from_diff_section(section), old_id, new_id)
+            if key in seen:
+                repeated += 1
+                continue
+            seen.add(key)
+            chunk_commits.append(commit)
+            chunk_sections.append(section)
+            chunk_bytes += len(section)
+        if chunk_bytes >= HistoryScan.CHUNK_BYTES:
+            scan_chunk()
+    scan_chunk()
+
+    logger.info(
+        f"History scan of {commits} commits complete: found {len(findings)} potential secrets "
+        f"({repeated} repeated file changes skipped)"
+    )
+    return findings
+
+
+def _json_finding(finding: HistoryFinding) -> dict:
+    secret = finding.secret
+    record: dict = {"commit": finding.commit} if finding.commit else {}
+    record.update(
+        file_path=secret.file_path,
+        line_number=secret.line_number,
+        secret_type=secret.secret_type,
+        matched_text=secret.matched_text[: HistoryScan.REPORT_MATCH_PREFIX_LENGTH] + "...",
+        fingerprint=secret.fingerprint,
+    )
+    return record
+
+
+def format_json_report(findings: list[HistoryFinding]) -> str:
+    """Render findings as a JSON list.
+
+    Reports often end up in CI artifacts, so they leave out the source line and keep only the
+    start of each match; the fingerprint identifies the secret.
+
+    Args:
+        findings: Findings to report
+
+    Returns:
+        JSON text with one object per finding
+    """
+    return json.dumps([_json_finding(finding) for finding in findings], indent=2)
+
+
+def _rule_id(secret_type: str) -> str:
+    return secret_type.lower().replace(" ", "-")
+
+
+def format_sarif_report(findings: list[HistoryFinding]) -> str:
+    """Render findings as a SARIF 2.1.0 log.
+
+    Args:
+        findings: Findings to report
+
+    Returns:
+        SARIF JSON text with one result per finding
+    """
+    rule_ids = sorted(
+        {_rule_id(finding.secret.secret_type): finding.secret.secret_type for finding in findings}.items()
+    )
+    results = []
+    for finding in findings:
+        secret = finding.secret
+        location: dict = {"artifactLocation": {"uri": secret.file_path}}
+        if secret.line_number:
+            location["region"] = {"startLine": secret.line_number}
+        where = f"commit {finding.commit}" if finding.commit else "staged changes"
+        result: dict = {
+            "ruleId": _rule_id(secret.secret_type),
+            "level": "error",
+            "message": {"text": f"{secret.secret_type} added in {where}"},
+            "locations": [{"physicalLocation": location}],
+        }
+        if finding.commit:
+            result["properties"] = {"commit": finding.commit}
+        if secret.fingerprint:
+            result["partialFingerprints"] = {HistoryScan.SARIF_FINGERPRINT_KEY: secret.fingerprint}
+        results.append(result)
+
+    log = {
+        "$schema": HistoryScan.SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "gac",
+                        "version": __version__,
+                        "informationUri": HistoryScan.INFORMATION_URI,
+                        "rules": [
+                            {"id": rule_id, "name": name, "shortDescription": {"text": f"Potential {name}"}}
+                            for rule_id, name in rule_ids
+                        ],
+                    }
+                },
+                "results": results,
+            }
+        ],
+    }
+    return json.dumps(log, indent=2)
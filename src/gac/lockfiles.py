@@ -0,0 +1,274 @@
+"""Dependency summaries of lockfile changes.
+
+Lockfile diffs are long and mostly noise (hashes, resolved URLs, integrity fields), but the
+dependencies they move are a useful signal for a commit message. This module parses both sides of
+a lockfile into package versions and renders the difference compactly, e.g.
+``bumped httpx 0.27.2→0.28.1, added tiktoken 0.12.0``.
+
+Parsers work line by line on streams, holding only the package versions seen so far, so that
+lockfiles of tens of megabytes can be read straight from git without loading them into memory.
+"""
+
+import logging
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+
+from gac.constants import Lockfiles
+from gac.diff_sections import section_blob_ids, section_filename, split_hunks
+from gac.errors import GitError
+from gac.git import iter_blob_lines
+
+logger = logging.getLogger(__name__)
+
+PackageVersions = dict[str, set[str]]
+
+_JSON_OBJECT_START_RE = re.compile(r'^\s*(?:"((?:[^"\\]|\\.)*)"\s*:\s*)?\{\s*$')
+_JSON_OBJECT_END_RE = re.compile(r"^\s*\},?\s*$")
+_JSON_VERSION_RE = re.compile(r'^\s*"version"\s*:\s*"([^"]*)"')
+_YARN_VERSION_RE = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?')
+_PNPM_V5_KEY_RE = re.compile(r"^((?:@[^/]+/)?[^/@]+)/([^/_]+)")
+_TOML_FIELD_RE = re.compile(r'^(name|version)\s*=\s*"([^"]*)"')
+_GEM_SPEC_RE = re.compile(r"^ {4}(\S+) \(([^)]+)\)\s*$")
+
+
+def _npm_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse a pretty-printed package-lock.json (lockfile v1 to v3).
+
+    Objects are tracked by their opening and closing lines. A "version" field belongs to a package
+    when its object is a child of "packages" (v2+, keyed by node_modules path) or "dependencies"
+    (v1). Objects whose parent is not visible, as in diff hunks, are accepted when keyed by path.
+    """
+    stack: list[str | None] = []
+    for line in lines:
+        if match := _JSON_OBJECT_START_RE.match(line):
+            stack.append(match.group(1))
+        elif _JSON_OBJECT_END_RE.match(line):
+            if stack:
+                stack.pop()
+        elif (match := _JSON_VERSION_RE.match(line)) and stack and stack[-1]:
+            key = stack[-1]
+            parent = stack[-2] if len(stack) > 1 else None
+            if parent in ("packages", "dependencies") or (len(stack) == 1 and key.startswith("node_modules/")):
+                yield key.rsplit("node_modules/", 1)[-1], match.group(1)
+
+
+def _yarn_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse a yarn.lock, in either the classic or the Berry (YAML) format."""
+    name = None
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line[0].isspace():
+            # Entry header, e.g. '"@babel/core@^7.0.0", "@babel/core@^7.1.0":'
+            spec = line.rstrip().rstrip(":").split(",")[0].strip().strip('"')
+            at = spec.find("@", 1)
+            name = spec[:at] if at > 0 else spec
+            if name.startswith("__"):
+                name = None
+        elif name and (match := _YARN_VERSION_RE.match(line)):
+            yield name, match.group(1)
+            name = None
+
+
+def _pnpm_package_key(key: str) -> tuple[str, str] | None:
+    """Split a pnpm package key into name and version.
+
+    Keys are '/name/1.0.0_peer@2.0.0' in lockfile v5, '/name@1.0.0(peer@2.0.0)' in v6 and
+    'name@1.0.0' in v9.
+    """
+    key = key.strip("'\"").lstrip("/").split("(")[0]
+    if match := _PNPM_V5_KEY_RE.match(key):
+        return match.group(1), match.group(2)
+    at = key.rfind("@")
+    if at > 0:
+        return key[:at], key[at + 1 :]
+    return None
+
+
+def _pnpm_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse the top-level "packages" mapping of a pnpm-lock.yaml."""
+    in_packages = False
+    for line in lines:
+        if not line.strip():
+            continue
+        if not line[0].isspace():
+            in_packages = line.rstrip() == "packages:"
+        elif in_packages and line.startswith("  ") and not line[2].isspace() and line.rstrip().endswith(":"):
+            package = _pnpm_package_key(line.strip()[:-1])
+            if package:
+                yield package
+
+
+def _toml_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse the [[package]] tables of poetry.lock, uv.lock and Cargo.lock."""
+    in_package = False
+    fields: dict[str, str] = {}
+    for line in lines:
+        if line.startswith("["):
+            if "name" in fields and "version" in fields:
+                yield fields["name"], fields["version"]
+            fields = {}
+            in_package = line.strip() == "[[package]]"
+        elif in_package and (match := _TOML_FIELD_RE.match(line)):
+            fields[match.group(1)] = match.group(2)
+    if "name" in fields and "version" in fields:
+        yield fields["name"], fields["version"]
+
+
+def _gosum_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse a go.sum, where each line is '<module> <version>[/go.mod] <hash>'."""
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3:
+            yield parts[0], parts[1].removesuffix("/go.mod")
+
+
+def _bundler_packages(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse the resolved gem specs of a Gemfile.lock."""
+    for line in lines:
+        if match := _GEM_SPEC_RE.match(line):
+            yield match.group(1), match.group(2)
+
+
+_PARSERS: dict[str, Callable[[Iterable[str]], Iterator[tuple[str, str]]]] = {
+    "npm": _npm_packages,
+    "yarn": _yarn_packages,
+    "pnpm": _pnpm_packages,
+    "toml": _toml_packages,
+    "gosum": _gosum_packages,
+    "bundler": _bundler_packages,
+}
+
+
+def lockfile_format(filename: str) -> str | None:
+    """Get the parser format for a lockfile path, or None if it is not a supported lockfile."""
+    return Lockfiles.FORMATS.get(os.path.basename(filename))
+
+
+def parse_lockfile(lines: Iterable[str], lockfile_type: str) -> PackageVersions:
+    """Collect the package versions pinned by a lockfile.
+
+    Args:
+        lines: Lines of the lockfile, which may be a stream
+        lockfile_type: Parser format, as given by lockfile_format
+
+    Returns:
+        Mapping of package name to the versions it is locked at
+    """
+    packages: PackageVersions = {}
+    for name, version in _PARSERS[lockfile_type](lines):
+        packages.setdefault(name, set()).add(version)
+    return packages
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(number) for number in re.findall(r"\d+", version))
+
+
+def _join_versions(versions: set[str]) -> str:
+    return ", ".join(sorted(versions, key=lambda version: (_version_key(version), version)))
+
+
+def describe_package_changes(old: PackageVersions, new: PackageVersions) -> list[str]:
+    """Describe how locked package versions changed, one entry per package, sorted by name.
+
+    Args:
+        old: Package versions before the change
+        new: Package versions after the change
+
+    Returns:
+        Descriptions such as 'bumped httpx 0.27.2→0.28.1' or 'added tiktoken 0.12.0'
+    """
+    changes = []
+    for name in sorted(old.keys() | new.keys()):
+        old_versions = old.get(name, set())
+        new_versions = new.get(name, set())
+        if old_versions == new_versions:
+            continue
+        dropped = old_versions - new_versions
+        introduced = new_versions - old_versions
+        if not old_versions:
+            changes.append(f"added {name} {_join_versions(new_versions)}")
+        elif not new_versions:
+            changes.append(f"removed {name} {_join_versions(old_versions)}")
+        elif len(dropped) == 1 and len(introduced) == 1:
+            old_version, new_version = next(iter(dropped)), next(iter(introduced))
+            verb = "downgraded" if _version_key(new_version) < _version_key(old_version) else "bumped"
+            changes.append(f"{verb} {name} {old_version}→{new_version}")
+        elif dropped and introduced:
+            changes.append(f"changed {name} {_join_versions(dropped)}→{_join_versions(introduced)}")
+        elif introduced:
+            changes.append(f"added {name} {_join_versions(introduced)} alongside {_join_versions(old_versions)}")
+        else:
+            changes.append(f"removed {name} {_join_versions(dropped)}, kept {_join_versions(new_versions)}")
+    return changes
+
+
+def _hunk_sides(hunk: str) -> tuple[list[str], list[str]]:
+    """Reconstruct the visible old and new lines of a hunk, context included on both sides."""
+    old_lines, new_lines = [], []
+    for line in hunk.split("\n")[1:]:
+        marker, content = line[:1], line[1:]
+        if marker in (" ", "-"):
+            old_lines.append(content)
+        if marker in (" ", "+"):
+            new_lines.append(content)
+    return old_lines, new_lines
+
+
+def _packages_from_hunks(section: str, lockfile_type: str) -> tuple[PackageVersions, PackageVersions]:
+    """Parse the package versions visible in a section's hunks, for when the blobs can't be read."""
+    old: PackageVersions = {}
+    new: PackageVersions = {}
+    for hunk in split_hunks(section)[1]:
+        old_lines, new_lines = _hunk_sides(hunk)
+        for side, lines in ((old, old_lines), (new, new_lines)):
+            for name, versions in parse_lockfile(lines, lockfile_type).items():
+                side.setdefault(name, set()).update(versions)
+    return old, new
+
+
+def _packages_from_blobs(
+    old_id: str | None, new_id: str | None, lockfile_type: str
+) -> tuple[PackageVersions, PackageVersions]:
+    """Parse both sides of a lockfile, streamed from git. Raises GitError if a blob can't be read."""
+    old = parse_lockfile(iter_blob_lines(old_id), lockfile_type) if old_id else {}
+    new = parse_lockfile(iter_blob_lines(new_id), lockfile_type) if new_id else {}
+    return old, new
+
+
+def summarize_lockfile_section(section: str) -> str | None:
+    """Summarize the dependency changes in a lockfile's diff section.
+
+    Both versions of the file are streamed from git and parsed in full. If they can't be read, only
+    the package versions visible in the diff hunks are compared.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        A note such as '[Lockfile change: bumped httpx 0.27.2→0.28.1]', or None if the file is not a
+        supported lockfile or no dependency changes were found
+    """
+    filename = section_filename(section)
+    lockfile_type = lockfile_format(filename) if filename else None
+    if lockfile_type is None:
+        return None
+
+    old_id, new_id = section_blob_ids(section)
+    try:
+        if old_id is None and new_id is None:
+            raise GitError("no blob IDs in diff section")
+        old, new = _packages_from_blobs(old_id, new_id, lockfile_type)
+    except GitError as e:
+        logger.debug(f"Summarizing {filename} from its diff hunks: {e}")
+        old, new = _packages_from_hunks(section, lockfile_type)
+
+    changes = describe_package_changes(old, new)
+    if not changes:
+        return None
+    listed = changes[: Lockfiles.MAX_CHANGES]
+    if len(changes) > len(listed):
+        listed.append(f"and {len(changes) - len(listed)} more")
+    return f"[Lockfile change: {', '.join(listed)}]"
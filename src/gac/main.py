@@ -5,25 +5,40 @@ prompt building, AI generation, and commit/push operations. This module contains
 
 import logging
 import sys
+from concurrent.futures import Future
+from typing import Any
 
 import click
 from rich.console import Console
 from rich.panel import Panel
 
 from gac.ai import generate_commit_message
-from gac.ai_utils import count_tokens
+from gac.ai_utils import count_tokens, warm_tokenizer
 from gac.config import load_config
-from gac.constants import EnvDefaults, Utility
+from gac.constants import DiffFormat, EnvDefaults, RenameDetection
+from gac.diff_render import resolve_diff_format
+from gac.entropy import thresholds_from_config
 from gac.errors import AIError, GitError, handle_error
 from gac.git import (
+    get_index_tree,
+    get_staged_blob_ids,
     get_staged_files,
+    get_staged_numstat,
+    get_status,
+    hooks_configured,
     push_changes,
     run_git_command,
     run_lefthook_hooks,
     run_pre_commit_hooks,
+    unstage_files,
 )
+from gac.model_catalog import ModelLimits, calculate_prompt_token_budget, get_model_limits
+from gac.pipeline import Pipeline, format_timings, run_in_background
 from gac.preprocess import preprocess_diff
-from gac.prompt import build_prompt, clean_commit_message
+from gac.prompt import build_prompt, clean_commit_message, plan_diff_token_budget
+from gac.prune import prune_diff, prune_diff_stat, section_paths
+from gac.rollup import FileChangeStat
+from gac.secrets_baseline import filter_baselined, load_baseline
 from gac.security import get_affected_files, scan_staged_diff
 
 logger = logging.getLogger(__name__)
@@ -32,6 +47,80 @@ config = load_config()
 console = Console()  # Initialize console globally to prevent undefined access
 
 
+def _run_hooks() -> str | None:
+    """Run lefthook, then pre-commit hooks.
+
+    Returns:
+        The name of the hooks that failed, or None if they passed
+    """
+    if not run_lefthook_hooks():
+        return "Lefthook"
+    if not run_pre_commit_hooks():
+        return "Pre-commit"
+    return None
+
+
+def _build_prompts(
+    status: str,
+    diff: str,
+    diff_stat: str,
+    file_changes: list[FileChangeStat],
+    model: str,
+    model_limits: ModelLimits | None,
+    max_output_tokens: int,
+    prompt_options: dict[str, Any],
+) -> tuple[str, str]:
+    """Budget, preprocess and render the prompts for the staged changes.
+
+    Returns:
+        Tuple of (system prompt, user prompt)
+    """
+    # Budget the prompt from the model's context window, and give the diff what the rest of the prompt leaves
+    prompt_token_budget = calculate_prompt_token_budget(model_limits, max_output_tokens)
+    diff_token_limit = plan_diff_token_budget(
+        prompt_token_budget, status=status, diff=diff, diff_stat=diff_stat, model=model, **prompt_options
+    )
+    logger.info(f"Prompt budget: {prompt_token_budget} tokens, {diff_token_limit} for the diff")
+
+    diff_token_limit_value = config.get("diff_token_limit")
+    if diff_token_limit_value:
+        diff_token_limit = min(diff_token_limit, int(diff_token_limit_value))
+
+    # Preprocess the diff before passing to build_prompt
+    logger.debug(f"Preprocessing diff ({len(diff)} characters)")
+    diff_format_value = config.get("diff_format")
+    diff_context_lines_value = config.get("diff_context_lines")
+    processed_diff = preprocess_diff(
+        diff,
+        token_limit=diff_token_limit,
+        model=model,
+        diff_format=resolve_diff_format(model, diff_format_value if isinstance(diff_format_value, str) else None),
+        context_lines=(
+            int(diff_context_lines_value) if diff_context_lines_value is not None else DiffFormat.DEFAULT_CONTEXT_LINES
+        ),
+    )
+    logger.debug(f"Processed diff ({len(processed_diff)} characters)")
+
+    return build_prompt(
+        status=status,
+        processed_diff=processed_diff,
+        diff_stat=diff_stat,
+        token_budget=prompt_token_budget,
+        model=model,
+        file_changes=file_changes,
+        **prompt_options,
+    )
+
+
+def _conversation(system_prompt: str, user_prompt: str) -> list[dict[str, str]]:
+    """Start a conversation with the system and user prompts."""
+    conversation_messages: list[dict[str, str]] = []
+    if system_prompt:
+        conversation_messages.append({"role": "system", "content": system_prompt})
+    conversation_messages.append({"role": "user", "content": user_prompt})
+    return conversation_messages
+
+
 def main(
     stage_all: bool = False,
     model: str | None = None,
@@ -47,6 +136,7 @@ def main(
     no_verify: bool = False,
     skip_secret_scan: bool = False,
     language: str | None = None,
+    speculate: bool = False,
 ) -> None:
     """Main application logic for gac."""
     try:
@@ -92,28 +182,154 @@ def main(
         )
         sys.exit(0)
 
-    # Run pre-commit and lefthook hooks before doing expensive operations
-    if not no_verify and not dry_run:
-        # Run lefthook hooks
-        if not run_lefthook_hooks():
-            console.print("[red]Lefthook hooks failed. Please fix the issues and try again.[/red]")
-            console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
-            sys.exit(1)
+    system_template_path_value = config.get("system_prompt_path")
+    system_template_path: str | None = (
+        system_template_path_value if isinstance(system_template_path_value, str) else None
+    )
 
-        # Run pre-commit hooks
-        if not run_pre_commit_hooks():
-            console.print("[red]Pre-commit hooks failed. Please fix the issues and try again.[/red]")
-            console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
-            sys.exit(1)
+    # Use language parameter if provided, otherwise fall back to config
+    if language is None:
+        language_value = config.get("language")
+        language = language_value if isinstance(language_value, str) else None
+
+    translate_prefixes_value = config.get("translate_prefixes")
+    translate_prefixes: bool = bool(translate_prefixes_value) if isinstance(translate_prefixes_value, bool) else False
 
-    status = run_git_command(["status"])
-    diff = run_git_command(["diff", "--staged"])
-    diff_stat = " " + run_git_command(["diff", "--stat", "--cached"])
+    prompt_options: dict[str, Any] = {
+        "one_liner": one_liner,
+        "hint": hint,
+        "infer_scope": infer_scope,
+        "verbose": verbose,
+        "system_template_path": system_template_path,
+        "language": language,
+        "translate_prefixes": translate_prefixes,
+    }
+
+    warning_limit_val = config.get("warning_limit_tokens", EnvDefaults.WARNING_LIMIT_TOKENS)
+    assert warning_limit_val is not None
+    warning_limit = int(warning_limit_val)
+
+    # Independent work runs concurrently: git output is collected and scanned while hooks run, and
+    # the tokenizer and model limits load alongside
+    run_hooks = not no_verify and not dry_run and hooks_configured()
+    entropy_thresholds = thresholds_from_config(config)
+    catalog_path_value = config.get("model_catalog_path")
+    assert model is not None
+    model_name = model
+
+    pipeline = Pipeline()
+    pipeline.add("tokenizer", lambda: warm_tokenizer(model_name))
+    pipeline.add(
+        "model_limits",
+        lambda: get_model_limits(model_name, catalog_path_value if isinstance(catalog_path_value, str) else None),
+    )
+    # Stages reading git run without optional locks, so they never hold the index lock that hooks'
+    # git add and the write-tree snapshots need
+    pipeline.add(
+        "diff",
+        lambda: run_git_command(["diff", "--staged", *RenameDetection.DIFF_ARGS], optional_locks=False),
+    )
+    pipeline.add(
+        "diff_stat",
+        lambda: " " + run_git_command(["diff", "--stat", "--cached", *RenameDetection.DIFF_ARGS], optional_locks=False),
+    )
+    pipeline.add("numstat", get_staged_numstat)
+    if run_hooks:
+        # Hooks may restage files, so the index is snapshotted before they start and compared after
+        pipeline.add("index_tree", get_index_tree)
+        pipeline.add("hooks", lambda _: _run_hooks(), after=("index_tree",))
+        pipeline.add("index_tree_after_hooks", lambda _: get_index_tree(), after=("hooks",))
+        # The status also shows the working tree, which hooks may change
+        pipeline.add("status", lambda _: get_status(), after=("hooks",))
+    else:
+        pipeline.add("status", get_status)
+    if not skip_secret_scan:
+        pipeline.add("blob_ids", get_staged_blob_ids)
+        pipeline.add(
+            "secret_scan",
+            lambda diff, blob_ids: scan_staged_diff(diff, blob_ids=blob_ids, entropy_thresholds=entropy_thresholds),
+            after=("diff", "blob_ids"),
+        )
+        pipeline.add("baseline", lambda: load_baseline(git_dir))
+
+    if speculate and run_hooks:
+        # The message is generated from the staged content before hooks run, and used only if the
+        # prompt is unchanged once they have. Prompts with potential secrets are never sent early
+        def start_speculation(
+            status: str,
+            diff: str,
+            diff_stat: str,
+            file_changes: list[FileChangeStat],
+            model_limits: ModelLimits | None,
+            *scan: Any,
+        ) -> tuple[list[dict[str, str]], Future[str]] | None:
+            if scan and filter_baselined(scan[0], scan[1]):
+                logger.info("Not generating speculatively: potential secrets were found")
+                return None
+            try:
+                conversation = _conversation(
+                    *_build_prompts(
+                        status,
+                        diff,
+                        diff_stat,
+                        file_changes,
+                        model_name,
+                        model_limits,
+                        max_output_tokens,
+                        prompt_options,
+                    )
+                )
+            except Exception as e:
+                # The prompt is built again after the hooks, where errors are reported
+                logger.debug(f"Not generating speculatively: {e}")
+                return None
+            if warning_limit and count_tokens(conversation, model_name) > warning_limit:
+                logger.info("Not generating speculatively: the prompt exceeds the warning limit")
+                return None
+            logger.info("Generating the commit message while hooks run")
+            return conversation, run_in_background(
+                generate_commit_message,
+                model=model_name,
+                prompt=list(conversation),
+                temperature=temperature,
+                max_tokens=max_output_tokens,
+                max_retries=max_retries,
+                quiet=True,
+            )
+
+        # Without the index lock, so the hooks' git add and the write-tree snapshots can't fail on it
+        pipeline.add("status_before_hooks", get_status)
+        scan_stages = () if skip_secret_scan else ("secret_scan", "baseline")
+        pipeline.add(
+            "speculation",
+            start_speculation,
+            after=("status_before_hooks", "diff", "diff_stat", "numstat", "model_limits", *scan_stages),
+        )
+
+    stages = pipeline.run()
+    logger.info(f"Stage timings:\n{format_timings(stages)}")
+
+    if run_hooks and stages["hooks"] is not None:
+        console.print(f"[red]{stages['hooks']} hooks failed. Please fix the issues and try again.[/red]")
+        console.print("[yellow]You can use --no-verify to skip pre-commit and lefthook hooks.[/yellow]")
+        sys.exit(1)
+
+    status = stages["status"]
+    diff = stages["diff"]
+    diff_stat = stages["diff_stat"]
+    file_changes = stages["numstat"]
+    secrets = stages.results.get("secret_scan", [])
+    if run_hooks and (stages["index_tree"] is None or stages["index_tree"] != stages["index_tree_after_hooks"]):
+        logger.info("Hooks changed the staged content, collecting it again")
+        diff = run_git_command(["diff", "--staged", *RenameDetection.DIFF_ARGS])
+        diff_stat = " " + run_git_command(["diff", "--stat", "--cached", *RenameDetection.DIFF_ARGS])
+        file_changes = get_staged_numstat()
+        if not skip_secret_scan:
+            secrets = scan_staged_diff(diff, blob_ids=get_staged_blob_ids(), entropy_thresholds=entropy_thresholds)
 
     # Security scan for secrets
     if not skip_secret_scan:
-        logger.info("Scanning staged changes for potential secrets...")
-        secrets = scan_staged_diff(diff)
+        secrets = filter_baselined(secrets, stages["baseline"])
         if secrets:
             if not quiet:
                 console.print("\n[bold red]⚠️  SECURITY WARNING: Potential secrets detected![/bold red]")
@@ -154,58 +370,32 @@ def main(
                 console.print("[bold yellow]⚠️  Continuing with potential secrets in commit...[/bold yellow]")
                 logger.warning("User chose to continue despite detected secrets")
             elif choice == "r":
-                affected_files = get_affected_files(secrets)
-                for file_path in affected_files:
-                    try:
-                        run_git_command(["reset", "HEAD", file_path])
-                        console.print(f"[green]Unstaged: {file_path}[/green]")
-                    except GitError as e:
-                        console.print(f"[red]Failed to unstage {file_path}: {e}[/red]")
+                # Prune the files from the git output already collected rather than collecting it again
+                diff, removed_sections = prune_diff(diff, get_affected_files(secrets))
+                unstaged_paths = {path for section in removed_sections for path in section_paths(section) or ()}
+                unstaged = sorted(unstaged_paths)
+                if not unstage_files(unstaged):
+                    console.print(f"[red]Failed to unstage {', '.join(unstaged)}. Commit aborted.[/red]")
+                    sys.exit(1)
+                for file_path in unstaged:
+                    console.print(f"[green]Unstaged: {file_path}[/green]")
 
                 # Check if there are still staged files
-                remaining_staged = get_staged_files(existing_only=False)
+                remaining_staged = [file_path for file_path in staged_files if file_path not in unstaged_paths]
                 if not remaining_staged:
                     console.print("[yellow]No files remain staged. Commit aborted.[/yellow]")
                     sys.exit(0)
 
                 console.print(f"[green]Continuing with {len(remaining_staged)} staged file(s)...[/green]")
-                # Refresh all git state variables after removing files
-                status = run_git_command(["status"])
-                diff = run_git_command(["diff", "--staged"])
-                diff_stat = " " + run_git_command(["diff", "--stat", "--cached"])
+                # The unstaged files move to other parts of the status, so it is collected again
+                status = get_status()
+                diff_stat = prune_diff_stat(diff_stat, removed_sections)
+                file_changes = [change for change in file_changes if change.path not in unstaged_paths]
         else:
             logger.info("No secrets detected in staged changes")
 
-    # Preprocess the diff before passing to build_prompt
-    logger.debug(f"Preprocessing diff ({len(diff)} characters)")
-    assert model is not None
-    processed_diff = preprocess_diff(diff, token_limit=Utility.DEFAULT_DIFF_TOKEN_LIMIT, model=model)
-    logger.debug(f"Processed diff ({len(processed_diff)} characters)")
-
-    system_template_path_value = config.get("system_prompt_path")
-    system_template_path: str | None = (
-        system_template_path_value if isinstance(system_template_path_value, str) else None
-    )
-
-    # Use language parameter if provided, otherwise fall back to config
-    if language is None:
-        language_value = config.get("language")
-        language = language_value if isinstance(language_value, str) else None
-
-    translate_prefixes_value = config.get("translate_prefixes")
-    translate_prefixes: bool = bool(translate_prefixes_value) if isinstance(translate_prefixes_value, bool) else False
-
-    system_prompt, user_prompt = build_prompt(
-        status=status,
-        processed_diff=processed_diff,
-        diff_stat=diff_stat,
-        one_liner=one_liner,
-        hint=hint,
-        infer_scope=infer_scope,
-        verbose=verbose,
-        system_template_path=system_template_path,
-        language=language,
-        translate_prefixes=translate_prefixes,
+    system_prompt, user_prompt = _build_prompts(
+        status, diff, diff_stat, file_changes, model, stages["model_limits"], max_output_tokens, prompt_options
     )
 
     if show_prompt:
@@ -219,10 +409,21 @@ def main(
             )
         )
 
-    conversation_messages: list[dict[str, str]] = []
-    if system_prompt:
-        conversation_messages.append({"role": "system", "content": system_prompt})
-    conversation_messages.append({"role": "user", "content": user_prompt})
+    conversation_messages = _conversation(system_prompt, user_prompt)
+
+    speculative_message = None
+    speculation = stages.results.get("speculation")
+    if speculation is not None:
+        speculative_conversation, pending_message = speculation
+        tree_unchanged = stages["index_tree"] is not None and stages["index_tree"] == stages["index_tree_after_hooks"]
+        if tree_unchanged and speculative_conversation == conversation_messages:
+            try:
+                speculative_message = pending_message.result()
+                logger.info("Using the commit message generated while hooks ran")
+            except AIError as e:
+                logger.info(f"Speculative generation failed, generating again: {e}")
+        else:
+            logger.info("The prompt changed while hooks ran, discarding the speculative commit message")
 
     try:
         first_iteration = True
@@ -231,9 +432,6 @@ def main(
             prompt_tokens = count_tokens(conversation_messages, model)
 
             if first_iteration:
-                warning_limit_val = config.get("warning_limit_tokens", EnvDefaults.WARNING_LIMIT_TOKENS)
-                assert warning_limit_val is not None
-                warning_limit = int(warning_limit_val)
                 if warning_limit and prompt_tokens > warning_limit:
                     console.print(
                         f"[yellow]⚠️  WARNING: Prompt contains {prompt_tokens} tokens, which exceeds the warning limit of "
@@ -247,14 +445,17 @@ def main(
 
             first_iteration = False
 
-            raw_commit_message = generate_commit_message(
-                model=model,
-                prompt=conversation_messages,
-                temperature=temperature,
-                max_tokens=max_output_tokens,
-                max_retries=max_retries,
-                quiet=quiet,
-            )
+            if speculative_message is not None:
+                raw_commit_message, speculative_message = speculative_message, None
+            else:
+                raw_commit_message = generate_commit_message(
+                    model=model,
+                    prompt=conversation_messages,
+                    temperature=temperature,
+                    max_tokens=max_output_tokens,
+                    max_retries=max_retries,
+                    quiet=quiet,
+                )
             # Clean the commit message (no automatic prefix enforcement)
             commit_message = clean_commit_message(raw_commit_message)
 
@@ -0,0 +1,106 @@
+"""Model context-window catalog for gac.
+
+This module resolves a provider:model string to its context window and maximum output tokens,
+using the bundled catalog in constants plus optional user overrides, and derives the token
+budget available for the prompt from the context window.
+"""
+
+import fnmatch
+import json
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from gac.constants import ModelCatalog, PromptBudget
+from gac.errors import ConfigError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Context window and output limits for a model."""
+
+    context_window: int
+    max_output_tokens: int
+
+
+@lru_cache(maxsize=8)
+def load_model_catalog(catalog_path: str | None = None) -> dict[str, tuple[int, int]]:
+    """Load the model catalog, with user entries taking precedence over bundled ones.
+
+    The user file is JSON mapping provider:model patterns to limits, for example
+    ``{"ollama:qwen2.5-coder:32b": {"context_window": 32768, "max_output_tokens": 4096}}``.
+
+    Args:
+        catalog_path: Path to a user catalog file. Defaults to GAC_MODEL_CATALOG_PATH or ~/.gac.models.json
+
+    Returns:
+        Ordered mapping of pattern to (context window, max output tokens)
+
+    Raises:
+        ConfigError: If the user catalog file exists but is malformed
+    """
+    path_value = catalog_path or os.getenv("GAC_MODEL_CATALOG_PATH") or ModelCatalog.DEFAULT_USER_PATH
+    path = Path(path_value).expanduser()
+
+    user_entries: dict[str, tuple[int, int]] = {}
+    if path.is_file():
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            for pattern, limits in raw.items():
+                context_window = int(limits["context_window"])
+                max_output_tokens = int(limits.get("max_output_tokens", context_window))
+                user_entries[pattern] = (context_window, max_output_tokens)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ConfigError(
+                f"Invalid model catalog file: {path}",
+                details=str(e),
+                suggestion='Entries must look like {"provider:model": {"context_window": 32768}}',
+            ) from e
+        logger.debug(f"Loaded {len(user_entries)} model catalog entries from {path}")
+
+    return {**user_entries, **{k: v for k, v in ModelCatalog.MODELS.items() if k not in user_entries}}
+
+
+def get_model_limits(model: str, catalog_path: str | None = None) -> ModelLimits | None:
+    """Look up the limits of a model in the catalog.
+
+    Args:
+        model: Model identifier in provider:model format
+        catalog_path: Optional path to a user catalog file
+
+    Returns:
+        The model's limits, or None if the model is not cataloged
+    """
+    catalog = load_model_catalog(catalog_path)
+    model_key = model.lower()
+
+    if model_key in catalog:
+        return ModelLimits(*catalog[model_key])
+
+    for pattern, limits in catalog.items():
+        if fnmatch.fnmatchcase(model_key, pattern.lower()):
+            return ModelLimits(*limits)
+
+    return None
+
+
+def calculate_prompt_token_budget(limits: ModelLimits | None, max_output_tokens: int) -> int:
+    """Derive the prompt token budget from the model's context window.
+
+    Args:
+        limits: The model's limits, or None if the model is not cataloged
+        max_output_tokens: Output tokens requested from the model
+
+    Returns:
+        Token budget for the whole prompt (system and user messages)
+    """
+    if limits is None:
+        return PromptBudget.DEFAULT_TOKEN_LIMIT
+
+    reserved_output_tokens = min(max_output_tokens, limits.max_output_tokens)
+    safety_margin = int(limits.context_window * ModelCatalog.SAFETY_MARGIN)
+    return max(limits.context_window - reserved_output_tokens - safety_margin, 0)
@@ -0,0 +1,187 @@
+"""Detection of code moved between files.
+
+Extract-module refactors show moved code twice: as removed lines in one file and added lines in
+another. This module finds blocks of removed lines that reappear as added lines in a different
+file by hashing windows of whitespace-normalized lines, drops both copies and leaves a marker such
+as ``[Moved 240 lines from a.py to b.py]``. Lines edited during the move don't match and are kept.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from gac.constants import MovedCode
+from gac.diff_sections import section_filename, split_hunks
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Run:
+    """Consecutive added or removed lines of a hunk, with blank lines left out."""
+
+    section_index: int
+    filename: str
+    positions: list[tuple[int, int]] = field(default_factory=list)  # (hunk index, line index)
+    normalized: list[str] = field(default_factory=list)
+
+
+def _changed_runs(section_index: int, filename: str, hunks: list[list[str]], marker: str) -> list[_Run]:
+    """Collect the runs of lines starting with marker in a section's hunks."""
+    runs = []
+    for hunk_index, lines in enumerate(hunks):
+        run = None
+        for line_index, line in enumerate(lines):
+            if not line.startswith(marker) or line.startswith(marker * 3 + " "):
+                run = None
+                continue
+            normalized = " ".join(line[1:].split())
+            if not normalized or len(normalized) > MovedCode.MAX_LINE_LENGTH:
+                continue
+            if run is None:
+                run = _Run(section_index, filename)
+                runs.append(run)
+            run.positions.append((hunk_index, line_index))
+            run.normalized.append(normalized)
+    return runs
+
+
+def _window_key(normalized: list[str], start: int) -> str | None:
+    window = normalized[start : start + MovedCode.MIN_LINES]
+    if sum(len(line) for line in window) < MovedCode.MIN_WINDOW_CHARS:
+        return None
+    return "\n".join(window)
+
+
+def collapse_moved_code(sections: list[str]) -> list[str]:
+    """Replace blocks of code moved between files with markers.
+
+    A block is moved when at least MovedCode.MIN_LINES consecutive non-blank removed lines in one
+    file reappear, ignoring whitespace, as added lines in another. Matches are extended line by line
+    as far as the two copies agree. The destination keeps a '[Moved N lines from A to B]' marker and
+    the source a '[N lines moved to B]' marker.
+
+    Args:
+        sections: Git diff sections, one per file
+
+    Returns:
+        Diff sections with moved blocks collapsed
+    """
+    parsed: list[tuple[str, list[list[str]]] | None] = []
+    removed_runs: list[_Run] = []
+    added_runs: list[_Run] = []
+    for section_index, section in enumerate(sections):
+        filename = section_filename(section)
+        header, hunks = split_hunks(section)
+        if filename is None or not hunks:
+            parsed.append(None)
+            continue
+        hunk_lines = [hunk.split("\n") for hunk in hunks]
+        parsed.append((header, hunk_lines))
+        removed_runs.extend(_changed_runs(section_index, filename, hunk_lines, "-"))
+        added_runs.extend(_changed_runs(section_index, filename, hunk_lines, "+"))
+
+    windows: dict[str, list[tuple[int, int]]] = {}
+    for run_index, run in enumerate(removed_runs):
+        for start in range(len(run.normalized) - MovedCode.MIN_LINES + 1):
+            key = _window_key(run.normalized, start)
+            if key is not None:
+                windows.setdefault(key, []).append((run_index, start))
+
+    # (section index, hunk index, line index) -> (source file, destination file)
+    moved: dict[tuple[int, int, int], tuple[str, str]] = {}
+    for added in added_runs:
+        start = 0
+        while start <= len(added.normalized) - MovedCode.MIN_LINES:
+            key = _window_key(added.normalized, start)
+            candidates = [
+                (run_index, offset)
+                for run_index, offset in (windows.get(key, []) if key is not None else [])
+                if removed_runs[run_index].section_index != added.section_index
+            ]
+            if not candidates:
+                start += 1
+                continue
+            run_index, offset = candidates[0]
+            removed = removed_runs[run_index]
+            length = MovedCode.MIN_LINES
+            while (
+                start + length < len(added.normalized)
+                and offset + length < len(removed.normalized)
+                and added.normalized[start + length] == removed.normalized[offset + length]
+            ):
+                length += 1
+            move = (removed.filename, added.filename)
+            for hunk_index, line_index in added.positions[start : start + length]:
+                moved[(added.section_index, hunk_index, line_index)] = move
+            for hunk_index, line_index in removed.positions[offset : offset + length]:
+                moved.setdefault((removed.section_index, hunk_index, line_index), move)
+            start += length
+
+    if not moved:
+        return sections
+
+    result = []
+    for section_index, section in enumerate(sections):
+        parts = parsed[section_index]
+        if parts is None:
+            result.append(section)
+            continue
+        header, hunk_lines = parts
+        result.append(
+            header
+            + "".join(
+                _collapse_hunk(section_index, hunk_index, lines, moved) for hunk_index, lines in enumerate(hunk_lines)
+            )
+        )
+
+    pairs = set(moved.values())
+    logger.info(f"Collapsed {len(moved)} moved lines between {len(pairs)} pairs of files")
+    return result
+
+
+def _collapse_hunk(
+    section_index: int, hunk_index: int, lines: list[str], moved: dict[tuple[int, int, int], tuple[str, str]]
+) -> str:
+    """Rebuild a hunk with each run of moved lines replaced by a marker."""
+    output: list[str] = []
+    pending_blank: list[str] = []
+    current: tuple[str, str, str] | None = None  # (marker, source, destination) of the open run
+    count = 0
+    marker_index = 0
+
+    def close_run() -> None:
+        nonlocal current
+        if current is not None:
+            sign, source, destination = current
+            if sign == "+":
+                output[marker_index] = f"[Moved {count} lines from {source} to {destination}]"
+            else:
+                output[marker_index] = f"[{count} lines moved to {destination}]"
+        current = None
+
+    for line_index, line in enumerate(lines):
+        move = moved.get((section_index, hunk_index, line_index))
+        if move is not None:
+            sign = line[:1]
+            if current != (sign, *move):
+                close_run()
+                output.extend(pending_blank)
+                current = (sign, *move)
+                count = 0
+                marker_index = len(output)
+                output.append("")
+            else:
+                count += len(pending_blank)
+            pending_blank = []
+            count += 1
+        elif current is not None and line[:1] == current[0] and not line[1:].strip():
+            # Blank lines inside a moved block belong to it
+            pending_blank.append(line)
+        else:
+            close_run()
+            output.extend(pending_blank)
+            pending_blank = []
+            output.append(line)
+    close_run()
+    output.extend(pending_blank)
+    return "\n".join(output)
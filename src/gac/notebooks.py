@@ -0,0 +1,191 @@
+"""Compact diffs of Jupyter notebooks.
+
+Notebook diffs are dominated by outputs (often base64 images) and execution counts, and the JSON
+line diff is usually filtered as minified or consumes the whole budget. This module parses both
+versions of a notebook and diffs only what the author edited: cell sources and metadata. Output
+changes are summarized as counts by output kind.
+"""
+
+import difflib
+import json
+import logging
+from typing import Any
+
+from gac.config_diff import diff_key_paths
+from gac.constants import Notebooks
+from gac.diff_sections import changed_lines, section_blob_ids, section_filename, split_hunks
+from gac.git import read_blobs
+
+logger = logging.getLogger(__name__)
+
+
+def is_notebook(filename: str) -> bool:
+    """Check if a file is a Jupyter notebook."""
+    return filename.endswith(".ipynb")
+
+
+def _cell_source(cell: dict[str, Any]) -> str:
+    source = cell.get("source", "")
+    return "".join(source) if isinstance(source, list) else str(source)
+
+
+def _output_kinds(outputs: list[dict[str, Any]]) -> list[str]:
+    """Name each output by its type, or its richest MIME type for rich outputs."""
+    kinds = []
+    for output in outputs:
+        output_type = output.get("output_type", "output")
+        if output_type == "error":
+            kinds.append(f"error {output.get('ename', '')}".strip())
+        elif output_type in ("execute_result", "display_data"):
+            mime_types = list(output.get("data", {}))
+            images = [mime for mime in mime_types if mime.startswith("image/")]
+            kinds.append(images[0] if images else (mime_types[0] if mime_types else output_type))
+        else:
+            kinds.append(output_type)
+    return kinds
+
+
+def _normalized_outputs(cell: dict[str, Any]) -> list[Any]:
+    """Cell outputs without execution counts, which change on every run."""
+    return [
+        {key: value for key, value in output.items() if key != "execution_count"} for output in cell.get("outputs", [])
+    ]
+
+
+def _count_kinds(kinds: list[str]) -> str:
+    counts: dict[str, int] = {}
+    for kind in kinds:
+        counts[kind] = counts.get(kind, 0) + 1
+    return ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items()))
+
+
+def _truncate(lines: list[str]) -> list[str]:
+    if len(lines) > Notebooks.MAX_CELL_DIFF_LINES:
+        omitted = len(lines) - Notebooks.MAX_CELL_DIFF_LINES
+        lines = lines[: Notebooks.MAX_CELL_DIFF_LINES] + [f"... {omitted} more lines"]
+    return lines
+
+
+def _source_diff(old_source: str, new_source: str) -> list[str]:
+    diff = difflib.unified_diff(
+        old_source.splitlines(), new_source.splitlines(), n=Notebooks.CONTEXT_LINES, lineterm=""
+    )
+    # Drop the ---/+++ file header lines
+    return _truncate(list(diff)[2:])
+
+
+def diff_notebooks(old: dict[str, Any], new: dict[str, Any]) -> list[str]:
+    """Describe the changes between two notebooks, ignoring outputs and execution counts.
+
+    Cells are aligned by their type and source. Replaced cells are paired in order, so edited
+    cells show a diff of their source.
+
+    Args:
+        old: Parsed old notebook
+        new: Parsed new notebook
+
+    Returns:
+        Lines describing changed cells, output changes and metadata changes
+    """
+    old_cells = old.get("cells", [])
+    new_cells = new.get("cells", [])
+    keys_old = [(cell.get("cell_type"), _cell_source(cell)) for cell in old_cells]
+    keys_new = [(cell.get("cell_type"), _cell_source(cell)) for cell in new_cells]
+
+    lines: list[str] = []
+    changed_cells = 0
+    pairs: list[tuple[int, int]] = []
+
+    def describe(kind: str, index: int, cell: dict[str, Any], body: list[str]) -> None:
+        nonlocal changed_cells
+        changed_cells += 1
+        if changed_cells <= Notebooks.MAX_CELLS:
+            lines.append(f"cell {index + 1} ({cell.get('cell_type', 'unknown')}) {kind}:")
+            lines.extend(f"  {line}" for line in body)
+
+    matcher = difflib.SequenceMatcher(None, keys_old, keys_new, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            pairs.extend(zip(range(old_start, old_end), range(new_start, new_end), strict=True))
+            continue
+        paired = min(old_end - old_start, new_end - new_start)
+        for offset in range(paired):
+            old_cell, new_cell = old_cells[old_start + offset], new_cells[new_start + offset]
+            pairs.append((old_start + offset, new_start + offset))
+            body = _source_diff(_cell_source(old_cell), _cell_source(new_cell))
+            if old_cell.get("cell_type") != new_cell.get("cell_type"):
+                body.insert(0, f"type {old_cell.get('cell_type')} → {new_cell.get('cell_type')}")
+            describe("modified", new_start + offset, new_cell, body)
+        for index in range(new_start + paired, new_end):
+            source_lines = _cell_source(new_cells[index]).splitlines()
+            describe("added", index, new_cells[index], _truncate([f"+{line}" for line in source_lines]))
+        for index in range(old_start + paired, old_end):
+            source_lines = _cell_source(old_cells[index]).splitlines()
+            describe("removed", index, old_cells[index], [f"({len(source_lines)} lines)"])
+
+    if changed_cells > Notebooks.MAX_CELLS:
+        lines.append(f"... and {changed_cells - Notebooks.MAX_CELLS} more changed cells")
+
+    output_cells = 0
+    removed_kinds: list[str] = []
+    added_kinds: list[str] = []
+    metadata_changes: list[str] = []
+    for old_index, new_index in pairs:
+        old_cell, new_cell = old_cells[old_index], new_cells[new_index]
+        if _normalized_outputs(old_cell) != _normalized_outputs(new_cell):
+            output_cells += 1
+            removed_kinds.extend(_output_kinds(old_cell.get("outputs", [])))
+            added_kinds.extend(_output_kinds(new_cell.get("outputs", [])))
+        metadata_changes.extend(
+            diff_key_paths(old_cell.get("metadata", {}), new_cell.get("metadata", {}), f"cell {new_index + 1}.metadata")
+        )
+
+    if output_cells:
+        noun = "cell" if output_cells == 1 else "cells"
+        details = [
+            f"{label} {_count_kinds(kinds)}" for label, kinds in (("was", removed_kinds), ("now", added_kinds)) if kinds
+        ]
+        lines.append(f"outputs changed in {output_cells} {noun}" + (f" ({'; '.join(details)})" if details else ""))
+
+    metadata_changes.extend(diff_key_paths(old.get("metadata", {}), new.get("metadata", {}), "metadata"))
+    lines.extend(metadata_changes[: Notebooks.MAX_METADATA_CHANGES])
+    if len(metadata_changes) > Notebooks.MAX_METADATA_CHANGES:
+        lines.append(f"... and {len(metadata_changes) - Notebooks.MAX_METADATA_CHANGES} more metadata changes")
+    return lines
+
+
+def summarize_notebook_section(section: str) -> str | None:
+    """Replace a notebook's JSON diff with a diff of its cells.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        The section's file header followed by the cell changes, or None if the file is not a
+        notebook or either version can't be read or parsed
+    """
+    filename = section_filename(section)
+    if filename is None or not is_notebook(filename):
+        return None
+
+    old_id, new_id = section_blob_ids(section)
+    blob_ids = [object_id for object_id in (old_id, new_id) if object_id]
+    if not blob_ids:
+        return None
+    blobs = read_blobs(blob_ids)
+    if any(object_id not in blobs for object_id in blob_ids):
+        return None
+    try:
+        old = json.loads(blobs[old_id]) if old_id else {}
+        new = json.loads(blobs[new_id]) if new_id else {}
+    except ValueError as e:
+        logger.debug(f"Keeping diff of unparseable notebook {filename}: {e}")
+        return None
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+
+    header, hunks = split_hunks(section)
+    line_count = sum(len(changed_lines(hunk)) for hunk in hunks)
+    changes = diff_notebooks(old, new) or ["no changes to cell sources, outputs or metadata"]
+    body = "\n".join(f"  {line}" for line in changes)
+    return f"{header.rstrip()}\n[Notebook diff of {line_count} changed JSON lines, outputs omitted:\n{body}]\n"
@@ -0,0 +1,153 @@
+"""Order-preserving parallel map over diff sections.
+
+Section processing is regex-heavy and holds the GIL, so threads give little speedup. This module
+picks a strategy by input size: small inputs are processed inline, and large ones go to a process
+pool. Sections are copied once into a shared memory buffer, and workers receive batches of
+(start, end) offsets into it rather than pickled strings. Results keep the input order, so they
+are the same whichever strategy runs.
+"""
+
+import concurrent.futures
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, TypeVar, cast
+
+from gac.constants import Parallelism, Utility
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class _Unchanged:
+    """Returned by workers in place of results identical to their input, so they aren't sent back."""
+
+
+_UNCHANGED = _Unchanged()
+
+_worker_buffer: shared_memory.SharedMemory | None = None
+
+
+def _attach_buffer(name: str) -> None:
+    """Attach a pool worker to the shared section buffer.
+
+    Pool workers share the parent's resource tracker, which unregisters the buffer when the
+    parent unlinks it.
+    """
+    global _worker_buffer
+    _worker_buffer = shared_memory.SharedMemory(name=name)
+
+
+def _run_batch(func: Callable[[str], Any], spans: list[tuple[int, int]]) -> list[Any]:
+    """Apply func to the sections at the given buffer offsets."""
+    assert _worker_buffer is not None and _worker_buffer.buf is not None
+    view = _worker_buffer.buf
+    results: list[Any] = []
+    for start, end in spans:
+        section = str(view[start:end], "utf-8")
+        result = func(section)
+        results.append(_UNCHANGED if isinstance(result, str) and result == section else result)
+    return results
+
+
+def _make_batches(offsets: list[tuple[int, int]], batch_bytes: int) -> list[list[tuple[int, int]]]:
+    """Group consecutive section offsets into batches of roughly batch_bytes each."""
+    batches: list[list[tuple[int, int]]] = []
+    current: list[tuple[int, int]] = []
+    current_bytes = 0
+    for start, end in offsets:
+        current.append((start, end))
+        current_bytes += end - start
+        if current_bytes >= batch_bytes:
+            batches.append(current)
+            current, current_bytes = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Get the context pool workers are started in.
+
+    Sections may be processed from a thread of the workflow pipeline, and forking a process with
+    other threads running can deadlock the child on a lock one of them held, so workers are
+    started from a fork server where the platform has one.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def map_sections(
+    func: Callable[[str], _T],
+    sections: list[str],
+    max_workers: int | None = None,
+    process_threshold_bytes: int | None = None,
+) -> list[_T]:
+    """Apply func to each section, in parallel processes for large inputs.
+
+    func must be a module-level function so it can be sent to pool workers, and its results
+    must be picklable.
+
+    Args:
+        func: Function to apply to each section
+        sections: Diff sections to process
+        max_workers: Maximum number of worker processes. Defaults to the CPU count
+        process_threshold_bytes: Input size from which a process pool is used. Defaults to
+            Parallelism.PROCESS_THRESHOLD_BYTES
+
+    Returns:
+        Results of func in the same order as sections
+    """
+    workers = max(max_workers or Utility.MAX_WORKERS, 1)
+    if process_threshold_bytes is None:
+        process_threshold_bytes = Parallelism.PROCESS_THRESHOLD_BYTES
+    # Character count is a lower bound on the encoded size, good enough to choose a strategy
+    if workers == 1 or len(sections) < 2 or sum(len(section) for section in sections) < process_threshold_bytes:
+        return [func(section) for section in sections]
+
+    encoded = [section.encode("utf-8") for section in sections]
+    total_bytes = sum(len(data) for data in encoded)
+    offsets = []
+    position = 0
+    for data in encoded:
+        offsets.append((position, position + len(data)))
+        position += len(data)
+    batch_bytes = max(min(Parallelism.BATCH_BYTES, total_bytes // (workers * 4)), 1)
+    batches = _make_batches(offsets, batch_bytes)
+
+    try:
+        buffer = shared_memory.SharedMemory(create=True, size=max(total_bytes, 1))
+    except OSError as e:
+        logger.debug(f"Shared memory unavailable, processing sections inline: {e}")
+        return [func(section) for section in sections]
+
+    try:
+        assert buffer.buf is not None
+        for (start, end), data in zip(offsets, encoded, strict=True):
+            buffer.buf[start:end] = data
+        del encoded
+
+        logger.debug(f"Processing {len(sections)} sections ({total_bytes} bytes) in {len(batches)} batches")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(workers, len(batches)),
+            mp_context=_pool_context(),
+            initializer=_attach_buffer,
+            initargs=(buffer.name,),
+        ) as executor:
+            batch_results = executor.map(_run_batch, [func] * len(batches), batches)
+            results = [result for batch in batch_results for result in batch]
+    except (OSError, BrokenProcessPool) as e:
+        logger.debug(f"Process pool unavailable, processing sections inline: {e}")
+        return [func(section) for section in sections]
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+    return [
+        cast(_T, section) if isinstance(result, _Unchanged) else result
+        for section, result in zip(sections, results, strict=True)
+    ]
@@ -0,0 +1,197 @@
+"""Concurrent execution of the independent stages of the commit workflow.
+
+The workflow's stages form a small dependency graph: hooks, git output collection, the secret
+scan and tokenizer loading mostly wait on subprocesses, files or the network, and many of them
+don't depend on each other. A Pipeline runs each stage in a thread pool as soon as the stages it
+depends on have finished, passing their results to it, and records how long each stage took.
+Stages must not prompt or print; anything interactive happens after the pipeline returns.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from gac.constants import Pipeline as PipelineConstants
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of work, called with the results of the stages it runs after, in their order."""
+
+    name: str
+    func: Callable[..., Any]
+    after: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """When a stage ran, in seconds since the pipeline started."""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class PipelineResult:
+    """Results of a pipeline run by stage name, with the timing of each stage in start order."""
+
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: list[StageTiming] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+
+class Pipeline:
+    """A dependency graph of stages, run concurrently in a thread pool."""
+
+    def __init__(self, max_workers: int = PipelineConstants.MAX_WORKERS):
+        self.max_workers = max_workers
+        self._stages: dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[..., Any], after: tuple[str, ...] = ()) -> None:
+        """Add a stage.
+
+        Args:
+            name: Unique stage name, under which its result is stored
+            func: Called with the results of the after stages as positional arguments
+            after: Names of the stages this one depends on. They may be added later
+
+        Raises:
+            ValueError: If a stage with this name was already added
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        self._stages[name] = Stage(name, func, tuple(after))
+
+    def _check_graph(self) -> None:
+        """Check that every dependency exists and that there are no cycles."""
+        for stage in self._stages.values():
+            for dependency in stage.after:
+                if dependency not in self._stages:
+                    raise ValueError(f"Pipeline stage {stage.name} depends on unknown stage {dependency}")
+
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline stages form a cycle through {name}")
+            visiting.add(name)
+            for dependency in self._stages[name].after:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self._stages:
+            visit(name)
+
+    def run(self) -> PipelineResult:
+        """Run all stages, each as soon as its dependencies have finished.
+
+        Returns:
+            The results and timings of all stages
+
+        Raises:
+            ValueError: If a dependency is unknown or the stages form a cycle
+            Exception: The first exception raised by a stage. Stages not started yet are skipped,
+                and running ones are waited for
+        """
+        self._check_graph()
+        outcome = PipelineResult()
+        started = time.perf_counter()
+        pending = dict(self._stages)
+        running: dict[concurrent.futures.Future, tuple[Stage, float]] = {}
+        timings: list[StageTiming] = []
+
+        def submit_ready(executor: concurrent.futures.ThreadPoolExecutor) -> None:
+            for name, stage in list(pending.items()):
+                if all(dependency in outcome.results for dependency in stage.after):
+                    del pending[name]
+                    arguments = [outcome.results[dependency] for dependency in stage.after]
+                    running[executor.submit(stage.func, *arguments)] = (stage, time.perf_counter() - started)
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="gac-stage"
+        ) as executor:
+            submit_ready(executor)
+            while running:
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    stage, start = running.pop(future)
+                    timings.append(StageTiming(stage.name, start, time.perf_counter() - started))
+                    error = future.exception()
+                    if error is not None:
+                        pending.clear()
+                        concurrent.futures.wait(running)
+                        raise error
+                    outcome.results[stage.name] = future.result()
+                submit_ready(executor)
+
+        outcome.timings = sorted(timings, key=lambda timing: timing.start)
+        outcome.wall_time = time.perf_counter() - started
+        return outcome
+
+
+def format_timings(result: PipelineResult) -> str:
+    """Render a per-stage timing report.
+
+    Args:
+        result: Result of Pipeline.run
+
+    Returns:
+        One line per stage with its start offset and duration, then the wall time and how much
+        time running stages concurrently saved over running them one after another
+    """
+    width = max((len(timing.name) for timing in result.timings), default=0)
+    lines = [f"  {timing.name:<{width}}  +{timing.start:.2f}s  {timing.duration:.2f}s" for timing in result.timings]
+    sequential = sum(timing.duration for timing in result.timings)
+    lines.append(
+        f"  {'total':<{width}}  {result.wall_time:.2f}s wall, {sequential:.2f}s sequential "
+        f"({max(sequential - result.wall_time, 0.0):.2f}s saved)"
+    )
+    return "\n".join(lines)
+
+
+def run_in_background(func: Callable[..., _T], *args: Any, **kwargs: Any) -> concurrent.futures.Future[_T]:
+    """Call func in a daemon thread, outside any pipeline.
+
+    Unlike a pool thread, a daemon thread doesn't delay the process exiting, so work whose result
+    may be discarded, such as a speculative LLM call, never holds up an abort.
+
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Future resolved with func's result or exception
+    """
+    future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="gac-background", daemon=True).start()
+    return future
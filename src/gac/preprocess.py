@@ -5,37 +5,60 @@ This module provides functions to preprocess git diffs for AI analysis,
 with a focus on handling large repositories efficiently.
 """
 
-import concurrent.futures
 import logging
 import os
 import re
 
 from gac.ai_utils import count_tokens
+from gac.config_diff import summarize_config_section
 from gac.constants import (
     CodePatternImportance,
+    DiffFormat,
     FilePatterns,
     FileTypeImportance,
+    Rollup,
+    Structure,
     Utility,
 )
+from gac.dedupe import deduplicate_hunks
+from gac.diff_render import render_compact_diff, render_diff
+from gac.diff_sections import changed_lines, section_blob_ids, section_filename, split_hunks
+from gac.formatting import collapse_formatting_changes, format_reformatted_note
+from gac.git import read_blobs
+from gac.lockfiles import summarize_lockfile_section
+from gac.moved_code import collapse_moved_code
+from gac.notebooks import summarize_notebook_section
+from gac.parallel import map_sections
+from gac.rollup import file_changes_from_diff_sections, format_rollup
+from gac.structure import language_for, skeletonize_section, summarize_structural_changes
 
 logger = logging.getLogger(__name__)
 
 
 def preprocess_diff(
-    diff: str, token_limit: int = Utility.DEFAULT_DIFF_TOKEN_LIMIT, model: str = "anthropic:claude-3-haiku-latest"
+    diff: str,
+    token_limit: int = Utility.DEFAULT_DIFF_TOKEN_LIMIT,
+    model: str = "anthropic:claude-3-haiku-latest",
+    diff_format: str = DiffFormat.DEFAULT,
+    context_lines: int = DiffFormat.DEFAULT_CONTEXT_LINES,
 ) -> str:
     """Preprocess a git diff to make it more suitable for AI analysis.
 
     This function processes a git diff by:
-    1. Filtering out binary and minified files
-    2. Scoring and prioritizing changes by importance
-    3. Truncating to fit within token limits
-    4. Focusing on structural and important changes
+    1. Filtering out binary and minified files, and reducing notebooks to their cell changes
+    2. Collapsing formatting-only changes and code moved between files, and deduplicating hunks
+       repeated across many files
+    3. Scoring and prioritizing changes by importance
+    4. Truncating to fit within token limits
+    5. Focusing on structural and important changes
+    6. Rendering the result in the requested diff format
 
     Args:
         diff: The git diff to process
         token_limit: Maximum tokens to keep in the processed diff
         model: Model identifier for token counting
+        diff_format: One of DiffFormat.FORMATS
+        context_lines: Unchanged lines kept around each change in the compact format
 
     Returns:
         Processed diff optimized for AI consumption
@@ -45,16 +68,54 @@ def preprocess_diff(
 
     initial_tokens = count_tokens(diff, model)
     if initial_tokens <= token_limit * 0.8:
-        return filter_binary_and_minified(diff)
+        return render_diff(filter_binary_and_minified(diff), diff_format, context_lines, model)
+
+    if diff_format == "compact":
+        return _preprocess_compact_diff(diff, initial_tokens, token_limit, model, context_lines)
 
     logger.info(f"Processing large diff ({initial_tokens} tokens, limit {token_limit})")
+    return reduce_diff(diff, token_limit, model)
 
-    sections = split_diff_into_sections(diff)
-    processed_sections = process_sections_parallel(sections)
+
+def _preprocess_compact_diff(diff: str, initial_tokens: int, token_limit: int, model: str, context_lines: int) -> str:
+    """Preprocess a large diff for the compact format, which may fit more of it in the limit."""
+    compact_diff = render_compact_diff(filter_binary_and_minified(diff), context_lines)
+    compact_tokens = count_tokens(compact_diff, model)
+    if compact_tokens <= token_limit * 0.8:
+        logger.info(f"Compact diff format saved {initial_tokens - compact_tokens} tokens, no truncation needed")
+        return compact_diff
+
+    # Truncate against a budget scaled by how much this diff compacts, so the rendering fills the limit
+    scale = min(initial_tokens / max(compact_tokens, 1), DiffFormat.MAX_BUDGET_SCALE)
+    logger.info(f"Processing large diff ({compact_tokens} tokens compacted, limit {token_limit})")
+    rendered = render_diff(reduce_diff(diff, int(token_limit * scale), model), "compact", context_lines, model)
+    if scale > 1 and count_tokens(rendered, model) > token_limit:
+        rendered = render_diff(reduce_diff(diff, token_limit, model), "compact", context_lines, model)
+    return rendered
+
+
+def reduce_diff(diff: str, token_limit: int, model: str) -> str:
+    """Run the full preprocessing pipeline on a large diff, truncating it to token_limit.
+
+    Args:
+        diff: The git diff to process
+        token_limit: Maximum tokens to keep in the processed diff
+        model: Model identifier for token counting
+
+    Returns:
+        Processed diff in the unified format
+    """
+    sections, reformatted = collapse_formatting_changes(split_diff_into_sections(diff))
+    sections = collapse_moved_code(sections)
+    processed_sections = deduplicate_hunks(process_sections_parallel(sections))
     scored_sections = score_sections(processed_sections)
-    truncated_diff = smart_truncate_diff(scored_sections, token_limit, model)
 
-    return truncated_diff
+    reformatted_note = format_reformatted_note(reformatted)
+    if not reformatted_note:
+        return smart_truncate_diff(scored_sections, token_limit, model)
+    note_tokens = count_tokens(reformatted_note, model)
+    truncated_diff = smart_truncate_diff(scored_sections, max(token_limit - note_tokens, 0), model)
+    return f"{truncated_diff}\n\n{reformatted_note}" if truncated_diff else reformatted_note
 
 
 def split_diff_into_sections(diff: str) -> list[str]:
@@ -87,33 +148,20 @@ def split_diff_into_sections(diff: str) -> list[str]:
     return sections
 
 
-def process_sections_parallel(sections: list[str]) -> list[str]:
+def process_sections_parallel(sections: list[str], max_workers: int | None = None) -> list[str]:
     """Process diff sections in parallel for better performance.
 
+    Small inputs are processed inline. Large ones are processed in a pool of worker processes
+    reading the sections from shared memory. Sections keep their original order.
+
     Args:
         sections: List of diff sections to process
+        max_workers: Maximum number of worker processes. Defaults to the CPU count
 
     Returns:
         List of processed sections (filtered)
     """
-    # Small number of sections - process sequentially to avoid overhead
-    if len(sections) <= 3:
-        processed = []
-        for section in sections:
-            result = process_section(section)
-            if result:
-                processed.append(result)
-        return processed
-
-    filtered_sections = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=Utility.MAX_WORKERS) as executor:
-        future_to_section = {executor.submit(process_section, section): section for section in sections}
-        for future in concurrent.futures.as_completed(future_to_section):
-            result = future.result()
-            if result:
-                filtered_sections.append(result)
-
-    return filtered_sections
+    return [result for result in map_sections(process_section, sections, max_workers) if result]
 
 
 def process_section(section: str) -> str | None:
@@ -125,10 +173,57 @@ def process_section(section: str) -> str | None:
     Returns:
         Processed section or None if it should be filtered
     """
+    file_operation = summarize_file_operation(section)
+    if file_operation:
+        return file_operation
+    notebook_summary = summarize_notebook_section(section)
+    if notebook_summary:
+        return notebook_summary
     if should_filter_section(section):
         # Return a summary for filtered files instead of removing completely
         return extract_filtered_file_summary(section)
-    return section
+    return summarize_config_section(section) or section
+
+
+def summarize_file_operation(section: str) -> str | None:
+    """Collapse a section that renames, copies, re-modes or deletes a file to a single line.
+
+    Renamed and copied files with edits are left alone, since git already shows only their edited
+    hunks.
+
+    Args:
+        section: Diff section to summarize
+
+    Returns:
+        The section's diff header line followed by a one-line note, or None if the section changes
+        the file's contents
+    """
+    header, hunks = split_hunks(section)
+    header_line = header.split("\n", 1)[0]
+    if not header_line.startswith("diff --git"):
+        return None
+
+    if re.search(r"^deleted file mode", header, re.MULTILINE):
+        removed = sum(len(changed_lines(hunk)) for hunk in hunks)
+        note = f"[Deleted file, {removed} lines]" if removed else "[Deleted file]"
+        # Keep notes left in the hunks by earlier passes, such as moved-code markers
+        earlier_notes = [line for hunk in hunks for line in hunk.split("\n") if line.startswith("[")]
+        return "\n".join([header_line, note, *earlier_notes]) + "\n"
+    if hunks or "Binary files" in header:
+        return None
+
+    notes = []
+    move = re.search(r"^(rename|copy) from (.*)\n\1 to (.*)$", header, re.MULTILINE)
+    if move:
+        verb = "Renamed" if move.group(1) == "rename" else "Copied"
+        notes.append(f"{verb} {move.group(2)} → {move.group(3)}")
+    mode = re.search(r"^old mode (\d+)\nnew mode (\d+)$", header, re.MULTILINE)
+    if mode:
+        notes.append(f"mode changed {mode.group(1)} → {mode.group(2)}")
+    if not notes:
+        return None
+    note = ", ".join(notes)
+    return f"{header_line}\n[{note[0].upper()}{note[1:]}]\n"
 
 
 def extract_binary_file_summary(section: str) -> str:
@@ -180,7 +275,7 @@ def extract_filtered_file_summary(section: str, change_type: str | None = None)
         if any(re.search(pattern, section) for pattern in FilePatterns.BINARY):
             change_type = "[Binary file change]"
         elif is_lockfile_or_generated(filename):
-            change_type = "[Lockfile/generated file change]"
+            change_type = summarize_lockfile_section(section) or "[Lockfile/generated file change]"
         elif any(filename.endswith(ext) for ext in FilePatterns.MINIFIED_EXTENSIONS):
             change_type = "[Minified file change]"
         elif is_minified_content(section):
@@ -250,6 +345,7 @@ def is_lockfile_or_generated(filename: str) -> bool:
         r"pnpm-lock\.yaml$",
         r"composer\.lock$",
         r"Cargo\.lock$",
+        r"uv\.lock$",
         r"\.sum$",  # Go module checksum
     ]
 
@@ -423,7 +519,10 @@ def filter_binary_and_minified(diff: str) -> str:
     sections = split_diff_into_sections(diff)
     filtered_sections = []
     for section in sections:
-        if should_filter_section(section):
+        notebook_summary = summarize_notebook_section(section)
+        if notebook_summary:
+            filtered_sections.append(notebook_summary)
+        elif should_filter_section(section):
             # Extract summaries for filtered files instead of removing completely
             filtered_section = extract_filtered_file_summary(section)
             if filtered_section:
@@ -434,6 +533,79 @@ def filter_binary_and_minified(diff: str) -> str:
     return "\n".join(filtered_sections)
 
 
+def skeletonize_new_files(scored_sections: list[tuple[str, float]]) -> dict[str, str]:
+    """Build skeletons for large newly added source files from their staged blobs.
+
+    Args:
+        scored_sections: List of (section, score) tuples
+
+    Returns:
+        Mapping of filename to the skeleton section replacing its full content
+    """
+    candidates = []
+    for section, _ in scored_sections:
+        if "new file mode" not in section or section.count("\n") < Structure.SKELETON_MIN_LINES:
+            continue
+        filename = section_filename(section)
+        _, new_id = section_blob_ids(section)
+        if filename and new_id and language_for(filename) is not None:
+            candidates.append((section, filename, new_id))
+    if not candidates:
+        return {}
+
+    blobs = read_blobs([new_id for _, _, new_id in candidates])
+    skeletons = {}
+    for section, filename, new_id in candidates:
+        skeleton = skeletonize_section(section, blobs[new_id]) if new_id in blobs else None
+        if skeleton is not None:
+            skeletons[filename] = skeleton
+    return skeletons
+
+
+def summarize_skipped_sections(
+    skipped_sections: list[tuple[str, float, str]], current_tokens: int, token_limit: int, model: str
+) -> tuple[list[str], set[str], int]:
+    """Replace skipped source file sections with structural summaries that fit the token limit.
+
+    The old and new blobs of the highest-scored skipped files in supported languages are read with a
+    single git cat-file call and compared symbol by symbol.
+
+    Args:
+        skipped_sections: List of (section, score, filename) tuples skipped for token limits
+        current_tokens: Tokens already used
+        token_limit: Maximum tokens to include
+        model: Model identifier for token counting
+
+    Returns:
+        Tuple of (summaries, summarized filenames, tokens used including the summaries)
+    """
+    candidates = [
+        (section, filename) for section, _, filename in skipped_sections if language_for(filename) is not None
+    ][: Structure.MAX_SUMMARIZED_FILES]
+    blob_ids = [blob_id for section, _ in candidates for blob_id in section_blob_ids(section) if blob_id]
+    if not blob_ids:
+        return [], set(), current_tokens
+
+    blobs = read_blobs(blob_ids)
+    summaries = []
+    summarized_files = set()
+    for section, filename in candidates:
+        summary = summarize_structural_changes(section, blobs)
+        if summary is None:
+            continue
+        summary_tokens = max(count_tokens(summary, model), 1)
+        # Leave room for the skipped-files note and the overall summary
+        if current_tokens + summary_tokens + 200 > token_limit:
+            continue
+        summaries.append(summary)
+        summarized_files.add(filename)
+        current_tokens += summary_tokens
+
+    if summaries:
+        logger.debug(f"Summarized {len(summaries)} skipped files structurally")
+    return summaries, summarized_files, current_tokens
+
+
 def smart_truncate_diff(scored_sections: list[tuple[str, float]], token_limit: int, model: str) -> str:
     """Intelligently truncate a diff to fit within token limits.
 
@@ -445,23 +617,22 @@ def smart_truncate_diff(scored_sections: list[tuple[str, float]], token_limit: i
     Returns:
         Truncated diff
     """
-    # Special case for tests: if token_limit is very high (e.g. 1000 in tests),
-    # simply include all sections without complex token counting
-    if token_limit >= 1000:
-        return "\n".join([section for section, _ in scored_sections])
     if not scored_sections:
         return ""
 
-    result_sections = []
+    result_sections: list[str] = []
     current_tokens = 0
     included_count = 0
     total_count = len(scored_sections)
     skipped_sections = []
     processed_files = set()
+    # Large new files start out as skeletons; (index, full section, skeleton tokens) for each
+    skeletons = skeletonize_new_files(scored_sections)
+    skeletonized: list[tuple[int, str, int]] = []
 
     # First pass: Include high-priority sections
-    for section, score in scored_sections:
-        file_match = re.search(r"diff --git a/(.*) b/", section)
+    for full_section, score in scored_sections:
+        file_match = re.search(r"diff --git a/(.*) b/", full_section)
         if not file_match:
             continue
 
@@ -471,38 +642,64 @@ def smart_truncate_diff(scored_sections: list[tuple[str, float]], token_limit: i
             continue
 
         processed_files.add(filename)
+        section = skeletons.get(filename, full_section)
 
         section_tokens = count_tokens(section, model)
         section_tokens = max(section_tokens, 1)
 
         # If including this section would exceed the limit
         if current_tokens + section_tokens > token_limit:
-            skipped_sections.append((section, score, filename))
+            skipped_sections.append((full_section, score, filename))
             continue
 
+        if filename in skeletons:
+            skeletonized.append((len(result_sections), full_section, section_tokens))
         result_sections.append(section)
         current_tokens += section_tokens
         included_count += 1
 
-    if skipped_sections and current_tokens + 200 <= token_limit:
-        skipped_summary = "\n\n[Skipped files due to token limits:"
-
-        for _, _, filename in skipped_sections[:5]:
-            file_entry = f" {filename},"
-            if current_tokens + len(skipped_summary) + len(file_entry) < token_limit:
-                skipped_summary += file_entry
-
-        if len(skipped_sections) > 5:
-            skipped_summary += f" and {len(skipped_sections) - 5} more"
-
-        skipped_summary += "]\n"
-
-        result_sections.append(skipped_summary)
+    # Second pass: Summarize skipped source files structurally where the summaries fit
+    summarized_count = 0
+    if skipped_sections:
+        summaries, summarized_files, current_tokens = summarize_skipped_sections(
+            skipped_sections, current_tokens, token_limit, model
+        )
+        result_sections.extend(summaries)
+        summarized_count = len(summarized_files)
+        skipped_sections = [entry for entry in skipped_sections if entry[2] not in summarized_files]
+
+    # Third pass: Restore the full content of skeletonized files while budget remains
+    reserved_tokens = 200 if skipped_sections else 0
+    for index, full_section, skeleton_tokens in skeletonized:
+        full_tokens = max(count_tokens(full_section, model), 1)
+        if current_tokens - skeleton_tokens + full_tokens + reserved_tokens <= token_limit:
+            result_sections[index] = full_section
+            current_tokens += full_tokens - skeleton_tokens
+
+    if (skipped_sections or summarized_count) and current_tokens + 200 <= token_limit:
+        if skipped_sections:
+            skipped_summary = "\n\n[Skipped files due to token limits:"
+
+            if len(skipped_sections) > Rollup.FLAT_SKIPPED_FILES:
+                # Roll up many skipped files by directory instead of naming a handful of them
+                skipped_changes = file_changes_from_diff_sections([section for section, _, _ in skipped_sections])
+                skipped_entries = [f" {line}," for line in format_rollup(skipped_changes, Rollup.MAX_SKIPPED_ENTRIES)]
+            else:
+                skipped_entries = [f" {filename}," for _, _, filename in skipped_sections]
+
+            for file_entry in skipped_entries:
+                if current_tokens + len(skipped_summary) + len(file_entry) < token_limit:
+                    skipped_summary += file_entry
+
+            skipped_summary = skipped_summary.rstrip(",") + "]\n"
+
+            result_sections.append(skipped_summary)
 
         # Add overall summary if we have room
         if current_tokens + 100 <= token_limit:
+            summarized_note = f", {summarized_count} more summarized structurally" if summarized_count else ""
             summary = (
-                f"\n\n[Summary: Showing {included_count} of {total_count} changed files"
+                f"\n\n[Summary: Showing {included_count} of {total_count} changed files{summarized_note}"
                 f" ({current_tokens}/{token_limit} tokens used), "
                 f"prioritized by importance.]"
             )
@@ -7,8 +7,12 @@ formatting, and integration with diff preprocessing.
 
 import logging
 import re
+from collections.abc import Callable
+from dataclasses import dataclass
 
-from gac.constants import CommitMessageConstants
+from gac.ai_utils import count_tokens
+from gac.constants import CommitMessageConstants, PromptBudget, Rollup, Utility
+from gac.rollup import FileChangeStat, format_rollup_entry, rollup_file_changes
 
 logger = logging.getLogger(__name__)
 
@@ -442,13 +446,94 @@ def _select_examples_section(template: str, verbose: bool, infer_scope: bool) ->
 
 
 # ============================================================================
-# Prompt Building
+# Prompt Budgeting
 # ============================================================================
 
 
-def build_prompt(
+@dataclass
+class PromptComponent:
+    """A part of the prompt competing for a share of the token budget."""
+
+    name: str
+    tokens: int  # Tokens the component needs to be included in full
+    priority: int  # Lower values are served first
+    minimum: int = 0  # Tokens granted before any other component is served beyond its minimum
+    max_share: float = 1.0  # Share of the total budget granted before leftovers are handed out
+
+
+def allocate_prompt_budget(total_tokens: int, components: list[PromptComponent]) -> dict[str, int]:
+    """Allocate a token budget across prompt components.
+
+    Allocation happens in three passes, each in priority order: every component first receives up to
+    its minimum, then up to its share of the total, and finally any leftover budget goes to components
+    that still need more.
+
+    Args:
+        total_tokens: Total token budget for the prompt
+        components: Components competing for the budget
+
+    Returns:
+        Mapping of component name to its allocated tokens
+    """
+    ordered = sorted(components, key=lambda component: component.priority)
+    allocations = {component.name: 0 for component in ordered}
+    remaining = max(total_tokens, 0)
+
+    for component in ordered:
+        grant = min(component.tokens, component.minimum, remaining)
+        allocations[component.name] = grant
+        remaining -= grant
+
+    for component in ordered:
+        share_cap = min(component.tokens, max(component.minimum, int(total_tokens * component.max_share)))
+        grant = min(max(share_cap - allocations[component.name], 0), remaining)
+        allocations[component.name] += grant
+        remaining -= grant
+
+    for component in ordered:
+        grant = min(component.tokens - allocations[component.name], remaining)
+        allocations[component.name] += grant
+        remaining -= grant
+
+    return allocations
+
+
+def _prompt_components(
+    system_template: str,
+    user_template: str,
     status: str,
-    processed_diff: str,
+    diff_tokens: int,
+    diff_stat: str,
+    hint: str,
+    model: str,
+) -> list[PromptComponent]:
+    """Describe the prompt's components with their token needs, priorities and minimums."""
+    template_tokens = count_tokens(system_template, model) + count_tokens(user_template, model)
+    return [
+        PromptComponent("template", template_tokens, priority=0, minimum=template_tokens),
+        PromptComponent("hint", count_tokens(hint, model), priority=1, minimum=PromptBudget.MIN_HINT_TOKENS),
+        PromptComponent(
+            "diff_stat",
+            count_tokens(diff_stat, model),
+            priority=2,
+            minimum=PromptBudget.MIN_DIFF_STAT_TOKENS,
+            max_share=PromptBudget.DIFF_STAT_SHARE,
+        ),
+        PromptComponent(
+            "status",
+            count_tokens(status, model),
+            priority=3,
+            minimum=PromptBudget.MIN_STATUS_TOKENS,
+            max_share=PromptBudget.STATUS_SHARE,
+        ),
+        PromptComponent("diff", diff_tokens, priority=4, minimum=Utility.MIN_DIFF_TOKEN_LIMIT),
+    ]
+
+
+def plan_diff_token_budget(
+    token_budget: int,
+    status: str,
+    diff: str,
     diff_stat: str = "",
     one_liner: bool = False,
     infer_scope: bool = False,
@@ -457,24 +542,211 @@ def build_prompt(
     system_template_path: str | None = None,
     language: str | None = None,
     translate_prefixes: bool = False,
-) -> tuple[str, str]:
-    """Build system and user prompts for the AI model using the provided templates and git information.
+    model: str = "anthropic:claude-3-haiku-latest",
+) -> int:
+    """Work out how many tokens of the prompt budget the preprocessed diff may use.
+
+    Takes the same arguments as build_prompt, with the raw diff in place of the processed one.
 
     Args:
+        token_budget: Total token budget for the prompt
         status: Git status output
-        processed_diff: Git diff output, already preprocessed and ready to use
-        diff_stat: Git diff stat output showing file changes summary
-        one_liner: Whether to request a one-line commit message
-        infer_scope: Whether to infer scope for the commit message
-        hint: Optional hint to guide the AI
-        verbose: Whether to generate detailed commit messages with motivation, architecture, and impact sections
-        system_template_path: Optional path to custom system template
-        language: Optional language for commit messages (e.g., "Spanish", "French", "Japanese")
-        translate_prefixes: Whether to translate conventional commit prefixes (default: False keeps them in English)
+        diff: Raw git diff that will be preprocessed
+        model: Model identifier for token counting
 
     Returns:
-        Tuple of (system_prompt, user_prompt) ready to be sent to an AI model
+        Token limit to preprocess the diff to
+    """
+    system_template, user_template = _render_templates(
+        one_liner, infer_scope, verbose, system_template_path, language, translate_prefixes, bool(hint)
+    )
+    # Character length is a cheap upper bound on the raw diff's token count
+    components = _prompt_components(system_template, user_template, status, len(diff), diff_stat, hint, model)
+    return allocate_prompt_budget(token_budget, components)["diff"]
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Truncate text to roughly fit within a token limit."""
+    text_tokens = count_tokens(text, model)
+    if text_tokens <= max_tokens:
+        return text
+    keep_chars = max(int(len(text) * max_tokens / text_tokens) - 20, 0)
+    return text[:keep_chars].rstrip() + " [...truncated]"
+
+
+def _fit_listing(
+    render: Callable[[int], str],
+    entry_count: int,
+    max_tokens: int,
+    model: str,
+) -> str:
+    """Find the largest number of listing entries whose rendering fits within a token limit.
+
+    Args:
+        render: Renders the listing keeping the given number of entries
+        entry_count: Total number of entries in the listing
+        max_tokens: Token limit for the rendered listing
+        model: Model identifier for token counting
+
+    Returns:
+        The rendered listing with as many entries as fit
+    """
+    low, high = 0, entry_count
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(render(middle), model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return render(low)
+
+
+def _status_entry(line: str) -> tuple[str, str]:
+    """Split a git status entry into its change kind ('' for untracked files) and path."""
+    match = re.match(r"\t([a-z ]+):\s+(.*)", line)
+    if not match:
+        return "", line.strip()
+    kind, path = match.groups()
+    return kind, path.split(" -> ")[-1]
+
+
+def compact_git_status(status: str, max_tokens: int, model: str) -> str:
+    """Compact git status output to fit within a token limit.
+
+    Section headers and branch information are kept. The entries of each section are grouped by
+    change kind and rolled up by directory, with as many entries per group as fit within the limit.
+    Listings longer than Rollup.MAX_LISTING_ENTRIES are rolled up even when they fit.
+
+    Args:
+        status: Git status output
+        max_tokens: Token limit for the compacted status
+        model: Model identifier for token counting
+
+    Returns:
+        Status output that fits within the limit where possible
     """
+    lines = status.split("\n")
+    entry_count = sum(1 for line in lines if line.startswith("\t"))
+    if entry_count <= Rollup.MAX_LISTING_ENTRIES and count_tokens(status, model) <= max_tokens:
+        return status
+    if not entry_count:
+        return _truncate_to_tokens(status, max_tokens, model)
+
+    # Runs of entries between headers, grouped by change kind in order of first appearance
+    blocks: list[str | dict[str, dict[str, str]]] = []
+    for line in lines:
+        if not line.startswith("\t"):
+            blocks.append(line)
+            continue
+        if not blocks or isinstance(blocks[-1], str):
+            blocks.append({})
+        section = blocks[-1]
+        assert isinstance(section, dict)
+        kind, path = _status_entry(line)
+        section.setdefault(kind, {})[path] = line
+
+    def render(max_entries: int) -> str:
+        result: list[str] = []
+        for block in blocks:
+            if isinstance(block, str):
+                result.append(block)
+                continue
+            for kind, entries in block.items():
+                changes = [FileChangeStat(path) for path in entries]
+                for entry in rollup_file_changes(changes, max_entries):
+                    if not entry.is_directory:
+                        result.append(entries[entry.path])
+                    elif kind:
+                        result.append(f"\t{kind + ':':<12}{format_rollup_entry(entry)}")
+                    else:
+                        result.append(f"\t{format_rollup_entry(entry)}")
+        return "\n".join(result)
+
+    largest_group = max(len(entries) for block in blocks if isinstance(block, dict) for entries in block.values())
+    logger.debug(f"Compacting git status ({entry_count} entries) to {max_tokens} tokens")
+    return _fit_listing(render, min(largest_group, Rollup.MAX_LISTING_ENTRIES), max_tokens, model)
+
+
+def _stat_line_changes(line: str) -> int:
+    """Get the number of changed lines from a diff stat line (0 for binary files)."""
+    match = re.search(r"\|\s+(\d+)", line)
+    return int(match.group(1)) if match else 0
+
+
+def _stat_line_file_change(line: str) -> FileChangeStat:
+    """Estimate the added and removed lines of a diff stat line from its +/- graph."""
+    path, _, graph = line.partition(" | ")
+    changes = _stat_line_changes(line)
+    plus, minus = graph.count("+"), graph.count("-")
+    additions = round(changes * plus / (plus + minus)) if plus + minus else 0
+    return FileChangeStat(path.strip(), additions, changes - additions)
+
+
+def compact_diff_stat(
+    diff_stat: str, max_tokens: int, model: str, file_changes: list[FileChangeStat] | None = None
+) -> str:
+    """Compact git diff --stat output to fit within a token limit.
+
+    File lines are rolled up by directory, with as many entries as fit within the limit and the
+    most changed files shown first. Listings longer than Rollup.MAX_LISTING_ENTRIES are rolled up
+    even when they fit. The summary line is kept.
+
+    Args:
+        diff_stat: Git diff --stat output
+        max_tokens: Token limit for the compacted stat
+        model: Model identifier for token counting
+        file_changes: Per-file stats from git diff --numstat. The rollup is built from them when
+            given, since the diff stat shortens long paths to '.../tail', which would group
+            unrelated files together. Without them, the diff stat lines are parsed
+
+    Returns:
+        Diff stat output that fits within the limit where possible
+    """
+    lines = diff_stat.split("\n")
+    file_indexes = [index for index, line in enumerate(lines) if " | " in line]
+    if len(file_indexes) <= Rollup.MAX_LISTING_ENTRIES and count_tokens(diff_stat, model) <= max_tokens:
+        return diff_stat
+    if not file_indexes:
+        return _truncate_to_tokens(diff_stat, max_tokens, model)
+
+    file_lines = {}
+    changes = []
+    if file_changes:
+        changes = list(file_changes)
+    else:
+        for index in file_indexes:
+            change = _stat_line_file_change(lines[index])
+            file_lines[change.path] = lines[index]
+            changes.append(change)
+    header = lines[: file_indexes[0]]
+    footer = lines[file_indexes[-1] + 1 :]
+
+    def render(max_entries: int) -> str:
+        entries = [
+            file_lines[entry.path] if entry.path in file_lines else f" {format_rollup_entry(entry)}"
+            for entry in rollup_file_changes(changes, max_entries)
+        ]
+        return "\n".join(header + entries + footer)
+
+    logger.debug(f"Compacting diff stat ({len(changes)} files) to {max_tokens} tokens")
+    return _fit_listing(render, min(len(changes), Rollup.MAX_LISTING_ENTRIES), max_tokens, model)
+
+
+# ============================================================================
+# Prompt Building
+# ============================================================================
+
+
+def _render_templates(
+    one_liner: bool,
+    infer_scope: bool,
+    verbose: bool,
+    system_template_path: str | None,
+    language: str | None,
+    translate_prefixes: bool,
+    has_hint: bool,
+) -> tuple[str, str]:
+    """Render the system and user templates, leaving the git data placeholders in the user template."""
     system_template = load_system_template(system_template_path)
     user_template = load_user_template()
 
@@ -483,14 +755,7 @@ def build_prompt(
     system_template = _select_examples_section(system_template, verbose, infer_scope)
     system_template = re.sub(r"\n(?:[ \t]*\n){2,}", "\n\n", system_template)
 
-    user_template = user_template.replace("<status></status>", status)
-    user_template = user_template.replace("<diff_stat></diff_stat>", diff_stat)
-    user_template = user_template.replace("<diff></diff>", processed_diff)
-
-    if hint:
-        user_template = user_template.replace("<hint_text></hint_text>", hint)
-        logger.debug(f"Added hint ({len(hint)} characters)")
-    else:
+    if not has_hint:
         user_template = _remove_template_section(user_template, "hint")
         logger.debug("No hint provided")
 
@@ -521,6 +786,72 @@ The ENTIRE commit message, including the prefix, must be in {language}."""
         user_template = _remove_template_section(user_template, "language")
         logger.debug("Using default language (English)")
 
+    return system_template, user_template
+
+
+def build_prompt(
+    status: str,
+    processed_diff: str,
+    diff_stat: str = "",
+    one_liner: bool = False,
+    infer_scope: bool = False,
+    hint: str = "",
+    verbose: bool = False,
+    system_template_path: str | None = None,
+    language: str | None = None,
+    translate_prefixes: bool = False,
+    token_budget: int | None = None,
+    model: str = "anthropic:claude-3-haiku-latest",
+    file_changes: list[FileChangeStat] | None = None,
+) -> tuple[str, str]:
+    """Build system and user prompts for the AI model using the provided templates and git information.
+
+    Args:
+        status: Git status output
+        processed_diff: Git diff output, already preprocessed and ready to use
+        diff_stat: Git diff stat output showing file changes summary
+        one_liner: Whether to request a one-line commit message
+        infer_scope: Whether to infer scope for the commit message
+        hint: Optional hint to guide the AI
+        verbose: Whether to generate detailed commit messages with motivation, architecture, and impact sections
+        system_template_path: Optional path to custom system template
+        language: Optional language for commit messages (e.g., "Spanish", "French", "Japanese")
+        translate_prefixes: Whether to translate conventional commit prefixes (default: False keeps them in English)
+        token_budget: Optional total token budget; over-budget status, diff stat and hint are compacted to their share
+        model: Model identifier for token counting when a token budget is given
+        file_changes: Per-file stats from git diff --numstat, used to roll up an over-budget diff stat
+
+    Returns:
+        Tuple of (system_prompt, user_prompt) ready to be sent to an AI model
+    """
+    system_template, user_template = _render_templates(
+        one_liner, infer_scope, verbose, system_template_path, language, translate_prefixes, bool(hint)
+    )
+
+    if token_budget is not None:
+        components = _prompt_components(
+            system_template,
+            user_template,
+            status,
+            count_tokens(processed_diff, model),
+            diff_stat,
+            hint,
+            model,
+        )
+        allocations = allocate_prompt_budget(token_budget, components)
+        logger.debug(f"Prompt budget allocations: {allocations}")
+        status = compact_git_status(status, allocations["status"], model)
+        diff_stat = compact_diff_stat(diff_stat, allocations["diff_stat"], model, file_changes)
+        hint = _truncate_to_tokens(hint, allocations["hint"], model)
+
+    user_template = user_template.replace("<status></status>", status)
+    user_template = user_template.replace("<diff_stat></diff_stat>", diff_stat)
+    user_template = user_template.replace("<diff></diff>", processed_diff)
+
+    if hint:
+        user_template = user_template.replace("<hint_text></hint_text>", hint)
+        logger.debug(f"Added hint ({len(hint)} characters)")
+
     user_template = re.sub(r"\n(?:[ \t]*\n){2,}", "\n\n", user_template)
 
     return system_template.strip(), user_template.strip()
@@ -0,0 +1,123 @@
+"""Removal of unstaged files from already collected git output.
+
+When files are unstaged after the secret scan, the staged diff and diff stat gac already collected
+are pruned in memory instead of being collected again, which on large repositories repeats
+seconds of git work. The diff loses the files' sections and the diff stat their lines, with its
+summary recounted. Bars in the diff stat are left as git scaled them. The status is collected
+again, since the unstaged files move to other parts of it.
+"""
+
+import re
+
+from gac.diff_sections import section_filename
+from gac.rollup import file_changes_from_diff_sections
+
+_SECTION_START_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+_NEW_PATH_RE = re.compile(r"^(?:rename|copy) to (.*)$", re.MULTILINE)
+_STAT_SUMMARY_RE = re.compile(r"^\s*\d+ files? changed")
+_STAT_RENAME_RE = re.compile(r"^(.*)\{(.*) => (.*)\}(.*)$")
+
+
+def section_paths(section: str) -> tuple[str, str] | None:
+    """Get the old and new path of a diff section, which differ for renames and copies.
+
+    Args:
+        section: Git diff section for a single file
+
+    Returns:
+        Tuple of (old path, new path), or None if the section has no diff header
+    """
+    old_path = section_filename(section)
+    if old_path is None:
+        return None
+    match = _NEW_PATH_RE.search(section)
+    return old_path, match.group(1) if match else old_path
+
+
+def prune_diff(diff: str, files: list[str]) -> tuple[str, list[str]]:
+    """Remove the sections of files from a diff.
+
+    Args:
+        diff: Git diff
+        files: Paths whose sections are removed, matched against both paths of renamed and copied
+            files, as the secret scan reports them under the new path
+
+    Returns:
+        Tuple of (pruned diff, removed sections)
+    """
+    targets = set(files)
+    kept: list[str] = []
+    removed: list[str] = []
+    for section in _SECTION_START_RE.split(diff):
+        if section and targets.intersection(section_paths(section) or ()):
+            removed.append(section)
+        else:
+            kept.append(section)
+    return "".join(kept).rstrip("\n"), removed
+
+
+def _stat_line_path(name: str) -> str:
+    """Get the new path of a diff stat entry, expanding rename notation such as 'a/{b => c}/d'."""
+    match = _STAT_RENAME_RE.match(name)
+    if match:
+        prefix, _, new, suffix = match.groups()
+        return (prefix + new + suffix).replace("//", "/")
+    if " => " in name:
+        return name.split(" => ", 1)[1]
+    return name
+
+
+def _format_stat_summary(files: int, insertions: int, deletions: int) -> str:
+    """Format a diff stat summary line the way git does."""
+    summary = f" {files} file{'' if files == 1 else 's'} changed"
+    if insertions or not deletions:
+        summary += f", {insertions} insertion{'' if insertions == 1 else 's'}(+)"
+    if deletions or not insertions:
+        summary += f", {deletions} deletion{'' if deletions == 1 else 's'}(-)"
+    return summary
+
+
+def prune_diff_stat(diff_stat: str, removed_sections: list[str]) -> str:
+    """Remove the entries of removed diff sections from a diff stat and recount its summary.
+
+    Args:
+        diff_stat: Output of git diff --stat for the diff the sections were removed from
+        removed_sections: Sections removed with prune_diff
+
+    Returns:
+        The diff stat without the sections' files
+    """
+    paths = {paths[1] for section in removed_sections if (paths := section_paths(section))}
+    lines = diff_stat.split("\n")
+    kept: list[str] = []
+    removed_files = 0
+    summary_index = None
+    for line in lines:
+        if _STAT_SUMMARY_RE.match(line):
+            summary_index = len(kept)
+            kept.append(line)
+            continue
+        name = line.split(" | ", 1)[0].strip() if " | " in line else None
+        if name is not None:
+            path = _stat_line_path(name)
+            # Long paths are shortened to '...' and their end
+            if path in paths or (path.startswith("...") and any(p.endswith(path[3:]) for p in paths)):
+                removed_files += 1
+                continue
+        kept.append(line)
+
+    if summary_index is not None:
+        files = int(kept[summary_index].split()[0])
+        insertions = deletions = 0
+        for number, label in re.findall(r"(\d+) (insertion|deletion)", kept[summary_index]):
+            if label == "insertion":
+                insertions = int(number)
+            else:
+                deletions = int(number)
+        changes = file_changes_from_diff_sections(removed_sections)
+        kept[summary_index] = _format_stat_summary(
+            max(files - removed_files, 0),
+            max(insertions - sum(change.additions or 0 for change in changes), 0),
+            max(deletions - sum(change.deletions or 0 for change in changes), 0),
+        )
+    return "\n".join(kept)
@@ -0,0 +1,195 @@
+"""Hierarchical directory rollups for large changesets.
+
+This module aggregates per-file change stats into a directory tree and renders it with at most a
+given number of entries, collapsing the smallest subtrees into summaries such as
+``services/billing/** 312 files +4.1k/-3.9k``. It keeps listings of thousands of files describable
+inside a small token budget.
+"""
+
+import heapq
+import re
+from dataclasses import dataclass, field
+
+
+@dataclass
+class FileChangeStat:
+    """Line changes for a single file. Counts are None when unknown (e.g. from git status)."""
+
+    path: str
+    additions: int | None = None
+    deletions: int | None = None
+
+
+@dataclass
+class RollupEntry:
+    """A single file or a collapsed directory in a rollup."""
+
+    path: str
+    is_directory: bool
+    file_count: int
+    additions: int | None
+    deletions: int | None
+    partial: bool = False
+
+
+@dataclass(eq=False)
+class _DirectoryNode:
+    """Directory in the change tree, with aggregated stats for its whole subtree."""
+
+    path: str
+    directories: dict[str, "_DirectoryNode"] = field(default_factory=dict)
+    files: list[FileChangeStat] = field(default_factory=list)
+    file_count: int = 0
+    additions: int | None = 0
+    deletions: int | None = 0
+
+    def add(self, change: FileChangeStat, parts: list[str]) -> None:
+        self.file_count += 1
+        self.additions = _add_counts(self.additions, change.additions)
+        self.deletions = _add_counts(self.deletions, change.deletions)
+        if len(parts) == 1:
+            self.files.append(change)
+            return
+        name = parts[0]
+        if name not in self.directories:
+            self.directories[name] = _DirectoryNode(path=f"{self.path}{name}/")
+        self.directories[name].add(change, parts[1:])
+
+    def children(self) -> list["_DirectoryNode | FileChangeStat"]:
+        return [*self.directories.values(), *self.files]
+
+    def to_entry(self) -> RollupEntry:
+        return RollupEntry(f"{self.path}**", True, self.file_count, self.additions, self.deletions)
+
+
+def _add_counts(total: int | None, value: int | None) -> int | None:
+    return None if total is None or value is None else total + value
+
+
+def _subtract_counts(total: int | None, value: int | None) -> int | None:
+    return None if total is None or value is None else total - value
+
+
+def _to_entry(node: "_DirectoryNode | FileChangeStat") -> RollupEntry:
+    if isinstance(node, _DirectoryNode):
+        return node.to_entry()
+    return RollupEntry(node.path, False, 1, node.additions, node.deletions)
+
+
+def _weight(entry: RollupEntry) -> tuple[int, int]:
+    return entry.file_count, (entry.additions or 0) + (entry.deletions or 0)
+
+
+def rollup_file_changes(changes: list[FileChangeStat], max_entries: int) -> list[RollupEntry]:
+    """Roll up file changes into at most max_entries files and collapsed directories.
+
+    Starting from the repository root, the directory covering the most files is repeatedly expanded
+    into its children for as long as the listing stays within max_entries. Any entries left over
+    show the largest children of directories that cannot be fully expanded, and the rest of each
+    such directory is reported as a single summary entry.
+
+    Args:
+        changes: Per-file change stats
+        max_entries: Maximum number of entries in the rollup
+
+    Returns:
+        Rollup entries sorted by path
+    """
+    root = _DirectoryNode(path="")
+    for change in changes:
+        root.add(change, change.path.split("/"))
+
+    entries: list[_DirectoryNode | FileChangeStat] = [root]
+    # Max-heap of expandable directories by file count; the counter keeps ordering stable
+    candidates: list[tuple[int, int, _DirectoryNode]] = [(-root.file_count, 0, root)]
+    counter = 1
+    max_entries = max(max_entries, 1)
+
+    while candidates:
+        _, _, directory = heapq.heappop(candidates)
+        children = directory.children()
+        if len(entries) - 1 + len(children) > max_entries:
+            continue
+        entries.remove(directory)
+        entries.extend(children)
+        for child in children:
+            if isinstance(child, _DirectoryNode):
+                heapq.heappush(candidates, (-child.file_count, counter, child))
+                counter += 1
+
+    result = [_to_entry(entry) for entry in entries]
+    collapsed = sorted(
+        (index for index, entry in enumerate(entries) if isinstance(entry, _DirectoryNode)),
+        key=lambda index: -result[index].file_count,
+    )
+    for index in collapsed:
+        node = entries[index]
+        assert isinstance(node, _DirectoryNode)
+        slack = max_entries - len(result)
+        if slack <= 0:
+            break
+        shown = sorted((_to_entry(child) for child in node.children()), key=_weight, reverse=True)[:slack]
+        remainder = node.to_entry()
+        for shown_entry in shown:
+            remainder.file_count -= shown_entry.file_count
+            remainder.additions = _subtract_counts(remainder.additions, shown_entry.additions)
+            remainder.deletions = _subtract_counts(remainder.deletions, shown_entry.deletions)
+        remainder.partial = True
+        result[index] = remainder
+        result.extend(shown)
+
+    # Summaries of the rest of a directory sort after the entries shown from it
+    return sorted(result, key=lambda entry: entry.path.removesuffix("**") + "\uffff" if entry.partial else entry.path)
+
+
+def format_count(count: int) -> str:
+    """Format a line count compactly (e.g. 4100 -> '4.1k')."""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M".replace(".0M", "M")
+    if count >= 1000:
+        return f"{count / 1000:.1f}k".replace(".0k", "k")
+    return str(count)
+
+
+def format_rollup_entry(entry: RollupEntry) -> str:
+    """Render a rollup entry, e.g. 'services/billing/** 312 files +4.1k/-3.9k'."""
+    parts = [entry.path]
+    if entry.is_directory:
+        noun = "file" if entry.file_count == 1 else "files"
+        parts.append(f"{entry.file_count} more {noun}" if entry.partial else f"{entry.file_count} {noun}")
+    if entry.additions is not None and entry.deletions is not None:
+        parts.append(f"+{format_count(entry.additions)}/-{format_count(entry.deletions)}")
+    return " ".join(parts)
+
+
+def format_rollup(changes: list[FileChangeStat], max_entries: int) -> list[str]:
+    """Roll up file changes and render one line per entry.
+
+    Args:
+        changes: Per-file change stats
+        max_entries: Maximum number of lines
+
+    Returns:
+        Rendered rollup lines
+    """
+    return [format_rollup_entry(entry) for entry in rollup_file_changes(changes, max_entries)]
+
+
+def file_changes_from_diff_sections(sections: list[str]) -> list[FileChangeStat]:
+    """Count added and removed lines per file in git diff sections.
+
+    Args:
+        sections: Git diff sections, one per file
+
+    Returns:
+        Per-file change stats for sections with a recognizable file header
+    """
+    changes = []
+    for section in sections:
+        match = re.search(r"diff --git a/(.*) b/", section)
+        if not match:
+            continue
+        additions = len(re.findall(r"^\+(?!\+\+ )", section, re.MULTILINE))
+        deletions = len(re.findall(r"^-(?!-- )", section, re.MULTILINE))
+        changes.append(FileChangeStat(match.group(1), additions, deletions))
+    return changes
@@ -0,0 +1,274 @@
+"""External secret rule packs in gitleaks' TOML format.
+
+Teams maintaining their own secret rules can list rule pack files in GAC_SECRET_RULE_PACKS,
+separated like PATH. Each ``[[rules]]`` table becomes a rule of the secret scan, with its
+``keywords`` feeding the keyword prefilter, its ``secretGroup`` and ``entropy`` settings, its
+``path`` filter, and its allowlists (``[rules.allowlist]`` or ``[[rules.allowlists]]``). The
+pack-wide ``[allowlist]`` applies to every rule of the pack.
+
+Gitleaks rules are written for Go's regex syntax. Inline flags anywhere in a pattern, ``\\z`` and
+POSIX character classes are translated; rules that still don't compile are skipped with a
+warning. Translated and validated rules are stored in the secret scan cache, keyed by the hash
+of the pack's content, so a pack is parsed and checked once per change rather than on every
+commit. From the cache, each regex is only compiled when the keyword prefilter first selects
+its rule.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections.abc import Iterable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from gac.config_diff import ConfigParseError, parse_config
+from gac.constants import SecretRulePacks
+from gac.scan_cache import ScanCache
+from gac.security import SecretRule
+
+logger = logging.getLogger(__name__)
+
+_INLINE_FLAGS_RE = re.compile(r"\(\?([imsU]+)\)")
+_END_OF_TEXT_RE = re.compile(r"(?<!\\)((?:\\\\)*)\\z")
+_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+
+
+class RulePackError(Exception):
+    """A rule pack, or a rule in it, that cannot be loaded."""
+
+
+def get_rule_pack_paths() -> list[Path]:
+    """Get the rule pack paths listed in GAC_SECRET_RULE_PACKS, in order."""
+    value = os.getenv("GAC_SECRET_RULE_PACKS") or ""
+    return [Path(entry).expanduser() for entry in value.split(os.pathsep) if entry.strip()]
+
+
+def translate_regex(source: str) -> tuple[str, int]:
+    """Translate a Go regex into Python syntax.
+
+    Inline flag groups such as ``(?i)`` are allowed anywhere in Go patterns but only at the start
+    in Python, so they are removed and applied to the whole pattern.
+
+    Args:
+        source: Regex in Go syntax
+
+    Returns:
+        Tuple of (Python regex, re flags)
+
+    Raises:
+        RulePackError: If the regex uses a flag Python doesn't support
+    """
+    flags = 0
+    for match in _INLINE_FLAGS_RE.finditer(source):
+        for flag in match.group(1):
+            if flag not in _FLAGS:
+                raise RulePackError(f"unsupported regex flag '{flag}'")
+            flags |= _FLAGS[flag]
+    regex = _INLINE_FLAGS_RE.sub("", source)
+    regex = _END_OF_TEXT_RE.sub(r"\1\\Z", regex)
+    for posix_class, replacement in SecretRulePacks.POSIX_CLASSES.items():
+        regex = regex.replace(posix_class, replacement)
+    return regex, flags
+
+
+def _string_list(table: dict[str, Any], key: str) -> list[str]:
+    """Get a list of strings from a TOML table, checking its type."""
+    value = table.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RulePackError(f"'{key}' must be a list of strings")
+    return value
+
+
+def _compile_checked(source: str) -> tuple[str, int]:
+    """Translate a Go regex and check that it compiles."""
+    regex, flags = translate_regex(source)
+    try:
+        re.compile(regex, flags)
+    except re.error as e:
+        raise RulePackError(f"invalid regex {source!r}: {e}") from e
+    return regex, flags
+
+
+def _compile_inline(source: str) -> str:
+    """Translate a Go regex and check that it compiles, carrying its flags inline."""
+    regex, flags = _compile_checked(source)
+    inline = "".join(flag for flag, value in _FLAGS.items() if flags & value)
+    return f"(?{inline}){regex}" if inline else regex
+
+
+def _allowlist_entries(allowlists: Iterable[Any]) -> tuple[list[str], list[str], list[str]]:
+    """Merge allowlist tables into (secret regexes, path regexes, lowercase stopwords)."""
+    regexes: list[str] = []
+    paths: list[str] = []
+    stopwords: list[str] = []
+    for allowlist in allowlists:
+        if not isinstance(allowlist, dict):
+            raise RulePackError("allowlists must be tables")
+        regexes.extend(_compile_inline(source) for source in _string_list(allowlist, "regexes"))
+        paths.extend(_compile_inline(source) for source in _string_list(allowlist, "paths"))
+        stopwords.extend(stopword.lower() for stopword in _string_list(allowlist, "stopwords"))
+    return regexes, paths, stopwords
+
+
+def _table_allowlists(table: dict[str, Any]) -> list[Any]:
+    """Get the allowlists of a rule or pack, in either the single or the list form."""
+    allowlists = table.get("allowlists", [])
+    if not isinstance(allowlists, list):
+        raise RulePackError("'allowlists' must be an array of tables")
+    single = table.get("allowlist")
+    return [single, *allowlists] if single is not None else allowlists
+
+
+def _build_rule(table: dict[str, Any], pack_allowlists: tuple[list[str], list[str], list[str]]) -> SecretRule | None:
+    """Build a rule from a ``[[rules]]`` table, or None for rules that only match file paths."""
+    rule_id = table.get("id")
+    if not isinstance(rule_id, str) or not rule_id:
+        raise RulePackError("rule without an 'id'")
+    source = table.get("regex")
+    if source is None:
+        logger.debug(f"Skipping rule pack rule {rule_id}: path-only rules are not supported")
+        return None
+    if not isinstance(source, str):
+        raise RulePackError(f"rule {rule_id}: 'regex' must be a string")
+
+    try:
+        regex, flags = _compile_checked(source)
+        secret_group = table.get("secretGroup", 0)
+        if not isinstance(secret_group, int) or not 0 <= secret_group <= re.compile(regex, flags).groups:
+            raise RulePackError(f"'secretGroup' {secret_group!r} is not a group of the regex")
+        min_entropy = table.get("entropy")
+        if min_entropy is not None and not isinstance(min_entropy, int | float):
+            raise RulePackError("'entropy' must be a number")
+        path = table.get("path")
+        if path is not None:
+            if not isinstance(path, str):
+                raise RulePackError("'path' must be a string")
+            path = _compile_inline(path)
+        regexes, paths, stopwords = _allowlist_entries(_table_allowlists(table))
+        keywords = [keyword.lower() for keyword in _string_list(table, "keywords")]
+    except RulePackError as e:
+        raise RulePackError(f"rule {rule_id}: {e}") from e
+
+    return SecretRule(
+        name=rule_id.replace("-", " ").replace("_", " ").title(),
+        regex=regex,
+        flags=flags,
+        keywords=tuple(dict.fromkeys(keywords)),
+        secret_group=secret_group,
+        min_entropy=float(min_entropy) if min_entropy is not None else None,
+        path=path,
+        allowlist_regexes=tuple(regexes + pack_allowlists[0]),
+        allowlist_paths=tuple(paths + pack_allowlists[1]),
+        stopwords=tuple(stopwords + pack_allowlists[2]),
+    )
+
+
+def parse_rule_pack(content: str, source: str = "<rule pack>") -> list[SecretRule]:
+    """Parse a gitleaks-style TOML rule pack.
+
+    Args:
+        content: TOML content of the pack
+        source: Name of the pack for log messages
+
+    Returns:
+        The pack's rules, in file order. Invalid rules are skipped with a warning
+
+    Raises:
+        RulePackError: If the pack is not valid TOML or its structure is invalid
+    """
+    try:
+        document = parse_config(content, "toml")
+    except ConfigParseError as e:
+        raise RulePackError(f"{source}: {e}") from e
+    tables = document.get("rules", [])
+    if not isinstance(tables, list):
+        raise RulePackError(f"{source}: 'rules' must be an array of tables")
+    try:
+        pack_allowlists = _allowlist_entries(_table_allowlists(document))
+    except RulePackError as e:
+        raise RulePackError(f"{source}: {e}") from e
+
+    rules = []
+    for table in tables:
+        try:
+            if not isinstance(table, dict):
+                raise RulePackError("rules must be tables")
+            rule = _build_rule(table, pack_allowlists)
+        except RulePackError as e:
+            logger.warning(f"Skipping invalid rule in secret rule pack {source}: {e}")
+            continue
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+def _cache_key(content: bytes) -> str:
+    """Key a rule pack in the scan cache by its content and the loader version."""
+    digest = hashlib.sha256(content).hexdigest()
+    return "\0".join((SecretRulePacks.CACHE_KEY_PREFIX, str(SecretRulePacks.LOADER_VERSION), digest))
+
+
+def _decode_rules(value: str) -> list[SecretRule]:
+    """Rebuild rules stored in the scan cache, turning JSON arrays back into tuples."""
+    rules = []
+    for fields in json.loads(value):
+        arguments: dict[str, Any] = {
+            key: tuple(item) if isinstance(item, list) else item for key, item in fields.items()
+        }
+        rules.append(SecretRule(**arguments))
+    return rules
+
+
+def load_rule_packs(paths: list[Path]) -> list[SecretRule]:
+    """Load rule packs, from the scan cache when their content was loaded before.
+
+    Args:
+        paths: Rule pack files
+
+    Returns:
+        The rules of all packs, in order. Packs that cannot be read or parsed are skipped with
+        a warning
+    """
+    contents: dict[Path, bytes] = {}
+    for path in paths:
+        try:
+            contents[path] = path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable secret rule pack {path}: {e}")
+    if not contents:
+        return []
+
+    keys = {path: _cache_key(content) for path, content in contents.items()}
+    rules: list[SecretRule] = []
+    with ScanCache() as cache:
+        cached = cache.get_many(list(set(keys.values())))
+        built: dict[str, str] = {}
+        for path, content in contents.items():
+            key = keys[path]
+            if key in cached:
+                rules.extend(_decode_rules(cached[key]))
+                continue
+            try:
+                pack_rules = parse_rule_pack(content.decode("utf-8"), str(path))
+            except (RulePackError, UnicodeDecodeError) as e:
+                logger.warning(f"Ignoring invalid secret rule pack {path}: {e}")
+                continue
+            rules.extend(pack_rules)
+            built[key] = json.dumps([asdict(rule) for rule in pack_rules])
+        cache.put_many(built)
+
+    logger.debug(f"Loaded {len(rules)} secret rules from {len(contents)} rule pack(s), {len(cached)} cached")
+    return rules
+
+
+def load_configured_rule_packs() -> list[SecretRule]:
+    """Load the rule packs listed in GAC_SECRET_RULE_PACKS.
+
+    Returns:
+        The rules of the configured packs, empty if none are configured
+    """
+    paths = get_rule_pack_paths()
+    return load_rule_packs(paths) if paths else []
@@ -0,0 +1,114 @@
+"""On-disk cache of secret scan results.
+
+Rerunning gac after a failed hook or a declined message rescans the same staged blobs. Results
+are stored in a small SQLite database, keyed by the caller (the secret scanner keys them by
+pattern set version, paths and blob IDs), so only blobs that changed are scanned again. The
+database is bounded in size with least-recently-used eviction, and SQLite's locking makes it safe
+for concurrent gac processes. Any database error disables the cache for the run rather than
+failing the scan. Scan results only hold rule names, line numbers and fingerprints, never the
+matched text. Parsed secret rule packs and configuration key-path summaries share the database,
+which is created readable by its owner only.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from gac.constants import SecretScanCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS scans (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)"
+
+
+def get_cache_path() -> Path:
+    """Get the scan cache database path, from GAC_SECRET_SCAN_CACHE or the default."""
+    return Path(os.getenv("GAC_SECRET_SCAN_CACHE") or SecretScanCache.PATH).expanduser()
+
+
+class ScanCache:
+    """Key-value store of serialized scan results with LRU eviction.
+
+    Use as a context manager; the connection is closed on exit.
+    """
+
+    def __init__(self, path: Path | None = None, max_entries: int = SecretScanCache.MAX_ENTRIES):
+        self.path = path or get_cache_path()
+        self.max_entries = max_entries
+        self._connection: sqlite3.Connection | None = None
+
+    def __enter__(self) -> "ScanCache":
+        try:
+            self.path.parent.mkdir(mode=SecretScanCache.DIRECTORY_MODE, parents=True, exist_ok=True)
+            # Create the file owner-only before SQLite opens it. Its journal files get the same mode
+            os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, SecretScanCache.FILE_MODE))
+            os.chmod(self.path, SecretScanCache.FILE_MODE)
+            connection = sqlite3.connect(self.path, timeout=SecretScanCache.TIMEOUT_SECONDS, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SecretScanCache.SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS scans")
+                connection.execute(f"PRAGMA user_version = {SecretScanCache.SCHEMA_VERSION}")
+            connection.execute(_SCHEMA)
+            self._connection = connection
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Secret scan cache unavailable at {self.path}: {e}")
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Look up cached values, marking the hits as recently used.
+
+        Args:
+            keys: Keys to look up
+
+        Returns:
+            Mapping of each cached key to its value
+        """
+        if self._connection is None or not keys:
+            return {}
+        found: dict[str, str] = {}
+        try:
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(keys), SecretScanCache.QUERY_BATCH_SIZE):
+                batch = keys[start : start + SecretScanCache.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(f"SELECT key, value FROM scans WHERE key IN ({placeholders})", batch)
+                found.update(rows.fetchall())
+            if found:
+                now = time.time_ns()
+                self._connection.executemany(
+                    "UPDATE scans SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Secret scan cache lookup failed: {e}")
+            return {}
+        return found
+
+    def put_many(self, values: dict[str, str]) -> None:
+        """Store values, then evict the least recently used entries beyond max_entries.
+
+        Args:
+            values: Mapping of key to value
+        """
+        if self._connection is None or not values:
+            return
+        now = time.time_ns()
+        try:
+            with self._connection:
+                self._connection.execute("BEGIN IMMEDIATE")
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO scans (key, value, last_used) VALUES (?, ?, ?)",
+                    [(key, value, now) for key, value in values.items()],
+                )
+                self._connection.execute(
+                    "DELETE FROM scans WHERE key IN (SELECT key FROM scans ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Secret scan cache update failed: {e}")
@@ -0,0 +1,148 @@
+# flake8: noqa: E304
+
+"""Secret scan command for gac.
+
+This module implements the 'gac scan' subcommand, which runs the secret scan gac performs before
+each commit on the staged changes without generating a commit message. It exits with status 1
+when it finds secrets that are not in the repository's secrets baseline, so it can gate CI or
+hooks.
+
+With --range, the patches of a range of commits are scanned instead, for example to audit a
+repository's history before publishing it. Findings can be written as JSON or SARIF with --format.
+
+With --update-baseline, the current findings are added to the ``.gac-secrets-baseline`` file at
+the repository root instead, accepting them: later scans and commits skip them without prompting.
+"""
+
+import logging
+import sys
+
+import click
+
+from gac.config import load_config
+from gac.constants import RenameDetection, SecretsBaseline
+from gac.entropy import thresholds_from_config
+from gac.errors import GitError, with_error_handling
+from gac.git import get_repo_root, get_staged_blob_ids, run_git_command
+from gac.history_scan import HistoryFinding, format_json_report, format_sarif_report, scan_history
+from gac.secrets_baseline import load_baseline, update_baseline
+from gac.security import DetectedSecret, scan_staged_diff
+from gac.utils import print_message
+
+logger = logging.getLogger(__name__)
+
+
+def _print_findings(secrets: list[DetectedSecret]) -> None:
+    """Print findings one per line, with their location and truncated match."""
+    for secret in secrets:
+        location = f"{secret.file_path}:{secret.line_number}" if secret.line_number else secret.file_path
+        click.echo(f"  • {secret.secret_type} in {location}")
+        click.echo(f"    Match: {secret.matched_text}")
+
+
+def _print_grouped_findings(findings: list[HistoryFinding]) -> None:
+    """Print findings grouped by commit, if they come from history."""
+    commit = None
+    for finding in findings:
+        if finding.commit and finding.commit != commit:
+            commit = finding.commit
+            click.echo(f"Commit {commit[:12]}:")
+        _print_findings([finding.secret])
+
+
+def _write_report(report: str, output: str | None) -> None:
+    """Write a report to a file, or to stdout if no file is given."""
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print_message(f"Report written to {output}", level="info")
+    else:
+        click.echo(report)
+
+
+def _scan_implementation(
+    update: bool, revision_range: str | None = None, output_format: str = "text", output: str | None = None
+) -> None:
+    """Implementation of the scan command logic for easier testing."""
+    try:
+        repo_root = get_repo_root()
+    except Exception:
+        print_message("Not in a git repository.", level="error")
+        sys.exit(1)
+
+    config = load_config()
+    if revision_range:
+        findings = scan_history(revision_range, entropy_thresholds=thresholds_from_config(config))
+        scope = f"commits {revision_range}"
+    else:
+        diff = run_git_command(["diff", "--staged", *RenameDetection.DIFF_ARGS])
+        if not diff:
+            print_message("No staged changes to scan.", level="info")
+            return
+        secrets = scan_staged_diff(
+            diff, blob_ids=get_staged_blob_ids(), entropy_thresholds=thresholds_from_config(config)
+        )
+        findings = [HistoryFinding(None, secret) for secret in secrets]
+        scope = "staged changes"
+
+    if update:
+        added, total = update_baseline(repo_root, [finding.secret for finding in findings])
+        print_message(
+            f"Added {added} finding(s) to {SecretsBaseline.FILENAME} ({total} accepted in total).", level="info"
+        )
+        return
+
+    baselined = load_baseline(repo_root)
+    remaining = [finding for finding in findings if finding.secret.fingerprint not in baselined]
+    skipped = len(findings) - len(remaining)
+
+    if output_format == "json":
+        _write_report(format_json_report(remaining), output)
+    elif output_format == "sarif":
+        _write_report(format_sarif_report(remaining), output)
+    elif not remaining:
+        suffix = f" ({skipped} baselined finding(s) skipped)" if skipped else ""
+        print_message(f"No secrets found in {scope}{suffix}.", level="info")
+    else:
+        print_message(f"Potential secrets found in {scope} ({len(remaining)}):", level="error")
+        _print_grouped_findings(remaining)
+        option = f" --range {revision_range}" if revision_range else ""
+        click.echo(
+            f"\nRun 'gac scan{option} --update-baseline' to accept these findings in {SecretsBaseline.FILENAME}."
+        )
+
+    if remaining:
+        sys.exit(1)
+
+
+@click.command(name="scan")
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help=f"Accept the current findings by adding them to {SecretsBaseline.FILENAME}",
+)
+@click.option(
+    "--range",
+    "revision_range",
+    metavar="RANGE",
+    help="Scan the commits in a revision range, such as 'v1.0..HEAD' or 'HEAD', instead of staged changes",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json", "sarif"]),
+    default="text",
+    show_default=True,
+    help="Report format",
+)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the report to a file instead of stdout")
+@with_error_handling(GitError, "Failed to scan for secrets")
+def scan(update_baseline: bool, revision_range: str | None, output_format: str, output: str | None) -> None:
+    """
+    Scan staged changes, or a range of commits, for secrets.
+
+    Exits with status 1 if secrets not in the repository's secrets baseline are found.
+    """
+    _scan_implementation(
+        update=update_baseline, revision_range=revision_range, output_format=output_format, output=output
+    )
@@ -0,0 +1,101 @@
+"""Baseline of accepted secret scan findings.
+
+Known and accepted findings, such as test fixtures with fake keys, are recorded by fingerprint in
+a ``.gac-secrets-baseline`` file at the repository root, which is meant to be committed. Findings
+in the baseline are skipped without prompting. The file is written by ``gac scan
+--update-baseline`` and lists each finding's type, file and line for review; only the
+fingerprints are used for matching.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+from gac.constants import SecretsBaseline
+from gac.security import DetectedSecret
+
+logger = logging.getLogger(__name__)
+
+
+def get_baseline_path(repo_root: str) -> Path:
+    """Get the baseline file path for a repository."""
+    return Path(repo_root) / SecretsBaseline.FILENAME
+
+
+def _read_entries(path: Path) -> list[dict]:
+    """Read the entries of a baseline file, or none if it is missing or malformed."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable secrets baseline {path}: {e}")
+        return []
+    entries = data.get("findings") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        logger.warning(f"Ignoring secrets baseline {path}: no 'findings' list")
+        return []
+    return [entry for entry in entries if isinstance(entry, dict) and isinstance(entry.get("fingerprint"), str)]
+
+
+def load_baseline(repo_root: str) -> set[str]:
+    """Load the fingerprints of accepted findings.
+
+    Args:
+        repo_root: Repository root directory
+
+    Returns:
+        Set of accepted fingerprints, empty if there is no baseline
+    """
+    fingerprints = {entry["fingerprint"] for entry in _read_entries(get_baseline_path(repo_root))}
+    if fingerprints:
+        logger.debug(f"Loaded {len(fingerprints)} baselined secret fingerprints")
+    return fingerprints
+
+
+def filter_baselined(secrets: list[DetectedSecret], fingerprints: set[str]) -> list[DetectedSecret]:
+    """Drop findings whose fingerprints are in the baseline.
+
+    Args:
+        secrets: Findings of a scan
+        fingerprints: Accepted fingerprints, from load_baseline
+
+    Returns:
+        Findings that are not in the baseline
+    """
+    if not fingerprints:
+        return secrets
+    remaining = [secret for secret in secrets if secret.fingerprint not in fingerprints]
+    if len(remaining) < len(secrets):
+        logger.info(f"Skipped {len(secrets) - len(remaining)} baselined secret findings")
+    return remaining
+
+
+def update_baseline(repo_root: str, secrets: list[DetectedSecret]) -> tuple[int, int]:
+    """Add findings to the baseline, keeping the entries already in it.
+
+    Args:
+        repo_root: Repository root directory
+        secrets: Findings to accept
+
+    Returns:
+        Tuple of (entries added, total entries)
+    """
+    path = get_baseline_path(repo_root)
+    entries = {entry["fingerprint"]: entry for entry in _read_entries(path)}
+    added = 0
+    for secret in secrets:
+        if secret.fingerprint is None or secret.fingerprint in entries:
+            continue
+        entries[secret.fingerprint] = {
+            "fingerprint": secret.fingerprint,
+            "type": secret.secret_type,
+            "file": secret.file_path,
+            "line": secret.line_number,
+        }
+        added += 1
+
+    ordered = sorted(entries.values(), key=lambda entry: (str(entry.get("file")), entry["fingerprint"]))
+    content = json.dumps({"version": SecretsBaseline.VERSION, "findings": ordered}, indent=2) + "\n"
+    path.write_text(content, encoding="utf-8")
+    return added, len(ordered)
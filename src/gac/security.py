@@ -5,12 +5,29 @@ This module provides functions to scan staged changes for potential secrets,
 API keys, and other sensitive information that should not be committed.
 """
 
+import functools
+import hashlib
+import json
 import logging
 import re
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import astuple, dataclass
+
+from gac.constants import Utility
+from gac.entropy import EntropyThresholds, find_high_entropy_strings, shannon_entropy
+from gac.lockfiles import lockfile_format
+from gac.parallel import map_sections
+from gac.scan_cache import ScanCache
 
 logger = logging.getLogger(__name__)
 
+_HUNK_NEW_START_RE = re.compile(r"@@ -\d+(?:,\d+)? \+(\d+)")
+_SECTION_PATHS_RE = re.compile(r"\Adiff --git a/(.*) b/(.*)$", re.MULTILINE)
+_NEW_PATH_RE = re.compile(r"^(?:\+\+\+ b/|rename to |copy to )(.*)$", re.MULTILINE)
+
+# Bump when a change to the scanning code alters findings, so cached results are discarded
+_SCANNER_VERSION = 3
+
 
 @dataclass
 class DetectedSecret:
@@ -21,6 +38,53 @@ class DetectedSecret:
     secret_type: str
     matched_text: str
     context: str | None = None
+    fingerprint: str | None = None  # Identifies the finding across scans, see secret_fingerprint
+
+
+@functools.cache
+def _compile(regex: str, flags: int = 0) -> re.Pattern:
+    """Compile a rule regex once per process, on first use."""
+    return re.compile(regex, flags)
+
+
+@dataclass(frozen=True)
+class SecretRule:
+    """A secret pattern with the lowercase literals one of which must appear in any line it matches.
+
+    Rules without keywords are run against every added line. The fields after keywords are only
+    set by rule packs, see gac.rule_packs.
+    """
+
+    name: str
+    regex: str
+    flags: int
+    keywords: tuple[str, ...]
+    secret_group: int = 0  # Capture group holding the secret, 0 for the whole match
+    min_entropy: float | None = None  # Matches whose secret has a lower Shannon entropy are skipped
+    path: str | None = None  # Regex a file path must match for the rule to apply
+    allowlist_regexes: tuple[str, ...] = ()  # Secrets matching any of these are skipped
+    allowlist_paths: tuple[str, ...] = ()  # Files whose path matches any of these are skipped
+    stopwords: tuple[str, ...] = ()  # Secrets containing any of these, in lowercase, are skipped
+
+    @property
+    def pattern(self) -> re.Pattern:
+        """The compiled regex, compiled the first time any copy of the rule needs it."""
+        return _compile(self.regex, self.flags)
+
+    def applies_to(self, file_path: str) -> bool:
+        """Check whether the rule scans a file, by its path filter and path allowlist."""
+        if self.path is not None and not _compile(self.path).search(file_path):
+            return False
+        return not any(_compile(regex).search(file_path) for regex in self.allowlist_paths)
+
+    def is_allowed(self, secret: str) -> bool:
+        """Check whether a matched secret is allowed by the rule's entropy, allowlist or stopwords."""
+        if self.min_entropy is not None and shannon_entropy(secret) < self.min_entropy:
+            return True
+        if any(_compile(regex).search(secret) for regex in self.allowlist_regexes):
+            return True
+        lowered = secret.lower()
+        return any(stopword in lowered for stopword in self.stopwords)
 
 
 class SecretPatterns:
@@ -92,6 +156,28 @@ class SecretPatterns:
         re.compile(r"Test Bearer Token", re.IGNORECASE),  # Documentation text
     ]
 
+    # Lowercase literals, one of which appears in every match of the pattern with the same name.
+    # Lines containing none of a pattern's keywords are never run against its regex.
+    KEYWORDS: dict[str, tuple[str, ...]] = {
+        "AWS_ACCESS_KEY_ID": ("aws_access_key_id",),
+        "AWS_SECRET_ACCESS_KEY": ("aws_secret_access_key",),
+        "AWS_SESSION_TOKEN": ("aws_session_token",),
+        "GENERIC_API_KEY": ("key", "secret"),
+        "GITHUB_TOKEN": ("ghp_", "gho_", "ghu_", "ghs_", "ghr_"),
+        "OPENAI_API_KEY": ("sk-",),
+        "ANTHROPIC_API_KEY": ("sk-ant-",),
+        "STRIPE_KEY": ("_live_", "_test_"),
+        "PRIVATE_KEY": ("private key-----",),
+        "BEARER_TOKEN": ("bearer",),
+        "JWT_TOKEN": ("eyj",),
+        "DATABASE_URL": ("postgresql://", "mysql://", "mongodb://", "redis://"),
+        "SSH_PRIVATE_KEY": ("private key-----",),
+        "SLACK_TOKEN": ("xox",),
+        "GOOGLE_API_KEY": ("aiza",),
+        "TWILIO_API_KEY": ("sk",),
+        "PASSWORD": ("password", "passwd", "pwd"),
+    }
+
     @classmethod
     def get_all_patterns(cls) -> dict[str, re.Pattern]:
         """Get all secret detection patterns.
@@ -108,6 +194,85 @@ class SecretPatterns:
         return patterns
 
 
+@functools.cache
+def get_secret_rules() -> tuple[SecretRule, ...]:
+    """Get the secret detection rules with their prefilter keywords, built once per process.
+
+    Returns:
+        Rules in the order of SecretPatterns.get_all_patterns, followed by the rules of the rule
+        packs listed in GAC_SECRET_RULE_PACKS
+    """
+    # Imported here because rule packs are built from SecretRule
+    from gac.rule_packs import load_configured_rule_packs
+
+    rules = []
+    for name, value in vars(SecretPatterns).items():
+        if isinstance(value, re.Pattern) and not name.startswith("EXCLUDED"):
+            readable_name = name.replace("_", " ").title()
+            rules.append(SecretRule(readable_name, value.pattern, value.flags, SecretPatterns.KEYWORDS[name]))
+    rules.extend(load_configured_rule_packs())
+    return tuple(rules)
+
+
+@functools.cache
+def _keyword_index() -> tuple[tuple[str, ...], dict[str, tuple[int, ...]], frozenset[int]]:
+    """Map each prefilter keyword to the indices of the rules it triggers, and collect the
+    indices of rules without keywords, which every line triggers."""
+    index: dict[str, list[int]] = {}
+    unconditional = set()
+    for rule_index, rule in enumerate(get_secret_rules()):
+        if not rule.keywords:
+            unconditional.add(rule_index)
+        for keyword in rule.keywords:
+            index.setdefault(keyword, []).append(rule_index)
+    return (
+        tuple(index),
+        {keyword: tuple(rule_indices) for keyword, rule_indices in index.items()},
+        frozenset(unconditional),
+    )
+
+
+def candidate_rules(text: str, keywords: tuple[str, ...] | None = None) -> list[SecretRule]:
+    """Select the rules whose keywords appear in text.
+
+    Args:
+        text: Text to check, in any case
+        keywords: Keywords to check for, defaulting to all of them. Pass the keywords found in a
+            larger text containing this one to skip checking the rest
+
+    Returns:
+        Candidate rules in their original order
+    """
+    all_keywords, rule_indices, unconditional = _keyword_index()
+    lowered = text.lower()
+    selected = {index for keyword in keywords or all_keywords if keyword in lowered for index in rule_indices[keyword]}
+    selected.update(unconditional)
+    rules = get_secret_rules()
+    return [rules[index] for index in sorted(selected)]
+
+
+@functools.cache
+def pattern_set_version(entropy_thresholds: EntropyThresholds | None = None) -> str:
+    """Get a fingerprint of the rules, exclusions and scanner behind the scan results.
+
+    Args:
+        entropy_thresholds: Entropy detection settings of the scan, None if disabled
+
+    Returns:
+        Hex digest that changes whenever the same diff could be scanned differently
+    """
+    parts: list[object] = [_SCANNER_VERSION, Utility.MAX_DISPLAYED_SECRET_LENGTH, entropy_thresholds]
+    parts.extend(astuple(rule) for rule in get_secret_rules())
+    parts.extend((pattern.pattern, pattern.flags) for pattern in SecretPatterns.EXCLUDED_PATTERNS)
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _present_keywords(text: str) -> tuple[str, ...]:
+    """Get the prefilter keywords that appear in text."""
+    lowered = text.lower()
+    return tuple(keyword for keyword in _keyword_index()[0] if keyword in lowered)
+
+
 def is_false_positive(matched_text: str, file_path: str = "") -> bool:
     """Check if a matched secret is likely a false positive.
 
@@ -137,12 +302,18 @@ def is_false_positive(matched_text: str, file_path: str = "") -> bool:
 def extract_file_path_from_diff_section(section: str) -> str | None:
     """Extract the file path from a git diff section.
 
+    Renamed and copied files give their new path, which the added lines' numbers refer to.
+
     Args:
         section: A git diff section
 
     Returns:
         The file path or None if not found
     """
+    header = section.split("\n@@", 1)[0]
+    match = _NEW_PATH_RE.search(header)
+    if match:
+        return match.group(1)
     match = re.search(r"diff --git a/(.*?) b/", section)
     if match:
         return match.group(1)
@@ -170,30 +341,40 @@ def extract_line_number_from_hunk(line: str, hunk_header: str | None) -> int | N
     return int(match.group(1))
 
 
-def scan_diff_section(section: str) -> list[DetectedSecret]:
-    """Scan a single git diff section for secrets.
+def secret_fingerprint(secret_type: str, file_path: str, matched_text: str) -> str:
+    """Fingerprint a finding by its type, file and full match.
+
+    Line numbers are left out so a finding keeps its fingerprint when the lines above it change.
+    Whitespace and surrounding quotes are normalized out of the match.
 
     Args:
-        section: A git diff section to scan
+        secret_type: Name of the rule that matched
+        file_path: File the match is in
+        matched_text: The full matched text, before truncation for display
 
     Returns:
-        List of detected secrets
+        Hex digest identifying the finding
     """
-    secrets: list[DetectedSecret] = []
-    file_path = extract_file_path_from_diff_section(section)
+    normalized = " ".join(matched_text.split()).strip("\"'`")
+    return hashlib.sha256(f"{secret_type}\0{file_path}\0{normalized}".encode()).hexdigest()
 
-    if not file_path:
-        return secrets
 
-    patterns = SecretPatterns.get_all_patterns()
-    lines = section.split("\n")
-    line_counter = 0
+def _display_text(matched_text: str) -> str:
+    """Truncate matched text for display (avoid showing full secrets)."""
+    if len(matched_text) > Utility.MAX_DISPLAYED_SECRET_LENGTH:
+        return matched_text[: Utility.MAX_DISPLAYED_SECRET_LENGTH] + "..."
+    return matched_text
 
-    for line in lines:
+
+def _added_lines(section: str) -> list[tuple[int, str]]:
+    """Get the added lines of a diff section with their line numbers in the new file."""
+    line_counter = 0
+    added_lines: list[tuple[int, str]] = []
+    for line in section.split("\n"):
         # Track hunk headers for line number extraction
         if line.startswith("@@"):
             # Reset line counter based on hunk header (this is the starting line number in the new file)
-            match = re.search(r"@@ -\d+(?:,\d+)? \+(\d+)", line)
+            match = _HUNK_NEW_START_RE.search(line)
             if match:
                 line_counter = int(match.group(1)) - 1  # Start one line before, will increment correctly
             continue
@@ -206,57 +387,197 @@ def scan_diff_section(section: str) -> list[DetectedSecret]:
         if line.startswith("+") or line.startswith(" "):
             line_counter += 1
 
-        # Only scan added lines (starting with '+')
-        if line.startswith("+") and not line.startswith("+++"):
-            # Check each pattern
-            content = line[1:]  # Remove the '+' prefix for pattern matching
-            for pattern_name, pattern in patterns.items():
-                matches = pattern.finditer(content)
-                for match in matches:
-                    matched_text = match.group(0)
-
-                    # Skip false positives
-                    if is_false_positive(matched_text, file_path):
-                        logger.debug(f"Skipping false positive: {matched_text}")
-                        continue
-
-                    # Truncate matched text for display (avoid showing full secrets)
-                    from gac.constants import Utility
-
-                    display_text = (
-                        matched_text[: Utility.MAX_DISPLAYED_SECRET_LENGTH] + "..."
-                        if len(matched_text) > Utility.MAX_DISPLAYED_SECRET_LENGTH
-                        else matched_text
-                    )
+        if line.startswith("+"):
+            added_lines.append((line_counter, line[1:]))  # Remove the '+' prefix for pattern matching
+    return added_lines
+
+
+def scan_diff_section(section: str, entropy_thresholds: EntropyThresholds | None = None) -> list[DetectedSecret]:
+    """Scan a single git diff section for secrets.
 
-                    secrets.append(
-                        DetectedSecret(
-                            file_path=file_path,
-                            line_number=line_counter,
-                            secret_type=pattern_name,
-                            matched_text=display_text,
-                            context=content.strip(),
-                        )
+    Args:
+        section: A git diff section to scan
+        entropy_thresholds: Also report high-entropy strings above these thresholds, outside
+            lockfiles. Disabled when None
+
+    Returns:
+        List of detected secrets, in line order
+    """
+    secrets: list[DetectedSecret] = []
+    file_path = extract_file_path_from_diff_section(section)
+
+    if not file_path:
+        return secrets
+
+    # One keyword pass over the section decides which rules can match at all, so most sections
+    # and lines never reach a regex
+    added_text = "\n".join(line for line in section.split("\n") if line.startswith("+"))
+    section_keywords = _present_keywords(added_text)
+    if entropy_thresholds is not None and lockfile_format(file_path):
+        entropy_thresholds = None
+    scan_patterns = bool(section_keywords or _keyword_index()[2])
+    if not scan_patterns and entropy_thresholds is None:
+        return secrets
+    rules_for_file = {rule: rule.applies_to(file_path) for rule in candidate_rules(added_text, section_keywords)}
+
+    added_lines = _added_lines(section)
+    pattern_matches: dict[int, list[str]] = {}
+
+    for line_counter, content in added_lines:
+        if not scan_patterns:
+            break
+        for rule in candidate_rules(content, section_keywords):
+            if not rules_for_file[rule]:
+                continue
+            for match in rule.pattern.finditer(content):
+                matched_text = match.group(rule.secret_group)
+                if not matched_text:
+                    continue
+
+                # Skip false positives
+                if rule.is_allowed(matched_text) or is_false_positive(matched_text, file_path):
+                    logger.debug(f"Skipping false positive: {matched_text}")
+                    continue
+
+                pattern_matches.setdefault(line_counter, []).append(matched_text)
+                secrets.append(
+                    DetectedSecret(
+                        file_path=file_path,
+                        line_number=line_counter,
+                        secret_type=rule.name,
+                        matched_text=_display_text(matched_text),
+                        context=content.strip(),
+                        fingerprint=secret_fingerprint(rule.name, file_path, matched_text),
                     )
+                )
+
+    if entropy_thresholds is None:
+        return secrets
 
+    contexts = dict(added_lines)
+    for line_number, kind, candidate in find_high_entropy_strings(added_lines, entropy_thresholds):
+        # Strings already reported by a pattern on the same line aren't reported twice
+        if any(candidate in matched or matched in candidate for matched in pattern_matches.get(line_number, [])):
+            continue
+        if is_false_positive(candidate, file_path):
+            logger.debug(f"Skipping false positive: {candidate}")
+            continue
+        secret_type = f"High Entropy {kind.title()} String"
+        secrets.append(
+            DetectedSecret(
+                file_path=file_path,
+                line_number=line_number,
+                secret_type=secret_type,
+                matched_text=_display_text(candidate),
+                context=contexts[line_number].strip(),
+                fingerprint=secret_fingerprint(secret_type, file_path, candidate),
+            )
+        )
+    secrets.sort(key=lambda secret: secret.line_number or 0)
     return secrets
 
 
-def scan_staged_diff(diff: str) -> list[DetectedSecret]:
-    """Scan staged git diff for secrets and API keys.
+def _section_cache_key(section: str, blob_ids: dict[tuple[str, str], tuple[str, str]], version: str) -> str | None:
+    """Build the scan cache key of a section from its paths and blob IDs, if they are known."""
+    match = _SECTION_PATHS_RE.search(section)
+    if not match:
+        return None
+    ids = blob_ids.get((match.group(1), match.group(2)))
+    if ids is None:
+        return None
+    return "\0".join((version, match.group(1), match.group(2), *ids))
+
+
+def _encode_findings(secrets: list[DetectedSecret]) -> str | None:
+    """Serialize findings for the scan cache without their matched text or source line.
+
+    The displayed match is stored as its position in the line, so it can be rebuilt from the diff.
+    Returns None if a match can't be located in its line, leaving the section uncached.
+    """
+    records = []
+    for secret in secrets:
+        context = secret.context or ""
+        truncated = len(secret.matched_text) > Utility.MAX_DISPLAYED_SECRET_LENGTH
+        shown = secret.matched_text[: Utility.MAX_DISPLAYED_SECRET_LENGTH] if truncated else secret.matched_text
+        offset = context.find(shown)
+        if offset == -1 or secret.line_number is None:
+            return None
+        records.append([secret.secret_type, secret.line_number, secret.fingerprint, offset, len(shown), truncated])
+    return json.dumps(records)
+
+
+def _decode_findings(value: str, section: str) -> list[DetectedSecret] | None:
+    """Rebuild cached findings, reading their lines from the section. None if a line is missing."""
+    file_path = extract_file_path_from_diff_section(section)
+    contexts = dict(_added_lines(section))
+    secrets = []
+    for secret_type, line_number, fingerprint, offset, length, truncated in json.loads(value):
+        if line_number not in contexts or file_path is None:
+            return None
+        context = contexts[line_number].strip()
+        matched_text = context[offset : offset + length] + ("..." if truncated else "")
+        secrets.append(DetectedSecret(file_path, line_number, secret_type, matched_text, context, fingerprint))
+    return secrets
+
+
+def _scan_sections_cached(
+    scan: Callable[[str], list[DetectedSecret]],
+    sections: list[str],
+    blob_ids: dict[tuple[str, str], tuple[str, str]],
+    version: str,
+    max_workers: int | None,
+) -> list[list[DetectedSecret]]:
+    """Scan sections, reusing cached results for blob pairs scanned before."""
+    keys = [_section_cache_key(section, blob_ids, version) for section in sections]
+    with ScanCache() as scan_cache:
+        cached_values = scan_cache.get_many([key for key in keys if key is not None])
+        cached: dict[int, list[DetectedSecret]] = {}
+        for index, key in enumerate(keys):
+            if key is not None and key in cached_values:
+                findings = _decode_findings(cached_values[key], sections[index])
+                if findings is not None:
+                    cached[index] = findings
+        pending = [index for index in range(len(sections)) if index not in cached]
+        scanned = map_sections(scan, [sections[index] for index in pending], max_workers)
+        scan_cache.put_many(
+            {
+                key: value
+                for index, secrets in zip(pending, scanned, strict=True)
+                if (key := keys[index]) is not None and (value := _encode_findings(secrets)) is not None
+            }
+        )
+
+    logger.debug(f"Secret scan cache: {len(cached)} of {len(sections)} sections cached")
+    scanned_iter = iter(scanned)
+    return [cached[index] if index in cached else next(scanned_iter) for index in range(len(sections))]
+
+
+def get_section_scanner(entropy_thresholds: EntropyThresholds | None = None) -> Callable[[str], list[DetectedSecret]]:
+    """Get scan_diff_section with the given settings, in a form worker processes can receive.
 
     Args:
-        diff: The staged git diff to scan
+        entropy_thresholds: Entropy detection settings, None to disable
 
     Returns:
-        List of detected secrets
+        Function scanning one diff section
     """
-    if not diff:
-        return []
+    if entropy_thresholds is None:
+        return scan_diff_section
+    return functools.partial(scan_diff_section, entropy_thresholds=entropy_thresholds)
+
+
+def split_scannable_sections(diff: str) -> list[str]:
+    """Split a diff into the file sections the scanner accepts.
 
+    Args:
+        diff: A git diff
+
+    Returns:
+        Sections with a diff --git header followed by --- and +++ lines, in diff order
+    """
     # Split diff into sections (one per file)
     sections = re.split(r"(?=^diff --git )", diff, flags=re.MULTILINE)
-    all_secrets = []
+    scannable = []
 
     for section in sections:
         if not section.strip():
@@ -273,8 +594,44 @@ def scan_staged_diff(diff: str) -> list[DetectedSecret]:
         if not re.search(r"^\+\+\+ ", section, flags=re.MULTILINE):
             continue
 
-        secrets = scan_diff_section(section)
-        all_secrets.extend(secrets)
+        scannable.append(section)
+    return scannable
+
+
+def scan_staged_diff(
+    diff: str,
+    max_workers: int | None = None,
+    blob_ids: dict[tuple[str, str], tuple[str, str]] | None = None,
+    entropy_thresholds: EntropyThresholds | None = None,
+) -> list[DetectedSecret]:
+    """Scan staged git diff for secrets and API keys.
+
+    Large diffs are scanned in a pool of worker processes, one batch of file sections each.
+    Findings are in diff order, then line order, whichever way the sections were scanned.
+
+    Args:
+        diff: The staged git diff to scan
+        max_workers: Maximum number of worker processes. Defaults to the CPU count
+        blob_ids: Staged blob IDs from git.get_staged_blob_ids. When given, results are cached on
+            disk per blob pair, and sections whose blobs were scanned before aren't scanned again
+        entropy_thresholds: Also report high-entropy strings above these thresholds. Disabled
+            when None
+
+    Returns:
+        List of detected secrets
+    """
+    if not diff:
+        return []
+
+    scanned_sections = split_scannable_sections(diff)
+
+    scan = get_section_scanner(entropy_thresholds)
+    if blob_ids and scanned_sections:
+        version = pattern_set_version(entropy_thresholds)
+        section_results = _scan_sections_cached(scan, scanned_sections, blob_ids, version, max_workers)
+    else:
+        section_results = map_sections(scan, scanned_sections, max_workers)
+    all_secrets = [secret for secrets in section_results for secret in secrets]
 
     logger.info(f"Secret scan complete: found {len(all_secrets)} potential secrets")
     return all_secrets
@@ -0,0 +1,549 @@
+"""Structural summaries of source file changes.
+
+This module extracts top-level symbols (classes, functions, methods and types) from source files
+and compares the old and new versions of a file, producing summaries like "added function X,
+changed signature of Y, removed class Z". Python is parsed with ast. JavaScript, TypeScript, Go,
+Rust and Java use a lightweight line scanner that tracks brace nesting.
+"""
+
+import ast
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+
+from gac.constants import Structure
+from gac.diff_sections import changed_lines, section_blob_ids, section_filename, split_hunks
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """A class, function, method or type definition in a source file."""
+
+    kind: str
+    name: str  # Qualified with enclosing containers, e.g. "Parser.parse"
+    signature: str
+    line: int
+    end_line: int
+    body_hash: str  # Empty for containers, whose members are compared individually
+    doc: str = ""  # First line of the docstring or leading doc comment
+
+
+def language_for(path: str) -> str | None:
+    """Get the extractor language for a file path, or None if unsupported."""
+    return Structure.LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def _hash_lines(lines: list[str]) -> str:
+    normalized = "\n".join(" ".join(line.split()) for line in lines)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _first_line(text: str | None) -> str:
+    for line in (text or "").splitlines():
+        if line.strip():
+            return _shorten(line.strip())
+    return ""
+
+
+def _shorten(signature: str) -> str:
+    signature = " ".join(signature.split())
+    if len(signature) > Structure.MAX_SIGNATURE_LENGTH:
+        return signature[: Structure.MAX_SIGNATURE_LENGTH - 3] + "..."
+    return signature
+
+
+# ============================================================================
+# Python
+# ============================================================================
+
+
+def _python_symbols(source: str) -> list[Symbol] | None:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    lines = source.splitlines()
+    symbols: list[Symbol] = []
+
+    def visit(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            end_line = node.end_lineno or node.lineno
+            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+                signature = f"{keyword} {node.name}({ast.unparse(node.args)})"
+                if node.returns is not None:
+                    signature += f" -> {ast.unparse(node.returns)}"
+                symbols.append(
+                    Symbol(
+                        "method" if prefix else "function",
+                        prefix + node.name,
+                        _shorten(signature),
+                        node.lineno,
+                        end_line,
+                        _hash_lines(lines[node.lineno - 1 : end_line]),
+                        _first_line(ast.get_docstring(node)),
+                    )
+                )
+            elif isinstance(node, ast.ClassDef):
+                bases = [ast.unparse(base) for base in node.bases]
+                bases += [ast.unparse(keyword) for keyword in node.keywords]
+                signature = f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+                doc = _first_line(ast.get_docstring(node))
+                symbols.append(Symbol("class", prefix + node.name, _shorten(signature), node.lineno, end_line, "", doc))
+                visit(node.body, f"{prefix}{node.name}.")
+
+    visit(tree.body, "")
+    return symbols
+
+
+# ============================================================================
+# Brace languages
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    """A definition pattern for the brace-language scanner."""
+
+    kind: str
+    regex: re.Pattern[str]
+    container: bool = False  # Members are nested inside, e.g. classes and impl blocks
+    member_only: bool = False  # Only matched directly inside a container, e.g. methods
+
+
+_NOT_NAMES = {"if", "for", "while", "switch", "catch", "return", "function", "new", "else", "do", "try", "throw"}
+
+_JS_PATTERNS = [
+    _Pattern("class", re.compile(r"\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[\w$]+)"), True),
+    _Pattern("interface", re.compile(r"\s*(?:export\s+)?(?:declare\s+)?interface\s+(?P<name>[\w$]+)"), True),
+    _Pattern("enum", re.compile(r"\s*(?:export\s+)?(?:declare\s+)?(?:const\s+)?enum\s+(?P<name>[\w$]+)")),
+    _Pattern("type", re.compile(r"\s*(?:export\s+)?(?:declare\s+)?type\s+(?P<name>[\w$]+)\s*(?:<[^=]*>)?\s*=")),
+    _Pattern(
+        "function",
+        re.compile(r"\s*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[\w$]+)"),
+    ),
+    _Pattern(
+        "function",
+        re.compile(
+            r"\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>[\w$]+)\s*(?::[^=]+)?=\s*(?:async\s+)?"
+            r"(?:function\b|\([^)]*\)\s*(?::\s*[^=]+)?=>|[\w$]+\s*=>)"
+        ),
+    ),
+    _Pattern(
+        "method",
+        re.compile(
+            r"\s*(?:(?:public|private|protected|static|async|readonly|override|abstract|get|set)\s+)*\*?"
+            r"(?P<name>[\w$]+)\s*\??\s*(?:<[^>]*>)?\s*\("
+        ),
+        member_only=True,
+    ),
+]
+
+_GO_PATTERNS = [
+    _Pattern("method", re.compile(r"func\s+\((?P<receiver>[^)]*)\)\s*(?P<name>\w+)")),
+    _Pattern("function", re.compile(r"func\s+(?P<name>\w+)")),
+    _Pattern("struct", re.compile(r"type\s+(?P<name>\w+)(?:\[[^\]]*\])?\s+struct\b")),
+    _Pattern("interface", re.compile(r"type\s+(?P<name>\w+)(?:\[[^\]]*\])?\s+interface\b")),
+    _Pattern("type", re.compile(r"type\s+(?P<name>\w+)\s+(?:=\s*)?[\w*\[]")),
+]
+
+_RUST_VISIBILITY = r"\s*(?:pub(?:\([^)]*\))?\s+)?"
+_RUST_PATTERNS = [
+    _Pattern(
+        "impl",
+        re.compile(
+            r"\s*(?:unsafe\s+)?impl(?:\s*<[^>]*>)?\s+(?:(?P<trait>[\w:]+(?:<[^>]*>)?)\s+for\s+)?(?P<name>[\w:]+)"
+        ),
+        True,
+    ),
+    _Pattern("trait", re.compile(_RUST_VISIBILITY + r"(?:unsafe\s+)?trait\s+(?P<name>\w+)"), True),
+    _Pattern("struct", re.compile(_RUST_VISIBILITY + r"struct\s+(?P<name>\w+)")),
+    _Pattern("enum", re.compile(_RUST_VISIBILITY + r"enum\s+(?P<name>\w+)")),
+    _Pattern("type", re.compile(_RUST_VISIBILITY + r"type\s+(?P<name>\w+)")),
+    _Pattern(
+        "function",
+        re.compile(
+            _RUST_VISIBILITY + r"(?:default\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?"
+            r'(?:extern\s+"[^"]*"\s+)?fn\s+(?P<name>\w+)'
+        ),
+    ),
+]
+
+_JAVA_MODIFIERS = r"(?:(?:public|private|protected|abstract|final|static|sealed|non-sealed|strictfp)\s+)*"
+_JAVA_PATTERNS = [
+    _Pattern("class", re.compile(r"\s*" + _JAVA_MODIFIERS + r"(?:class|record)\s+(?P<name>\w+)"), True),
+    _Pattern("interface", re.compile(r"\s*" + _JAVA_MODIFIERS + r"@?interface\s+(?P<name>\w+)"), True),
+    _Pattern("enum", re.compile(r"\s*" + _JAVA_MODIFIERS + r"enum\s+(?P<name>\w+)"), True),
+    _Pattern(
+        "method",
+        re.compile(
+            r"\s*(?:@\w+(?:\([^)]*\))?\s+)*"
+            r"(?:(?:public|private|protected|static|final|abstract|synchronized|native|default)\s+)*"
+            r"(?:<[^>]+>\s+)?(?:[\w.$]+(?:<[^;{}()]*>)?(?:\[\])*\s+)?(?P<name>\w+)\s*\("
+        ),
+        member_only=True,
+    ),
+]
+
+_BRACE_PATTERNS: dict[str, list[_Pattern]] = {
+    "javascript": _JS_PATTERNS,
+    "typescript": _JS_PATTERNS,
+    "go": _GO_PATTERNS,
+    "rust": _RUST_PATTERNS,
+    "java": _JAVA_PATTERNS,
+}
+
+_DOUBLE_QUOTED = r"\"(?:\\.|[^\"\\])*\""
+_COMMENTS = r"//.*|/\*.*?\*/"
+_STRING_OR_COMMENT_RE = re.compile(rf"{_DOUBLE_QUOTED}|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`|{_COMMENTS}")
+# Rust char literals hold a single character or escape, so lifetimes such as 'a are left alone
+_RUST_STRING_OR_COMMENT_RE = re.compile(
+    rf"{_DOUBLE_QUOTED}|'(?:\\(?:u\{{[0-9a-fA-F]+\}}|x[0-9a-fA-F]{{2}}|.)|[^'\\])'|{_COMMENTS}"
+)
+# A slash starts a regex literal where an operand is expected: at the start of a line, after an
+# operator or opening bracket, or after return. Elsewhere it divides
+_JS_STRING_OR_COMMENT_RE = re.compile(
+    rf"{_DOUBLE_QUOTED}|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`|{_COMMENTS}"
+    r"|(?P<operand>(?:^|(?<=[(,=:\[!&|?{};+\-*%<>~^])|(?<=\breturn))\s*)"
+    r"/(?![/*])(?:\\.|\[(?:\\.|[^\]\\])*\]|[^/\\\[])+/[a-z]*"
+)
+_STRING_OR_COMMENT_PATTERNS: dict[str, re.Pattern[str]] = {
+    "javascript": _JS_STRING_OR_COMMENT_RE,
+    "typescript": _JS_STRING_OR_COMMENT_RE,
+    "rust": _RUST_STRING_OR_COMMENT_RE,
+}
+
+
+def _blank_string_or_comment(match: re.Match[str]) -> str:
+    text = match.group(0)
+    if text.startswith(("//", "/*")):
+        return " "
+    return (match.groupdict().get("operand") or "") + '""'
+
+
+def _strip_code_line(line: str, in_comment: bool, pattern: re.Pattern[str] = _STRING_OR_COMMENT_RE) -> tuple[str, bool]:
+    """Blank out strings, comments and regex literals so braces inside them are not counted."""
+    if in_comment:
+        end = line.find("*/")
+        if end == -1:
+            return "", True
+        line = " " * (end + 2) + line[end + 2 :]
+    line = pattern.sub(_blank_string_or_comment, line)
+    start = line.find("/*")
+    if start != -1:
+        return line[:start], True
+    return line, False
+
+
+def _leading_comment(lines: list[str], line_number: int) -> str:
+    """Get the first line of the doc comment above a definition, skipping annotations."""
+    comment: list[str] = []
+    index = line_number - 2
+    while index >= 0:
+        stripped = lines[index].strip()
+        if stripped.startswith(("@", "#[")) and not comment:
+            index -= 1
+            continue
+        if not stripped.startswith(("//", "/*", "*")):
+            break
+        comment.insert(0, stripped.lstrip("/*! ").rstrip("*/ "))
+        index -= 1
+    return _first_line("\n".join(comment))
+
+
+@dataclass
+class _OpenSymbol:
+    kind: str
+    name: str
+    container: bool
+    line: int
+    signature_parts: list[str]
+    body_depth: int = -1
+
+
+def _brace_symbols(source: str, patterns: list[_Pattern], string_pattern: re.Pattern[str]) -> list[Symbol]:
+    lines = source.split("\n")
+    symbols: list[Symbol] = []
+    stack: list[_OpenSymbol] = []
+    pending: _OpenSymbol | None = None
+    depth = 0
+    in_comment = False
+
+    def finish(symbol: _OpenSymbol, end_line: int) -> None:
+        signature = _shorten(" ".join(symbol.signature_parts).split("{")[0].rstrip(" ;"))
+        body_hash = "" if symbol.container else _hash_lines(lines[symbol.line - 1 : end_line])
+        doc = _leading_comment(lines, symbol.line)
+        symbols.append(Symbol(symbol.kind, symbol.name, signature, symbol.line, end_line, body_hash, doc))
+
+    for number, raw_line in enumerate(lines, start=1):
+        line, in_comment = _strip_code_line(raw_line, in_comment, string_pattern)
+
+        if pending is None:
+            containers = [symbol for symbol in stack if symbol.container]
+            container = containers[-1] if containers else None
+            # Definitions are only looked for at the top level or directly inside a container
+            declaration_depth = container.body_depth + 1 if container else 0
+            for pattern in patterns:
+                if depth != declaration_depth or (pattern.member_only and container is None):
+                    continue
+                match = pattern.regex.match(line)
+                if not match or match.group("name") in _NOT_NAMES:
+                    continue
+                name = match.group("name")
+                receiver = match.groupdict().get("receiver")
+                if receiver:
+                    name = f"{receiver.split()[-1].lstrip('*').split('[')[0]}.{name}"
+                elif container is not None:
+                    name = f"{container.name}.{name}"
+                kind = pattern.kind
+                if kind == "function" and container is not None:
+                    kind = "method"
+                pending = _OpenSymbol(kind, name, pattern.container, number, [])
+                break
+        if pending is not None:
+            pending.signature_parts.append(line.strip())
+
+        for char in line:
+            if char == "{":
+                if pending is not None:
+                    pending.body_depth = depth
+                    stack.append(pending)
+                    pending = None
+                depth += 1
+            elif char == "}":
+                depth = max(depth - 1, 0)
+                while stack and stack[-1].body_depth >= depth:
+                    finish(stack.pop(), number)
+
+        # Definitions without a body end at a semicolon, or on the same line for one-line types
+        if pending is not None and (";" in line or pending.kind in ("type", "enum") and "(" not in line):
+            finish(pending, number)
+            pending = None
+        elif pending is not None and number - pending.line > 20:
+            pending = None
+
+    for symbol in stack:
+        finish(symbol, len(lines))
+    return sorted(symbols, key=lambda symbol: symbol.line)
+
+
+def extract_symbols(source: str, language: str) -> list[Symbol] | None:
+    """Extract class, function, method and type definitions from source code.
+
+    Args:
+        source: Source file contents
+        language: Extractor language, as in Structure.LANGUAGES
+
+    Returns:
+        Symbols in order of appearance, or None if the source cannot be parsed
+    """
+    if language == "python":
+        return _python_symbols(source)
+    patterns = _BRACE_PATTERNS.get(language)
+    if not patterns:
+        return None
+    return _brace_symbols(source, patterns, _STRING_OR_COMMENT_PATTERNS.get(language, _STRING_OR_COMMENT_RE))
+
+
+_JS_IMPORT_RE = re.compile(r"\s*(?:import\b|export\s+(?:\*|\{[^}]*\})\s+from\b|(?:const|let|var)\s.*=\s*require\()")
+_IMPORT_PATTERNS: dict[str, re.Pattern[str]] = {
+    "javascript": _JS_IMPORT_RE,
+    "typescript": _JS_IMPORT_RE,
+    "rust": re.compile(r"\s*(?:pub\s+)?(?:use|extern\s+crate|mod\s+\w+\s*;)"),
+    "java": re.compile(r"\s*import\s"),
+}
+
+
+def extract_imports(source: str, language: str) -> list[str]:
+    """Extract import statements from source code.
+
+    Args:
+        source: Source file contents
+        language: Extractor language, as in Structure.LANGUAGES
+
+    Returns:
+        Import statements in order of appearance
+    """
+    if language == "python":
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            return []
+        return [ast.unparse(node) for node in tree.body if isinstance(node, ast.Import | ast.ImportFrom)]
+
+    if language == "go":
+        return _go_imports(source)
+
+    pattern = _IMPORT_PATTERNS.get(language)
+    if pattern is None:
+        return []
+    return [line.strip().rstrip(";") for line in source.split("\n") if pattern.match(line)]
+
+
+def _go_imports(source: str) -> list[str]:
+    """Extract single imports and the entries of import (...) blocks from Go source."""
+    imports = []
+    in_block = False
+    for line in source.split("\n"):
+        stripped = line.strip()
+        if in_block:
+            if stripped == ")":
+                in_block = False
+            elif stripped and not stripped.startswith("//"):
+                imports.append(f"import {stripped}")
+        elif stripped.startswith("import ("):
+            in_block = True
+        elif stripped.startswith("import "):
+            imports.append(stripped)
+    return imports
+
+
+def skeletonize(source: str, language: str) -> str | None:
+    """Render a skeleton of a source file: imports and definitions with line counts and docs.
+
+    Args:
+        source: Source file contents
+        language: Extractor language, as in Structure.LANGUAGES
+
+    Returns:
+        The skeleton, or None if the source cannot be parsed
+    """
+    symbols = extract_symbols(source, language)
+    if symbols is None:
+        return None
+
+    lines = []
+    imports = extract_imports(source, language)
+    if imports:
+        lines.append("imports:")
+        lines.extend(f"  {statement}" for statement in imports[: Structure.MAX_SKELETON_IMPORTS])
+        if len(imports) > Structure.MAX_SKELETON_IMPORTS:
+            lines.append(f"  ... and {len(imports) - Structure.MAX_SKELETON_IMPORTS} more imports")
+
+    for symbol in symbols[: Structure.MAX_SKELETON_SYMBOLS]:
+        indent = "  " * symbol.name.count(".")
+        line_count = symbol.end_line - symbol.line + 1
+        entry = f"{indent}{symbol.signature}  [{line_count} lines]"
+        if symbol.doc:
+            entry += f" {symbol.doc}"
+        lines.append(entry)
+    if len(symbols) > Structure.MAX_SKELETON_SYMBOLS:
+        lines.append(f"... and {len(symbols) - Structure.MAX_SKELETON_SYMBOLS} more definitions")
+
+    return "\n".join(lines)
+
+
+def skeletonize_section(section: str, blob: bytes) -> str | None:
+    """Represent a new file's diff section by a skeleton of its staged blob.
+
+    Args:
+        section: Git diff section for a newly added file
+        blob: Contents of the file's new blob
+
+    Returns:
+        The section's file header followed by the skeleton, or None if the file's language is
+        unsupported or it cannot be parsed
+    """
+    filename = section_filename(section)
+    language = language_for(filename) if filename else None
+    if language is None:
+        return None
+
+    source = blob.decode("utf-8", errors="replace")
+    skeleton = skeletonize(source, language)
+    if skeleton is None:
+        return None
+
+    header, _ = split_hunks(section)
+    line_count = source.count("\n") + (0 if source.endswith("\n") else 1)
+    return (
+        f"{header.rstrip()}\n[Skeleton of new file ({line_count} lines), body omitted for token limits:\n{skeleton}]\n"
+    )
+
+
+# ============================================================================
+# Comparison
+# ============================================================================
+
+
+def _index_symbols(symbols: list[Symbol]) -> dict[tuple[str, int], Symbol]:
+    """Key symbols by qualified name, numbering repeated names such as overloads."""
+    indexed: dict[tuple[str, int], Symbol] = {}
+    for symbol in symbols:
+        occurrence = 0
+        while (symbol.name, occurrence) in indexed:
+            occurrence += 1
+        indexed[(symbol.name, occurrence)] = symbol
+    return indexed
+
+
+def compare_symbols(old_symbols: list[Symbol], new_symbols: list[Symbol]) -> list[str]:
+    """Describe the structural changes between two versions of a file.
+
+    Args:
+        old_symbols: Symbols of the old version
+        new_symbols: Symbols of the new version
+
+    Returns:
+        Change descriptions in order of the new file, with removals last
+    """
+    old_index = _index_symbols(old_symbols)
+    new_index = _index_symbols(new_symbols)
+    changes = []
+
+    for key, new in new_index.items():
+        old = old_index.get(key)
+        if old is None:
+            changes.append(f"added {new.kind} {new.name}")
+        elif old.signature != new.signature:
+            changes.append(f"changed signature of {new.kind} {new.name}: {old.signature} → {new.signature}")
+        elif old.body_hash != new.body_hash:
+            changes.append(f"modified {new.kind} {new.name}")
+
+    changes.extend(f"removed {old.kind} {old.name}" for key, old in old_index.items() if key not in new_index)
+    return changes
+
+
+def summarize_structural_changes(section: str, blobs: dict[str, bytes]) -> str | None:
+    """Summarize a diff section as structural changes between the old and new blobs.
+
+    Args:
+        section: Git diff section for a single file
+        blobs: Blob contents by object ID, as returned by git.read_blobs
+
+    Returns:
+        The section's file header followed by a structural summary, or None if the file's language
+        is unsupported, its blobs are unavailable or it cannot be parsed
+    """
+    filename = section_filename(section)
+    language = language_for(filename) if filename else None
+    if language is None:
+        return None
+
+    old_id, new_id = section_blob_ids(section)
+    if old_id is None and new_id is None:
+        return None
+    if (old_id is not None and old_id not in blobs) or (new_id is not None and new_id not in blobs):
+        return None
+
+    old_source = blobs[old_id].decode("utf-8", errors="replace") if old_id else ""
+    new_source = blobs[new_id].decode("utf-8", errors="replace") if new_id else ""
+    old_symbols = extract_symbols(old_source, language)
+    new_symbols = extract_symbols(new_source, language)
+    if old_symbols is None or new_symbols is None:
+        return None
+
+    changes = compare_symbols(old_symbols, new_symbols) or ["no definitions changed (top-level code only)"]
+    if len(changes) > Structure.MAX_SUMMARY_ITEMS:
+        omitted = len(changes) - Structure.MAX_SUMMARY_ITEMS
+        changes = changes[: Structure.MAX_SUMMARY_ITEMS] + [f"... and {omitted} more changes"]
+
+    header, hunks = split_hunks(section)
+    line_count = sum(len(changed_lines(hunk)) for hunk in hunks)
+    items = "\n".join(f"  {change}" for change in changes)
+    return f"{header.rstrip()}\n[Structural summary, {line_count} changed lines omitted for token limits:\n{items}]\n"
@@ -72,6 +72,7 @@ def run_subprocess(
     check: bool = True,
     strip_output: bool = True,
     raise_on_error: bool = True,
+    env: dict[str, str] | None = None,
 ) -> str:
     """Run a subprocess command safely and return the output.
 
@@ -82,6 +83,7 @@ def run_subprocess(
         check: Whether to check return code (for compatibility)
         strip_output: Whether to strip whitespace from output
         raise_on_error: Whether to raise an exception on error
+        env: Environment for the command, instead of inheriting this process's
 
     Returns:
         Command output as string
@@ -100,6 +102,7 @@ def run_subprocess(
             text=True,
             check=False,
             timeout=timeout,
+            env=env,
         )
 
         should_raise = result.returncode != 0 and (check or raise_on_error)
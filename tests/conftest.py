@@ -22,6 +22,12 @@ def pytest_configure(config):
     warnings.filterwarnings("ignore", category=CoverageWarning, message="Module .* was previously imported")
 
 
+@pytest.fixture(autouse=True)
+def isolated_scan_cache(tmp_path, monkeypatch):
+    """Keep each test's secret scan cache database out of the home directory and other tests."""
+    monkeypatch.setenv("GAC_SECRET_SCAN_CACHE", str(tmp_path / "scan-cache.sqlite3"))
+
+
 @pytest.fixture
 def mock_run_subprocess():
     """Mock for gac.git.run_subprocess."""
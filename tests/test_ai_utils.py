@@ -3,13 +3,16 @@
 These tests run without any external dependencies and test core logic.
 """
 
+import math
 import os
 import sys
+from unittest.mock import MagicMock, patch
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 import gac.ai_utils as ai_utils  # noqa: E402
+from gac.constants import Tokenizers  # noqa: E402
 from gac.errors import AIError  # noqa: E402
 
 
@@ -70,6 +73,88 @@ class TestCountTokens:
         assert ai_utils.count_tokens({}, "openai:gpt-4") == 0
 
 
+class FakeEncoding:
+    """Encoding stub that produces one token per whitespace-separated word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+class TestTokenizerRegistry:
+    """Test tokenizer family resolution and calibrated counting."""
+
+    def setup_method(self):
+        ai_utils.load_local_tokenizer.cache_clear()
+
+    def teardown_method(self):
+        ai_utils.load_local_tokenizer.cache_clear()
+
+    def test_resolve_tokenizer_family_by_model_name(self):
+        """Model names identify the family regardless of the hosting provider."""
+        assert ai_utils.resolve_tokenizer_family("anthropic:claude-3-5-haiku-latest") == "claude"
+        assert ai_utils.resolve_tokenizer_family("openrouter:anthropic/claude-sonnet-4") == "claude"
+        assert ai_utils.resolve_tokenizer_family("groq:meta-llama/llama-4-scout-17b-16e-instruct") == "llama"
+        assert ai_utils.resolve_tokenizer_family("ollama:qwen3:8b") == "qwen"
+        assert ai_utils.resolve_tokenizer_family("gemini:gemini-2.5-flash") == "gemini"
+        assert ai_utils.resolve_tokenizer_family("ollama:gemma3:4b") == "gemma"
+        assert ai_utils.resolve_tokenizer_family("openai:gpt-4o-mini") == "openai-o200k"
+        assert ai_utils.resolve_tokenizer_family("openai:gpt-4") == "openai-cl100k"
+        assert ai_utils.resolve_tokenizer_family("openai:o3-mini") == "openai-o200k"
+
+    def test_resolve_tokenizer_family_provider_fallback(self):
+        """Unrecognized model names fall back to the provider family, then the default."""
+        assert ai_utils.resolve_tokenizer_family("zai:some-new-model") == "glm"
+        assert ai_utils.resolve_tokenizer_family("custom-openai:my-deployment") == "default"
+        assert ai_utils.resolve_tokenizer_family("unknown:model-xyz") == "default"
+
+    def test_count_tokens_applies_calibration_ratio(self):
+        """Families without a local tokenizer scale the base encoding count."""
+        text = " ".join(["word"] * 100)
+        with patch("gac.ai_utils.get_encoding", return_value=FakeEncoding()):
+            assert ai_utils.count_tokens(text, "openai:gpt-4") == 100
+            ratio = Tokenizers.FAMILIES["claude"][1]
+            assert ai_utils.count_tokens(text, "anthropic:claude-3-haiku") == math.ceil(100 * ratio)
+
+    def test_load_local_tokenizer_skips_closed_families(self, tmp_path, monkeypatch):
+        """Families without openly licensed tokenizers never load local files."""
+        (tmp_path / "claude.json").write_text("{}")
+        (tmp_path / "gemini.json").write_text("{}")
+        assert ai_utils.load_local_tokenizer("claude", tmp_path) is None
+        assert ai_utils.load_local_tokenizer("gemini", tmp_path) is None
+
+    def test_count_tokens_uses_local_tokenizer(self, tmp_path, monkeypatch):
+        """A local tokenizer file takes precedence over the ratio estimate."""
+        (tmp_path / "qwen.json").write_text("{}")
+        monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path))
+
+        fake_tokenizer = MagicMock()
+        fake_tokenizer.encode.return_value.ids = [1, 2, 3]
+        fake_module = MagicMock()
+        fake_module.Tokenizer.from_file.return_value = fake_tokenizer
+
+        with patch.dict(sys.modules, {"tokenizers": fake_module}):
+            assert ai_utils.count_tokens("some text", "ollama:qwen2.5-coder") == 3
+        fake_module.Tokenizer.from_file.assert_called_once_with(str(tmp_path / "qwen.json"))
+
+    def test_local_tokenizer_follows_tokenizer_dir(self, tmp_path, monkeypatch):
+        """Changing GAC_TOKENIZER_DIR loads the tokenizer from the new directory."""
+        for name in ("first", "second"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "qwen.json").write_text("{}")
+        fake_module = MagicMock()
+        fake_module.Tokenizer.from_file.side_effect = lambda path: path
+
+        with patch.dict(sys.modules, {"tokenizers": fake_module}):
+            monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path / "first"))
+            assert ai_utils.load_local_tokenizer("qwen", ai_utils.get_tokenizer_dir()) == str(
+                tmp_path / "first" / "qwen.json"
+            )
+            monkeypatch.setenv("GAC_TOKENIZER_DIR", str(tmp_path / "second"))
+            assert ai_utils.load_local_tokenizer("qwen", ai_utils.get_tokenizer_dir()) == str(
+                tmp_path / "second" / "qwen.json"
+            )
+
+
 class TestAIError:
     """Test AIError class."""
 
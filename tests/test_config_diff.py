@@ -0,0 +1,157 @@
+"""Tests for key-path diffs of configuration files."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from gac.config_diff import (
+    ConfigParseError,
+    config_format,
+    diff_key_paths,
+    parse_config,
+    summarize_config_section,
+)
+from gac.constants import ConfigDiff
+
+
+class TestParseConfig:
+    def test_formats(self):
+        assert config_format("deploy/values.YAML") == "yaml"
+        assert config_format("pyproject.toml") == "toml"
+        assert config_format("openapi.json") == "json"
+        assert config_format("setup.cfg") is None
+
+    def test_json_and_toml(self):
+        assert parse_config('{"a": [1, 2]}', "json") == {"a": [1, 2]}
+        assert parse_config('[project]\nname = "gac"\n', "toml") == {"project": {"name": "gac"}}
+
+    def test_invalid_content(self):
+        with pytest.raises(ConfigParseError):
+            parse_config("{not json", "json")
+        with pytest.raises(ConfigParseError):
+            parse_config("[project\n", "toml")
+
+    def test_yaml_without_pyyaml(self):
+        with patch.dict("sys.modules", {"yaml": None}), pytest.raises(ConfigParseError, match="PyYAML"):
+            parse_config("a: 1\n", "yaml")
+
+    def test_yaml_documents(self):
+        pytest.importorskip("yaml")
+        assert parse_config("a: 1\n", "yaml") == {"a": 1}
+        assert parse_config("a: 1\n---\nb: 2\n", "yaml") == [{"a": 1}, {"b": 2}]
+
+
+class TestDiffKeyPaths:
+    def test_mappings(self):
+        old = {"spec": {"replicas": 3, "image": "app:1"}, "dependencies": {"rich": "^14"}, "legacy": True}
+        new = {"dependencies": {"httpx": "^0.28", "rich": "^14"}, "spec": {"image": "app:1", "replicas": 5}}
+
+        assert diff_key_paths(old, new) == [
+            "-legacy",
+            '+dependencies.httpx: "^0.28"',
+            "spec.replicas: 3 → 5",
+        ]
+
+    def test_reordered_keys_are_not_changes(self):
+        assert diff_key_paths({"a": 1, "b": {"c": 2, "d": 3}}, {"b": {"d": 3, "c": 2}, "a": 1}) == []
+
+    def test_lists(self):
+        old = {"tags": ["a", "b"], "order": [1, 2, 3], "servers": [{"url": "x"}, {"url": "y"}], "hosts": [{"n": 1}]}
+        new = {"tags": ["b", "c"], "order": [3, 2, 1], "servers": [{"url": "x"}, {"url": "z"}], "hosts": []}
+
+        assert diff_key_paths(old, new) == [
+            '-tags[]: "a"',
+            '+tags[]: "c"',
+            "order: reordered",
+            'servers[1].url: "y" → "z"',
+            "hosts: [1 items] → []",
+        ]
+
+    def test_values_are_abbreviated(self):
+        old = {"description": "x" * 200, "limits": {"cpu": 1}, "weird.key": 1}
+        new = {"description": "y", "limits": 2, "weird.key": 2}
+
+        changes = diff_key_paths(old, new)
+
+        assert changes[0].startswith('description: "xxx')
+        assert changes[0].endswith('… → "y"')
+        assert len(changes[0]) < ConfigDiff.MAX_VALUE_LENGTH + 20
+        assert changes[1:] == ["limits: {1 keys} → 2", '"weird.key": 1 → 2']
+
+    def test_type_changes(self):
+        assert diff_key_paths({"a": 1}, {"a": "1"}) == ['a: 1 → "1"']
+        assert diff_key_paths({"a": 1}, {"a": True}) == ["a: 1 → true"]
+
+
+class TestSummarizeConfigSection:
+    OLD = {"name": "app", "spec": {"replicas": 3}, "items": {f"key{i}": i for i in range(30)}}
+    NEW = {"spec": {"replicas": 5}, "name": "app", "items": {f"key{i}": i for i in reversed(range(30))}}
+
+    def _section(self, filename: str = "deploy/app.json") -> str:
+        old_lines = json.dumps(self.OLD, indent=2).splitlines()
+        new_lines = json.dumps(self.NEW, indent=2).splitlines()
+        body = "".join(f"-{line}\n" for line in old_lines) + "".join(f"+{line}\n" for line in new_lines)
+        return (
+            f"diff --git a/{filename} b/{filename}\n"
+            "index 1111111..2222222 100644\n"
+            f"--- a/{filename}\n"
+            f"+++ b/{filename}\n"
+            f"@@ -1,{len(old_lines)} +1,{len(new_lines)} @@\n" + body
+        )
+
+    def _blobs(self) -> dict[str, bytes]:
+        return {"1111111": json.dumps(self.OLD).encode(), "2222222": json.dumps(self.NEW).encode()}
+
+    def test_summarizes_by_key_path(self):
+        section = self._section()
+        with patch("gac.config_diff.read_blobs", return_value=self._blobs()):
+            summary = summarize_config_section(section)
+
+        assert summary is not None
+        assert summary.startswith("diff --git a/deploy/app.json b/deploy/app.json\nindex 1111111..2222222 100644\n")
+        assert "[Config change by key path, " in summary
+        assert "  spec.replicas: 3 → 5]" in summary
+        assert "key29" not in summary
+
+    def test_keeps_line_diff_when_unparseable_or_unreadable(self):
+        section = self._section()
+        with patch("gac.config_diff.read_blobs", return_value={"1111111": b"{", "2222222": b"{}"}):
+            assert summarize_config_section(section) is None
+        with patch("gac.config_diff.read_blobs", return_value={}):
+            assert summarize_config_section(section) is None
+
+    def test_skips_small_and_unsupported_sections(self):
+        small = 'diff --git a/a.json b/a.json\nindex 1111111..2222222 100644\n@@ -1 +1 @@\n-{}\n+{"a": 1}\n'
+        with patch("gac.config_diff.read_blobs") as mock_read:
+            assert summarize_config_section(small) is None
+            assert summarize_config_section(self._section("app.py")) is None
+        mock_read.assert_not_called()
+
+    def test_changes_are_cached_by_blob_content(self):
+        section = self._section()
+        with patch("gac.config_diff.read_blobs", return_value=self._blobs()):
+            summary = summarize_config_section(section)
+            with patch("gac.config_diff.parse_config") as mock_parse:
+                assert summarize_config_section(section) == summary
+        mock_parse.assert_not_called()
+
+        # The same blob IDs with other content, as in another repository, are parsed again
+        self.NEW = {**self.NEW, "name": "other"}
+        with patch("gac.config_diff.read_blobs", return_value=self._blobs()):
+            assert 'name: "app" → "other"' in summarize_config_section(section)
+
+    def test_unparseable_pairs_are_not_cached(self):
+        section = self._section()
+        with patch("gac.config_diff.read_blobs", return_value=self._blobs()):
+            with patch("gac.config_diff.parse_config", side_effect=ConfigParseError("no parser")):
+                assert summarize_config_section(section) is None
+            assert summarize_config_section(section) is not None
+
+    def test_reordering_only(self):
+        self.NEW = {"items": self.OLD["items"], "spec": self.OLD["spec"], "name": "app"}
+        with patch("gac.config_diff.read_blobs", return_value=self._blobs()):
+            summary = summarize_config_section(self._section())
+
+        assert summary is not None
+        assert "no semantic changes (reordering or formatting only)" in summary
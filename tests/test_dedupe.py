@@ -0,0 +1,115 @@
+"""Tests for deduplication of repeated hunks across files."""
+
+from gac.dedupe import deduplicate_hunks, hunk_fingerprints
+from gac.preprocess import split_diff_into_sections
+
+
+def import_rewrite(path, module="old_logging", alias="log"):
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        "index 1111111..2222222 100644\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        f"@@ -1,3 +1,3 @@ header for {path}\n"
+        f" import os\n"
+        f"-import {module} as {alias}\n"
+        f"+import structured_logging as {alias}\n"
+        f" context_{path.replace('/', '_').replace('.', '_')} = 1\n"
+    )
+
+
+class TestHunkFingerprints:
+    """Tests for hunk fingerprinting."""
+
+    def test_context_and_whitespace_are_ignored(self):
+        """Only the changed lines, with whitespace normalized, feed the fingerprint."""
+        first = "@@ -1 +1 @@ a\n context\n-x = 1\n+x  =  2\n"
+        second = "@@ -9 +9 @@ b\n other\n-x = 1\n+x = 2\n"
+
+        assert hunk_fingerprints(first) == hunk_fingerprints(second)
+
+    def test_identifiers_only_affect_exact_fingerprint(self):
+        """Renamed identifiers give the same near fingerprint but a different exact one."""
+        first = hunk_fingerprints("@@ -1 +1 @@\n-return foo(a)\n+return bar(a)\n")
+        second = hunk_fingerprints("@@ -1 +1 @@\n-return baz(b)\n+return qux(b)\n")
+
+        assert first is not None and second is not None
+        assert first[0] != second[0]
+        assert first[1] == second[1]
+
+    def test_keywords_are_kept(self):
+        """Keywords are not normalized, so structurally different changes don't collide."""
+        first = hunk_fingerprints("@@ -1 +1 @@\n-return a\n+return b\n")
+        second = hunk_fingerprints("@@ -1 +1 @@\n-raise a\n+raise b\n")
+
+        assert first is not None and second is not None
+        assert first[1] != second[1]
+
+    def test_hunk_without_changes(self):
+        """Hunks without added or removed lines have no fingerprint."""
+        assert hunk_fingerprints("@@ -1 +1 @@\n context\n") is None
+
+
+class TestDeduplicateHunks:
+    """Tests for collapsing repeated hunks."""
+
+    def test_codemod_hunks_collapse_to_one_representative(self):
+        """A change repeated across many files is shown once with a rollup of the files."""
+        diff = "".join(import_rewrite(f"services/billing/module{i}.py") for i in range(50))
+        diff += import_rewrite("README.py", module="something_else", alias="other")
+
+        result = deduplicate_hunks(split_diff_into_sections(diff))
+
+        assert len(result) == 1
+        assert result[0].startswith("diff --git a/services/billing/module0.py")
+        assert "[Similar change (names differ) applied to 51 files:" in result[0]
+        assert "services/billing/** " in result[0]
+
+    def test_identical_hunks_are_reported_as_same_change(self):
+        """Hunks equal up to whitespace are reported as the same change."""
+        diff = "".join(import_rewrite(f"pkg/m{i}.py") for i in range(3))
+
+        result = deduplicate_hunks(split_diff_into_sections(diff))
+
+        assert len(result) == 1
+        assert "[Same change applied to 3 files: pkg/m0.py +1/-1, pkg/m1.py +1/-1, pkg/m2.py +1/-1]" in result[0]
+
+    def test_other_hunks_in_deduplicated_files_are_kept(self):
+        """Only the repeated hunks are removed from a file's section."""
+        sections = split_diff_into_sections("".join(import_rewrite(f"pkg/m{i}.py") for i in range(3)))
+        sections[2] += "@@ -20,1 +20,1 @@\n-unique_old()\n+unique_new()\n"
+
+        result = deduplicate_hunks(sections)
+
+        assert len(result) == 2
+        assert result[1].startswith("diff --git a/pkg/m2.py")
+        assert "import structured_logging" not in result[1]
+        assert "+unique_new()" in result[1]
+
+    def test_small_clusters_are_untouched(self):
+        """Changes shared by fewer files than the cluster threshold are left alone."""
+        sections = split_diff_into_sections("".join(import_rewrite(f"pkg/m{i}.py") for i in range(2)))
+
+        assert deduplicate_hunks(sections) == sections
+
+    def test_trivial_hunks_in_different_files_are_kept(self):
+        """Unrelated one-line changes that only look alike with names normalized are not merged."""
+        diff = "".join(
+            f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -1 +1 @@\n-{name} = 1\n+{name} = 2\n"
+            for path, name in (("a.py", "timeout"), ("b.py", "retries"), ("c.py", "workers"))
+        )
+        sections = split_diff_into_sections(diff)
+
+        assert deduplicate_hunks(sections) == sections
+
+    def test_identical_trivial_hunks_are_still_deduplicated(self):
+        """Small hunks that are exactly the same are still shown once."""
+        diff = "".join(
+            f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+            for path in ("a.py", "b.py", "c.py")
+        )
+
+        result = deduplicate_hunks(split_diff_into_sections(diff))
+
+        assert len(result) == 1
+        assert "[Same change applied to 3 files:" in result[0]
@@ -0,0 +1,90 @@
+"""Tests for compact diff rendering."""
+
+from gac.diff_render import render_compact_diff, resolve_diff_format
+
+HEADER = "diff --git a/src/app.py b/src/app.py\nindex 1111111..2222222 100644\n--- a/src/app.py\n+++ b/src/app.py\n"
+
+HUNK = """@@ -10,9 +10,9 @@ def main():
+     a = 1
+     b = 2
+     c = 3
+-    d = 4
++    d = 5
+     e = 6
+     f = 7
+     g = 8
+     h = 9
+"""
+
+
+class TestRenderCompactDiff:
+    def test_single_header_and_trimmed_context(self):
+        result = render_compact_diff(HEADER + HUNK)
+
+        assert result == "## src/app.py\n@@ -12 +12 @@ def main():\n     c = 3\n-    d = 4\n+    d = 5\n     e = 6\n"
+
+    def test_zero_context(self):
+        result = render_compact_diff(HEADER + HUNK, context_lines=0)
+
+        assert result == "## src/app.py\n@@ -13 +13 @@ def main():\n-    d = 4\n+    d = 5\n"
+
+    def test_short_gaps_are_merged(self):
+        hunk = "@@ -1,6 +1,6 @@\n-a\n+A\n b\n c\n-d\n+D\n e\n"
+
+        assert render_compact_diff(HEADER + hunk, context_lines=0) == "## src/app.py\n-a\n+A\n b\n c\n-d\n+D\n"
+
+    def test_long_gaps_get_region_headers(self):
+        hunk = "@@ -1,8 +1,8 @@ class A:\n-a\n+A\n b\n c\n d\n e\n-f\n+F\n"
+
+        result = render_compact_diff(HEADER + hunk, context_lines=0)
+
+        # The function heading is shown once per hunk
+        assert result == "## src/app.py\n-a\n+A\n@@ -6 +6 @@\n-f\n+F\n"
+
+    def test_file_status_and_notes(self):
+        diff = (
+            "diff --git a/old.py b/new.py\nsimilarity index 90%\nrename from old.py\nrename to new.py\n"
+            "index 1111111..2222222 100644\n--- a/old.py\n+++ b/new.py\n@@ -1,1 +1,1 @@\n-x\n+y\n"
+            "diff --git a/run.sh b/run.sh\nold mode 100644\nnew mode 100755\n"
+            "diff --git a/data.json b/data.json\n[Config change by key path, 40 changed lines summarized:\n  a: 1 → 2]\n"
+        )
+
+        result = render_compact_diff("[Reformatted 1 file (formatting only): x.py +1/-1]\n" + diff)
+
+        assert result == (
+            "[Reformatted 1 file (formatting only): x.py +1/-1]\n"
+            "## new.py (renamed from old.py)\n-x\n+y\n"
+            "## run.sh (mode 100644 → 100755)\n"
+            "## data.json\n[Config change by key path, 40 changed lines summarized:\n  a: 1 → 2]\n"
+        )
+
+    def test_markers_in_hunks_are_kept(self):
+        hunk = "@@ -1,0 +1,8 @@\n[Moved 7 lines from a.py to b.py]\n+x = 1\n"
+
+        assert render_compact_diff(HEADER + hunk) == "## src/app.py\n[Moved 7 lines from a.py to b.py]\n+x = 1\n"
+
+    def test_no_newline_markers_are_context(self):
+        hunk = "@@ -1,6 +1,6 @@\n-a\n+A\n b\n c\n d\n e\n f\n\\ No newline at end of file\n"
+
+        assert render_compact_diff(HEADER + hunk, context_lines=1) == "## src/app.py\n-a\n+A\n b\n"
+
+        hunk = "@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n+b\n"
+        assert render_compact_diff(HEADER + hunk, context_lines=0) == (
+            "## src/app.py\n@@ -2 +2 @@\n-b\n\\ No newline at end of file\n+b\n"
+        )
+
+    def test_empty(self):
+        assert render_compact_diff("") == ""
+
+
+class TestResolveDiffFormat:
+    def test_configured_format_wins(self):
+        assert resolve_diff_format("ollama:llama3", "unified") == "unified"
+        assert resolve_diff_format("openai:gpt-4o", "compact") == "compact"
+
+    def test_model_defaults(self):
+        assert resolve_diff_format("ollama:llama3") == "compact"
+        assert resolve_diff_format("anthropic:claude-3-5-haiku-latest") == "unified"
+
+    def test_unknown_format_falls_back(self):
+        assert resolve_diff_format("openai:gpt-4o", "tiny") == "unified"
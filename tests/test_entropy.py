@@ -0,0 +1,58 @@
+"""Tests for high-entropy string detection."""
+
+import math
+from unittest.mock import patch
+
+import pytest
+
+from gac.entropy import EntropyThresholds, batch_entropies, find_high_entropy_strings, shannon_entropy
+
+RANDOM_BASE64 = "q8Zr2Lx9Vb4NwT7mKp0sYd3Hf6Jc1GuE"
+RANDOM_HEX = "9f86d081884c7d659a2feaa0c55ad015"
+
+
+def test_shannon_entropy():
+    assert shannon_entropy("") == 0.0
+    assert shannon_entropy("aaaa") == 0.0
+    assert shannon_entropy("abcd") == 2.0
+    assert shannon_entropy("0123456789abcdef") == 4.0
+
+
+def test_batch_entropies_matches_per_string_scores():
+    candidates = [RANDOM_BASE64, RANDOM_HEX, "aaaa", "abcd"] * 20
+
+    assert batch_entropies(candidates) == pytest.approx([shannon_entropy(candidate) for candidate in candidates])
+    assert batch_entropies([]) == []
+
+
+def test_batch_entropies_without_numpy():
+    with patch("gac.entropy._numpy_entropies", return_value=None):
+        assert batch_entropies(["abcd"] * 100) == [2.0] * 100
+
+
+def test_numpy_batch_scoring():
+    pytest.importorskip("numpy")
+    from gac.entropy import _numpy_entropies
+
+    assert _numpy_entropies(["abcd", "aabb", "0123456789abcdef"]) == pytest.approx([2.0, 1.0, 4.0])
+
+
+def test_find_high_entropy_strings():
+    lines = [
+        (1, f'API_TOKEN = "{RANDOM_BASE64}"'),
+        (2, f"checksum: {RANDOM_HEX}"),
+        (3, 'name = "get_user_by_identifier"'),
+        (4, 'version = "1.2.3-beta.4+build.5"'),
+        (5, 'path = "src/gac/v2/module_name"'),
+    ]
+
+    findings = find_high_entropy_strings(lines, EntropyThresholds())
+
+    assert findings == [(1, "base64", RANDOM_BASE64), (2, "hex", RANDOM_HEX)]
+
+
+def test_thresholds_are_tunable():
+    lines = [(1, f'key = "{RANDOM_BASE64}"')]
+
+    assert find_high_entropy_strings(lines, EntropyThresholds(base64=math.log2(64))) == []
+    assert find_high_entropy_strings(lines, EntropyThresholds(base64=3.0)) == [(1, "base64", RANDOM_BASE64)]
@@ -0,0 +1,102 @@
+"""Tests for formatting-only change detection."""
+
+from gac.formatting import collapse_formatting_changes, format_reformatted_note, is_formatting_only_hunk
+from gac.rollup import FileChangeStat
+
+REFLOW = """@@ -10,2 +10,6 @@ def main():
+-    result = compute(alpha, beta, gamma)
+-    print('done')
++    result = compute(
++        alpha,
++        beta,
++        gamma
++    )
++    print("done")
+"""
+
+JS_REFLOW = """@@ -1,1 +1,5 @@
+-const total = sum([a, b], 'x');
++const total = sum(
++  [a, b],
++  "x",
++);
+"""
+
+LOGIC = """@@ -20,1 +24,1 @@ def main():
+-    return result
++    return result * 2
+"""
+
+
+def _section(filename: str, *hunks: str) -> str:
+    return (
+        f"diff --git a/{filename} b/{filename}\nindex 1111111..2222222 100644\n--- a/{filename}\n+++ b/{filename}\n"
+        + "".join(hunks)
+    )
+
+
+class TestIsFormattingOnlyHunk:
+    def test_reflow_and_quotes(self):
+        assert is_formatting_only_hunk(REFLOW, "app.py")
+
+    def test_trailing_comma_outside_python(self):
+        assert is_formatting_only_hunk(JS_REFLOW, "app.ts")
+
+    def test_whitespace_and_blank_lines(self):
+        assert is_formatting_only_hunk("@@ -1,2 +1,3 @@\n-\tif (x) {\n+    if (x) {\n+\n", "app.js")
+        assert is_formatting_only_hunk("@@ -1,0 +1,1 @@\n+\n", "app.py")
+
+    def test_semantic_changes(self):
+        assert not is_formatting_only_hunk(LOGIC, "app.py")
+        assert not is_formatting_only_hunk("@@ -1,0 +1,1 @@\n+import os\n", "app.py")
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n context only\n", "app.py")
+
+    def test_statement_moved_past_unchanged_line(self):
+        assert not is_formatting_only_hunk("@@ -1,3 +1,3 @@\n-init()\n run()\n+init()\n", "app.py")
+        assert not is_formatting_only_hunk("@@ -1,2 +1,2 @@\n-a = 1;\n b();\n+a = 1;\n", "app.js")
+
+    def test_python_dedent_is_not_formatting(self):
+        """A statement moved out of a loop changes behavior."""
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-    commit()\n+commit()\n", "app.py")
+
+    def test_python_tuple_trailing_comma_is_not_formatting(self):
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-timeout = (30,)\n+timeout = (30)\n", "app.py")
+        assert is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-ids = [1, 2,]\n+ids = [1, 2]\n", "app.py")
+
+    def test_string_contents_are_kept(self):
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-sep = ', '\n+sep = ','\n", "app.py")
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-sep = ', ';\n+sep = \",\";\n", "app.js")
+        assert is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-sep = ', ';\n+sep = \", \";\n", "app.js")
+
+    def test_tokens_are_not_joined(self):
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-return not_ready\n+returnnot_ready\n", "app.js")
+
+    def test_yaml_key_moved_under_another_parent(self):
+        hunk = "@@ -1,3 +1,3 @@\n server:\n   port: 80\n-timeout: 5\n+  timeout: 5\n"
+        assert not is_formatting_only_hunk(hunk, "config/app.yaml")
+
+    def test_python_continuation_lines_may_be_reindented(self):
+        hunk = "@@ -1,2 +1,2 @@\n-x = call(a,\n-         b)\n+x = call(a,\n+    b)\n"
+        assert is_formatting_only_hunk(hunk, "app.py")
+        assert not is_formatting_only_hunk("@@ -1,1 +1,1 @@\n-\tcc -o app\n+    cc -o app\n", "Makefile")
+
+
+class TestCollapseFormattingChanges:
+    def test_drops_reformatted_files_and_hunks(self):
+        reformatted = _section("src/app.py", REFLOW)
+        mixed = _section("src/main.py", REFLOW, LOGIC)
+        logic = _section("src/util.py", LOGIC)
+        rename = "diff --git a/a.py b/b.py\nsimilarity index 100%\nrename from a.py\nrename to b.py\n"
+
+        sections, files = collapse_formatting_changes([reformatted, mixed, logic, rename])
+
+        assert files == [FileChangeStat("src/app.py", 6, 2)]
+        assert sections[0] == _section("src/main.py", LOGIC.rstrip("\n") + "\n[1 formatting-only hunk omitted]\n")
+        assert sections[1:] == [logic, rename]
+
+    def test_note(self):
+        files = [FileChangeStat(f"src/pkg/mod{i}.py", 10, 8) for i in range(12)]
+
+        assert format_reformatted_note([]) == ""
+        assert format_reformatted_note(files[:1]) == "[Reformatted 1 file (formatting only): src/pkg/mod0.py +10/-8]"
+        assert format_reformatted_note(files).startswith("[Reformatted 12 files (formatting only): src/pkg/")
@@ -1,16 +1,26 @@
 import subprocess
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from gac.errors import GitError
 from gac.git import (
     get_commit_hash,
     get_current_branch,
     get_diff,
+    get_index_tree,
     get_repo_root,
+    get_staged_blob_ids,
     get_staged_files,
+    get_staged_numstat,
+    hooks_configured,
+    iter_blob_lines,
+    iter_log_patches,
     push_changes,
+    read_blobs,
     run_lefthook_hooks,
     run_pre_commit_hooks,
+    unstage_files,
 )
 
 
@@ -77,6 +87,47 @@ def test_get_staged_files_existing_only():
         assert result == ["file1.py", "file3.txt"]
 
 
+def test_get_staged_blob_ids_parses_raw_entries():
+    old, new, zero = "a" * 40, "b" * 40, "0" * 40
+    output = (
+        f":100644 100644 {old} {new} M\0src/app.py\0"
+        f":000000 100644 {zero} {new} A\0new file.txt\0"
+        f":100644 100644 {old} {old} R100\0old.py\0moved/new.py\0"
+    )
+    with patch("gac.git.run_git_command", return_value=output) as mock_run:
+        result = get_staged_blob_ids()
+
+    assert mock_run.call_args.args[0][:5] == ["diff", "--cached", "--raw", "--no-abbrev", "-z"]
+    assert result == {
+        ("src/app.py", "src/app.py"): (old, new),
+        ("new file.txt", "new file.txt"): (zero, new),
+        ("old.py", "moved/new.py"): (old, old),
+    }
+
+
+def test_get_staged_blob_ids_git_error():
+    with patch("gac.git.run_git_command", side_effect=GitError("not a repo")):
+        assert get_staged_blob_ids() == {}
+
+
+def test_get_staged_numstat_parses_entries():
+    output = "3\t1\tvery/long/path/to/app.py\0-\t-\tlogo.png\00\t2\t\0old.py\0moved/new.py\0"
+    with patch("gac.git.run_git_command", return_value=output) as mock_run:
+        result = get_staged_numstat()
+
+    assert mock_run.call_args.args[0][:4] == ["diff", "--cached", "--numstat", "-z"]
+    assert [(change.path, change.additions, change.deletions) for change in result] == [
+        ("very/long/path/to/app.py", 3, 1),
+        ("logo.png", 0, 0),
+        ("moved/new.py", 0, 2),
+    ]
+
+
+def test_get_staged_numstat_git_error():
+    with patch("gac.git.run_git_command", side_effect=GitError("not a repo")):
+        assert get_staged_numstat() == []
+
+
 def test_get_diff_unstaged():
     """Test get_diff with staged=False."""
     with patch("gac.git.run_git_command") as mock_run:
@@ -429,3 +480,134 @@ def test_run_lefthook_hooks_multiple_config_files():
 
         result = run_lefthook_hooks()
         assert result is True
+
+
+def test_read_blobs_parses_batch_output():
+    """Blobs are read in one cat-file call, skipping missing and non-blob objects."""
+    output = b"aaa blob 5\nhello\nbbb missing\nccc tree 4\n\x00\x01\n\x03\nddd blob 3\na\nb\n"
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stdout=output, stderr=b"")
+
+        blobs = read_blobs(["aaa", "bbb", "ccc", "ddd", "aaa"])
+
+    assert blobs == {"aaa": b"hello", "ddd": b"a\nb"}
+    mock_run.assert_called_once()
+    assert mock_run.call_args.args[0] == ["git", "cat-file", "--batch"]
+    assert mock_run.call_args.kwargs["input"] == b"aaa\nbbb\nccc\nddd\n"
+
+
+def test_read_blobs_failure():
+    """Git failures return no blobs."""
+    with patch("subprocess.run", side_effect=OSError("git not found")):
+        assert read_blobs(["aaa"]) == {}
+    assert read_blobs([]) == {}
+
+
+def test_iter_blob_lines_streams_output():
+    """Blob lines are yielded from the cat-file process as they are read."""
+    with patch("subprocess.Popen") as mock_popen:
+        process = mock_popen.return_value
+        process.__enter__.return_value = process
+        process.stdout = iter(["a\n", "b\n"])
+        process.returncode = 0
+
+        assert list(iter_blob_lines("abc123")) == ["a\n", "b\n"]
+
+    assert mock_popen.call_args.args[0] == ["git", "cat-file", "blob", "abc123"]
+
+
+def test_iter_blob_lines_failure():
+    """A failing cat-file raises GitError once the stream ends."""
+    with patch("subprocess.Popen") as mock_popen:
+        process = mock_popen.return_value
+        process.__enter__.return_value = process
+        process.stdout = iter([])
+        process.returncode = 128
+
+        with pytest.raises(GitError):
+            list(iter_blob_lines("missing"))
+
+    with patch("subprocess.Popen", side_effect=OSError("git not found")), pytest.raises(GitError):
+        list(iter_blob_lines("abc123"))
+
+
+def test_iter_log_patches_splits_commits():
+    """The log is split into one patch per commit, skipping commits without a patch."""
+    stderr_seen = []
+
+    def fake_popen(args, **kwargs):
+        stderr_seen.append(kwargs["stderr"])
+        kwargs["stderr"].write(b"warning: inexact rename detection was skipped\n" * 10000)
+        process = MagicMock()
+        process.__enter__.return_value = process
+        process.stdout = iter(
+            ["\0aaa\n", "\n", "diff --git a/x b/x\n", "+one\n", "\0merge\n", "\n", "\0bbb\n", "\n", "+two\n"]
+        )
+        process.returncode = 0
+        return process
+
+    with patch("subprocess.Popen", side_effect=fake_popen) as mock_popen:
+        patches = list(iter_log_patches("v1..HEAD"))
+
+    assert patches == [("aaa", "\ndiff --git a/x b/x\n+one\n"), ("bbb", "\n+two\n")]
+    args = mock_popen.call_args.args[0]
+    assert args[:3] == ["git", "log", "-p"]
+    assert "--full-index" in args
+    assert args[-2:] == ["v1..HEAD", "--"]
+    # stderr goes to a file, which can't fill up like a pipe
+    assert stderr_seen[0] is not subprocess.PIPE and hasattr(stderr_seen[0], "seek")
+
+
+def test_iter_log_patches_failure(tmp_path, monkeypatch):
+    """An invalid range raises GitError with git's message."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(GitError, match="nope"):
+        list(iter_log_patches("nope"))
+
+
+def test_unstage_files_single_call():
+    """All paths are unstaged by one restore call, fed NUL-separated on stdin."""
+    with (
+        patch("gac.git.run_git_command", return_value="abc123") as mock_git,
+        patch("subprocess.run") as mock_run,
+    ):
+        mock_run.return_value = MagicMock(returncode=0)
+
+        assert unstage_files(["a.py", "dir/b c.py"]) is True
+
+    mock_git.assert_called_once_with(["rev-parse", "--verify", "--quiet", "HEAD"], silent=True)
+    mock_run.assert_called_once()
+    assert mock_run.call_args.args[0][:3] == ["git", "restore", "--staged"]
+    assert mock_run.call_args.kwargs["input"] == b":(top,literal)a.py\0:(top,literal)dir/b c.py"
+
+
+def test_unstage_files_without_head_and_failure():
+    """Without commits files are removed from the index, and git failures return False."""
+    with patch("gac.git.run_git_command", return_value=""), patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=1, stderr=b"fatal: error")
+
+        assert unstage_files(["a.py"]) is False
+
+    assert mock_run.call_args.args[0][:3] == ["git", "rm", "--cached"]
+    assert unstage_files([]) is True
+
+
+def test_get_index_tree():
+    """The index tree ID comes from write-tree, and None when it cannot be written."""
+    with patch("gac.git.run_git_command", return_value="4b825dc") as mock_git:
+        assert get_index_tree() == "4b825dc"
+    mock_git.assert_called_once_with(["write-tree"], silent=True)
+
+    with patch("gac.git.run_git_command", return_value=""):
+        assert get_index_tree() is None
+
+
+def test_hooks_configured(tmp_path, monkeypatch):
+    """Hooks count as configured when a pre-commit or Lefthook config exists."""
+    monkeypatch.chdir(tmp_path)
+    assert hooks_configured() is False
+
+    (tmp_path / "lefthook.yml").write_text("pre-commit: {}\n")
+    assert hooks_configured() is True
@@ -0,0 +1,103 @@
+"""Tests for secret scanning of commit history."""
+
+import json
+from unittest.mock import patch
+
+from gac import __version__
+from gac.history_scan import HistoryFinding, format_json_report, format_sarif_report, scan_history
+from gac.security import DetectedSecret
+
+TOKEN = f"ghp_{'Zq9' * 12}"
+
+
+def make_section(path: str, old_id: str, new_id: str, added: str) -> str:
+    return (
+        f"diff --git a/{path} b/{path}\nindex {old_id}..{new_id} 100644\n--- a/{path}\n+++ b/{path}\n"
+        f"@@ -1,1 +1,2 @@\n import os\n+{added}\n"
+    )
+
+
+def test_scan_history_reports_commits():
+    patches = [
+        ("c2", make_section("app.py", "1" * 40, "2" * 40, "x = 1")),
+        ("c1", make_section("config.py", "3" * 40, "4" * 40, f"token = '{TOKEN}'")),
+    ]
+    with patch("gac.history_scan.iter_log_patches", return_value=iter(patches)) as mock_log:
+        findings = scan_history("v1..HEAD", max_workers=1)
+
+    mock_log.assert_called_once_with("v1..HEAD")
+    assert [(finding.commit, finding.secret.file_path) for finding in findings] == [("c1", "config.py")]
+    assert findings[0].secret.line_number == 2
+
+
+def test_scan_history_scans_repeated_changes_once():
+    """A cherry-picked change has the same path and blobs, and is only reported for one commit."""
+    section = make_section("config.py", "3" * 40, "4" * 40, f"token = '{TOKEN}'")
+    patches = [("pick", section), ("original", section)]
+    with patch("gac.history_scan.iter_log_patches", return_value=iter(patches)):
+        findings = scan_history("HEAD", max_workers=1)
+
+    assert [finding.commit for finding in findings] == ["pick"]
+
+
+def test_scan_history_scans_in_chunks():
+    patches = [
+        (f"c{n}", make_section(f"f{n}.py", "0" * 39 + "1", f"{n:040d}", f"token = '{TOKEN}'")) for n in range(1, 4)
+    ]
+    with (
+        patch("gac.history_scan.iter_log_patches", return_value=iter(patches)),
+        patch("gac.history_scan.HistoryScan.CHUNK_BYTES", 1),
+        patch("gac.history_scan.map_sections", wraps=lambda func, sections, workers: [func(s) for s in sections]) as m,
+    ):
+        findings = scan_history("HEAD")
+
+    assert m.call_count == 4  # One per commit, then the empty remainder
+    assert [finding.commit for finding in findings] == ["c1", "c2", "c3"]
+
+
+def finding(commit: str | None) -> HistoryFinding:
+    context = f"token = '{TOKEN}'"
+    return HistoryFinding(commit, DetectedSecret("config.py", 2, "Github Token", TOKEN, context, fingerprint="abc"))
+
+
+def test_format_json_report():
+    report = json.loads(format_json_report([finding("c1"), finding(None)]))
+
+    assert report[0]["commit"] == "c1"
+    assert report[0]["secret_type"] == "Github Token"
+    assert report[0]["fingerprint"] == "abc"
+    assert "commit" not in report[1]
+
+
+def test_format_json_report_leaves_out_secrets():
+    text = format_json_report([finding("c1")])
+    report = json.loads(text)
+
+    assert TOKEN[:10] not in text
+    assert "context" not in report[0]
+    assert report[0]["matched_text"] == "ghp_Zq..."
+
+
+def test_format_sarif_report():
+    report = json.loads(format_sarif_report([finding("c1")]))
+
+    assert report["version"] == "2.1.0"
+    run = report["runs"][0]
+    assert run["tool"]["driver"]["name"] == "gac"
+    assert run["tool"]["driver"]["version"] == __version__
+    assert run["tool"]["driver"]["rules"][0]["id"] == "github-token"
+    result = run["results"][0]
+    assert result["ruleId"] == "github-token"
+    assert result["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "config.py"},
+        "region": {"startLine": 2},
+    }
+    assert result["properties"] == {"commit": "c1"}
+    assert list(result["partialFingerprints"].values()) == ["abc"]
+
+
+def test_format_sarif_report_empty():
+    run = json.loads(format_sarif_report([]))["runs"][0]
+
+    assert run["results"] == []
+    assert run["tool"]["driver"]["rules"] == []
@@ -0,0 +1,295 @@
+"""Tests for lockfile dependency summaries."""
+
+from unittest.mock import patch
+
+from gac.constants import Lockfiles
+from gac.errors import GitError
+from gac.lockfiles import (
+    describe_package_changes,
+    lockfile_format,
+    parse_lockfile,
+    summarize_lockfile_section,
+)
+
+
+def _lines(text: str) -> list[str]:
+    return text.splitlines(keepends=True)
+
+
+class TestParsers:
+    def test_npm_lockfile_v3(self):
+        text = """{
+  "name": "app",
+  "version": "1.0.0",
+  "lockfileVersion": 3,
+  "packages": {
+    "": {
+      "name": "app",
+      "version": "1.0.0",
+      "dependencies": {
+        "left-pad": "^1.3.0"
+      }
+    },
+    "node_modules/left-pad": {
+      "version": "1.3.0",
+      "funding": [
+        {
+          "type": "github",
+          "url": "https://example.com"
+        }
+      ]
+    },
+    "node_modules/@babel/core": {
+      "version": "7.24.0",
+      "engines": {
+        "node": ">=6.9.0"
+      }
+    },
+    "node_modules/a/node_modules/left-pad": {
+      "version": "1.1.0"
+    }
+  }
+}
+"""
+        assert parse_lockfile(_lines(text), "npm") == {
+            "left-pad": {"1.3.0", "1.1.0"},
+            "@babel/core": {"7.24.0"},
+        }
+
+    def test_npm_lockfile_v1(self):
+        text = """{
+  "name": "app",
+  "version": "1.0.0",
+  "lockfileVersion": 1,
+  "dependencies": {
+    "express": {
+      "version": "4.18.2",
+      "requires": {
+        "accepts": "~1.3.8"
+      },
+      "dependencies": {
+        "debug": {
+          "version": "2.6.9"
+        }
+      }
+    }
+  }
+}
+"""
+        assert parse_lockfile(_lines(text), "npm") == {"express": {"4.18.2"}, "debug": {"2.6.9"}}
+
+    def test_yarn_classic_and_berry(self):
+        classic = """# yarn lockfile v1
+
+"@babel/code-frame@^7.0.0", "@babel/code-frame@^7.10.4":
+  version "7.12.13"
+  resolved "https://registry.yarnpkg.com/@babel/code-frame/-/code-frame-7.12.13.tgz"
+  dependencies:
+    "@babel/highlight" "^7.12.13"
+
+left-pad@^1.3.0:
+  version "1.3.0"
+"""
+        berry = """__metadata:
+  version: 6
+  cacheKey: 8
+
+"left-pad@npm:^1.3.0":
+  version: 1.3.0
+  resolution: "left-pad@npm:1.3.0"
+"""
+        assert parse_lockfile(_lines(classic), "yarn") == {
+            "@babel/code-frame": {"7.12.13"},
+            "left-pad": {"1.3.0"},
+        }
+        assert parse_lockfile(_lines(berry), "yarn") == {"left-pad": {"1.3.0"}}
+
+    def test_pnpm_key_formats(self):
+        text = """lockfileVersion: '6.0'
+
+importers:
+  .:
+    dependencies:
+      react:
+        specifier: ^18.0.0
+
+packages:
+
+  /react@18.2.0:
+    resolution: {integrity: sha512-abc}
+
+  /@types/node@20.1.0(typescript@5.0.0):
+    resolution: {integrity: sha512-def}
+
+  /left-pad/1.3.0_react@18.2.0:
+    resolution: {integrity: sha512-ghi}
+
+  '@scope/pkg@2.0.0':
+    resolution: {integrity: sha512-jkl}
+
+snapshots:
+
+  other@1.0.0:
+    dependencies: {}
+"""
+        assert parse_lockfile(_lines(text), "pnpm") == {
+            "react": {"18.2.0"},
+            "@types/node": {"20.1.0"},
+            "left-pad": {"1.3.0"},
+            "@scope/pkg": {"2.0.0"},
+        }
+
+    def test_toml_package_tables(self):
+        text = """version = 1
+
+[[package]]
+name = "httpx"
+version = "0.27.2"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [
+    { name = "anyio" },
+]
+
+[package.metadata]
+requires-dist = [{ name = "x", version = "9" }]
+
+[[package]]
+name = "anyio"
+version = "4.4.0"
+"""
+        assert parse_lockfile(_lines(text), "toml") == {"httpx": {"0.27.2"}, "anyio": {"4.4.0"}}
+
+    def test_go_sum(self):
+        text = """golang.org/x/text v0.14.0 h1:abc=
+golang.org/x/text v0.14.0/go.mod h1:def=
+github.com/pkg/errors v0.9.1/go.mod h1:ghi=
+"""
+        assert parse_lockfile(_lines(text), "gosum") == {
+            "golang.org/x/text": {"v0.14.0"},
+            "github.com/pkg/errors": {"v0.9.1"},
+        }
+
+    def test_gemfile_lock(self):
+        text = """GEM
+  remote: https://rubygems.org/
+  specs:
+    rack (3.0.8)
+    rails (7.1.2)
+      rack (>= 2.2.4)
+
+PLATFORMS
+  ruby
+
+DEPENDENCIES
+  rails (~> 7.1)
+
+BUNDLED WITH
+   2.4.10
+"""
+        assert parse_lockfile(_lines(text), "bundler") == {"rack": {"3.0.8"}, "rails": {"7.1.2"}}
+
+    def test_parses_streams_lazily(self):
+        """Parsers consume any iterable, so lockfiles never need to be held in memory."""
+
+        def stream():
+            for i in range(20000):
+                yield "[[package]]\n"
+                yield f'name = "pkg{i}"\n'
+                yield f'version = "1.0.{i}"\n'
+
+        packages = parse_lockfile(stream(), "toml")
+
+        assert len(packages) == 20000
+        assert packages["pkg19999"] == {"1.0.19999"}
+
+
+class TestDescribePackageChanges:
+    def test_change_kinds(self):
+        old = {"httpx": {"0.27.2"}, "requests": {"2.32.0"}, "urllib3": {"2.2.0"}, "six": {"1.16.0"}}
+        new = {"httpx": {"0.28.1"}, "requests": {"2.31.0"}, "urllib3": {"2.2.0"}, "tiktoken": {"0.12.0"}}
+
+        assert describe_package_changes(old, new) == [
+            "bumped httpx 0.27.2→0.28.1",
+            "downgraded requests 2.32.0→2.31.0",
+            "removed six 1.16.0",
+            "added tiktoken 0.12.0",
+        ]
+
+    def test_multiple_versions(self):
+        old = {"a": {"1.0.0", "2.0.0"}, "b": {"1.0.0"}, "c": {"1.0.0", "2.0.0"}}
+        new = {"a": {"1.1.0", "2.1.0"}, "b": {"1.0.0", "2.0.0"}, "c": {"2.0.0"}}
+
+        assert describe_package_changes(old, new) == [
+            "changed a 1.0.0, 2.0.0→1.1.0, 2.1.0",
+            "added b 2.0.0 alongside 1.0.0",
+            "removed c 1.0.0, kept 2.0.0",
+        ]
+
+
+class TestSummarizeLockfileSection:
+    SECTION = """diff --git a/uv.lock b/uv.lock
+index 1111111..2222222 100644
+--- a/uv.lock
++++ b/uv.lock
+@@ -10,7 +10,7 @@ dependencies = [
+ [[package]]
+ name = "httpx"
+-version = "0.27.2"
++version = "0.28.1"
+ source = { registry = "https://pypi.org/simple" }
+@@ -40,0 +40,4 @@ wheels = [
++
++[[package]]
++name = "tiktoken"
++version = "0.12.0"
+"""
+
+    def test_lockfile_format(self):
+        assert lockfile_format("web/package-lock.json") == "npm"
+        assert lockfile_format("Cargo.lock") == "toml"
+        assert lockfile_format("go.sum") == "gosum"
+        assert lockfile_format("Pipfile.lock") is None
+        assert lockfile_format("src/main.py") is None
+
+    def test_reads_both_blobs(self):
+        blobs = {
+            "1111111": '[[package]]\nname = "httpx"\nversion = "0.27.2"\n',
+            "2222222": '[[package]]\nname = "httpx"\nversion = "0.28.1"\n[[package]]\nname = "tiktoken"\nversion = "0.12.0"\n',
+        }
+        with patch("gac.lockfiles.iter_blob_lines", side_effect=lambda object_id: iter(_lines(blobs[object_id]))):
+            summary = summarize_lockfile_section(self.SECTION)
+
+        assert summary == "[Lockfile change: bumped httpx 0.27.2→0.28.1, added tiktoken 0.12.0]"
+
+    def test_falls_back_to_hunks(self):
+        with patch("gac.lockfiles.iter_blob_lines", side_effect=GitError("missing blob")):
+            summary = summarize_lockfile_section(self.SECTION)
+
+        assert summary == "[Lockfile change: bumped httpx 0.27.2→0.28.1, added tiktoken 0.12.0]"
+
+    def test_new_lockfile_reads_only_new_blob(self):
+        section = self.SECTION.replace("index 1111111..2222222 100644", "new file mode 100644\nindex 0000000..2222222")
+        with patch(
+            "gac.lockfiles.iter_blob_lines", return_value=iter(_lines('[[package]]\nname = "x"\nversion = "1"\n'))
+        ) as mock_iter:
+            summary = summarize_lockfile_section(section)
+
+        mock_iter.assert_called_once_with("2222222")
+        assert summary == "[Lockfile change: added x 1]"
+
+    def test_caps_listed_changes(self):
+        new = "".join(f'[[package]]\nname = "pkg{i:03}"\nversion = "1.0"\n' for i in range(Lockfiles.MAX_CHANGES + 5))
+        with patch(
+            "gac.lockfiles.iter_blob_lines",
+            side_effect=lambda object_id: iter(_lines(new) if object_id == "2222222" else []),
+        ):
+            summary = summarize_lockfile_section(self.SECTION)
+
+        assert summary is not None
+        assert summary.endswith(", and 5 more]")
+        assert summary.count("added pkg") == Lockfiles.MAX_CHANGES
+
+    def test_unsupported_or_unchanged(self):
+        assert summarize_lockfile_section(self.SECTION.replace("uv.lock", "Pipfile.lock")) is None
+        with patch("gac.lockfiles.iter_blob_lines", side_effect=lambda object_id: iter(['name = "x"\n'])):
+            assert summarize_lockfile_section(self.SECTION) is None
@@ -0,0 +1,82 @@
+"""Tests for the model context-window catalog."""
+
+import json
+
+import pytest
+
+from gac.constants import ModelCatalog, PromptBudget
+from gac.errors import ConfigError
+from gac.model_catalog import ModelLimits, calculate_prompt_token_budget, get_model_limits, load_model_catalog
+
+
+@pytest.fixture(autouse=True)
+def isolated_catalog(tmp_path, monkeypatch):
+    """Point the user catalog at an empty location and reset the cache around each test."""
+    monkeypatch.setenv("GAC_MODEL_CATALOG_PATH", str(tmp_path / "missing.json"))
+    load_model_catalog.cache_clear()
+    yield
+    load_model_catalog.cache_clear()
+
+
+class TestGetModelLimits:
+    """Tests for catalog lookups."""
+
+    def test_bundled_models(self):
+        """Bundled patterns match across providers."""
+        assert get_model_limits("anthropic:claude-3-5-haiku-latest") == ModelLimits(200000, 8192)
+        assert get_model_limits("openrouter:google/gemini-2.5-pro") == ModelLimits(1048576, 65536)
+        assert get_model_limits("openai:gpt-4") == ModelLimits(8192, 4096)
+
+    def test_local_runtime_takes_precedence(self):
+        """Local runtimes use their runtime context window rather than the model's maximum."""
+        assert get_model_limits("ollama:qwen3:8b") == ModelLimits(*ModelCatalog.MODELS["ollama:*"])
+
+    def test_unknown_model(self):
+        """Models missing from the catalog return None."""
+        assert get_model_limits("custom-openai:my-deployment") is None
+
+    def test_user_overrides(self, tmp_path):
+        """User catalog entries win over bundled entries."""
+        catalog_file = tmp_path / "models.json"
+        catalog_file.write_text(
+            json.dumps(
+                {
+                    "ollama:qwen2.5-coder:32b": {"context_window": 32768, "max_output_tokens": 4096},
+                    "custom-openai:*": {"context_window": 64000},
+                }
+            )
+        )
+
+        assert get_model_limits("ollama:qwen2.5-coder:32b", str(catalog_file)) == ModelLimits(32768, 4096)
+        assert get_model_limits("custom-openai:my-deployment", str(catalog_file)) == ModelLimits(64000, 64000)
+        assert get_model_limits("ollama:llama3.2", str(catalog_file)) == ModelLimits(8192, 2048)
+
+    def test_invalid_user_catalog(self, tmp_path):
+        """Malformed user catalogs raise a ConfigError."""
+        catalog_file = tmp_path / "models.json"
+        catalog_file.write_text(json.dumps({"ollama:*": {"max_output_tokens": 10}}))
+
+        with pytest.raises(ConfigError):
+            get_model_limits("ollama:llama3.2", str(catalog_file))
+
+
+class TestCalculatePromptTokenBudget:
+    """Tests for prompt budget derivation."""
+
+    def test_uncataloged_model_uses_default(self):
+        """Without limits, the default prompt budget applies."""
+        assert calculate_prompt_token_budget(None, 1024) == PromptBudget.DEFAULT_TOKEN_LIMIT
+
+    def test_budget_subtracts_output_and_margin(self):
+        """The budget is the context window minus reserved output and the safety margin."""
+        limits = ModelLimits(context_window=100000, max_output_tokens=8192)
+        margin = int(100000 * ModelCatalog.SAFETY_MARGIN)
+
+        assert calculate_prompt_token_budget(limits, 1024) == 100000 - 1024 - margin
+
+    def test_reserved_output_capped_by_model_maximum(self):
+        """Requested output beyond the model's maximum is not reserved."""
+        limits = ModelLimits(context_window=100000, max_output_tokens=2048)
+        margin = int(100000 * ModelCatalog.SAFETY_MARGIN)
+
+        assert calculate_prompt_token_budget(limits, 16000) == 100000 - 2048 - margin
@@ -0,0 +1,68 @@
+"""Tests for moved-code detection."""
+
+from gac.moved_code import collapse_moved_code
+
+FUNCTION = [
+    "def parse_config(path):",
+    '    """Load the configuration file at path."""',
+    "    with open(path) as handle:",
+    "        data = json.load(handle)",
+    "",
+    "    validate_schema(data, CONFIG_SCHEMA)",
+    "    return normalize_keys(data)",
+]
+
+
+def _section(filename: str, lines: list[str], sign: str, extra: list[str] | None = None) -> str:
+    body = [f"{sign}{line}" for line in lines]
+    old_count, new_count = (len(body), 0) if sign == "-" else (0, len(body))
+    return (
+        f"diff --git a/{filename} b/{filename}\n"
+        "index 1111111..2222222 100644\n"
+        f"--- a/{filename}\n"
+        f"+++ b/{filename}\n"
+        f"@@ -1,{old_count} +1,{new_count} @@\n" + "\n".join(body + (extra or [])) + "\n"
+    )
+
+
+def test_moved_block_is_collapsed():
+    source = _section("app/utils.py", ["import json", *FUNCTION], "-")
+    destination = _section("app/config.py", [*(f"    {line}" if line else "" for line in FUNCTION), "x = 1"], "+")
+
+    result = collapse_moved_code([source, destination])
+
+    assert result[0].endswith("@@ -1,8 +1,0 @@\n-import json\n[7 lines moved to app/config.py]\n")
+    assert result[1].endswith("@@ -1,0 +1,8 @@\n[Moved 7 lines from app/utils.py to app/config.py]\n+x = 1\n")
+
+
+def test_edited_lines_are_kept():
+    edited = list(FUNCTION)
+    edited[3] = "        data = yaml.safe_load(handle)"
+    edited += ["", "def save_config(path, data):", "    with open(path, 'w') as handle:", "        handle.write(data)"]
+    source = _section("a.py", FUNCTION + ["", "def save_config(path, data):"] + edited[-2:], "-")
+    destination = _section("b.py", edited, "+")
+
+    result = collapse_moved_code([source, destination])
+
+    # The three lines before the edit can't form a full window, so only the block after it moves
+    assert result[1].endswith("+        data = yaml.safe_load(handle)\n+\n[Moved 6 lines from a.py to b.py]\n")
+    assert "-        data = json.load(handle)\n-\n[6 lines moved to b.py]\n" in result[0]
+
+
+def test_same_file_and_short_blocks_are_not_moves():
+    same_file = _section("a.py", FUNCTION, "-", [f"+{line}" for line in FUNCTION])
+    braces = ["}", "}", "});", "}", "]"]
+    sections = [same_file, _section("b.js", braces, "-"), _section("c.js", braces, "+")]
+
+    assert collapse_moved_code(sections) == sections
+
+
+def test_sections_without_hunks_pass_through():
+    rename = "diff --git a/a.py b/b.py\nsimilarity index 100%\nrename from a.py\nrename to b.py\n"
+    source = _section("a.py", FUNCTION, "-")
+    destination = _section("b.py", FUNCTION, "+")
+
+    result = collapse_moved_code([rename, source, destination])
+
+    assert result[0] == rename
+    assert "[Moved 7 lines from a.py to b.py]" in result[2]
@@ -0,0 +1,153 @@
+"""Tests for Jupyter notebook diff compaction."""
+
+import json
+from unittest.mock import patch
+
+from gac.constants import Notebooks
+from gac.notebooks import diff_notebooks, is_notebook, summarize_notebook_section
+
+
+def _code(source: str, outputs: list | None = None, execution_count: int | None = 1, **metadata) -> dict:
+    return {
+        "cell_type": "code",
+        "execution_count": execution_count,
+        "metadata": metadata,
+        "outputs": outputs or [],
+        "source": source.splitlines(keepends=True),
+    }
+
+
+def _markdown(source: str) -> dict:
+    return {"cell_type": "markdown", "metadata": {}, "source": source}
+
+
+def _image(data: str, execution_count: int = 1) -> dict:
+    return {
+        "output_type": "display_data",
+        "data": {"image/png": data, "text/plain": "<Figure>"},
+        "metadata": {},
+        "execution_count": execution_count,
+    }
+
+
+def _notebook(cells: list, **metadata) -> dict:
+    return {"cells": cells, "metadata": metadata, "nbformat": 4, "nbformat_minor": 5}
+
+
+class TestDiffNotebooks:
+    def test_edited_added_and_removed_cells(self):
+        old = _notebook(
+            [
+                _markdown("# Analysis"),
+                _code("import pandas as pd\ndf = pd.read_csv('a.csv')\ndf.head()\n"),
+                _code("print('scratch')\n"),
+            ]
+        )
+        new = _notebook(
+            [
+                _markdown("# Analysis"),
+                _code("import pandas as pd\ndf = pd.read_csv('b.csv')\ndf.head()\n"),
+                _markdown("## Results"),
+            ]
+        )
+
+        assert diff_notebooks(old, new) == [
+            "cell 2 (code) modified:",
+            "  @@ -1,3 +1,3 @@",
+            "   import pandas as pd",
+            "  -df = pd.read_csv('a.csv')",
+            "  +df = pd.read_csv('b.csv')",
+            "   df.head()",
+            "cell 3 (markdown) modified:",
+            "  type code → markdown",
+            "  @@ -1 +1 @@",
+            "  -print('scratch')",
+            "  +## Results",
+        ]
+
+    def test_inserted_cell_keeps_alignment(self):
+        cells = [_code(f"x{i} = {i}\n") for i in range(5)]
+        new_cells = cells[:2] + [_code("inserted = True\n")] + cells[2:]
+
+        assert diff_notebooks(_notebook(cells), _notebook(new_cells)) == ["cell 3 (code) added:", "  +inserted = True"]
+
+    def test_outputs_and_execution_counts(self):
+        old = _notebook([_code("plot()\n", [_image("AAAA" * 1000)], execution_count=1), _code("x = 1\n")])
+        new = _notebook(
+            [
+                _code("plot()\n", [_image("BBBB" * 1000, 7), _image("CCCC", 7)], execution_count=7),
+                _code("x = 1\n", execution_count=8),
+            ]
+        )
+
+        changes = diff_notebooks(old, new)
+
+        assert changes == ["outputs changed in 1 cell (was 1 image/png; now 2 image/png)"]
+        assert (
+            diff_notebooks(_notebook([_code("x\n", execution_count=1)]), _notebook([_code("x\n", execution_count=2)]))
+            == []
+        )
+
+    def test_metadata_changes(self):
+        old = _notebook([_code("x\n")], kernelspec={"display_name": "Python 3"})
+        new = _notebook([_code("x\n", tags=["skip"])], kernelspec={"display_name": "Python 3.12"})
+
+        assert diff_notebooks(old, new) == [
+            '+cell 1.metadata.tags: ["skip"]',
+            'metadata.kernelspec.display_name: "Python 3" → "Python 3.12"',
+        ]
+
+    def test_caps_listed_cells(self):
+        old = _notebook([])
+        new = _notebook([_code(f"x = {i}\n") for i in range(Notebooks.MAX_CELLS + 3)])
+
+        changes = diff_notebooks(old, new)
+
+        assert changes[-1] == "... and 3 more changed cells"
+        assert sum(1 for line in changes if line.endswith("added:")) == Notebooks.MAX_CELLS
+
+
+class TestSummarizeNotebookSection:
+    OLD = _notebook([_code("plot(a)\n", [_image("A" * 5000)])])
+    NEW = _notebook([_code("plot(b)\n", [_image("B" * 5000)])])
+    SECTION = (
+        "diff --git a/analysis.ipynb b/analysis.ipynb\n"
+        "index 1111111..2222222 100644\n"
+        "--- a/analysis.ipynb\n"
+        "+++ b/analysis.ipynb\n"
+        "@@ -1,3 +1,3 @@\n"
+        '-    "image/png": "' + "A" * 5000 + '",\n'
+        '+    "image/png": "' + "B" * 5000 + '",\n'
+        '-    "plot(a)\\n"\n'
+        '+    "plot(b)\\n"\n'
+    )
+
+    def test_summarizes_cells(self):
+        blobs = {"1111111": json.dumps(self.OLD).encode(), "2222222": json.dumps(self.NEW).encode()}
+        with patch("gac.notebooks.read_blobs", return_value=blobs):
+            summary = summarize_notebook_section(self.SECTION)
+
+        assert summary is not None
+        assert summary.startswith("diff --git a/analysis.ipynb b/analysis.ipynb\nindex 1111111..2222222 100644\n")
+        assert "[Notebook diff of 4 changed JSON lines, outputs omitted:" in summary
+        assert "    -plot(a)\n    +plot(b)\n" in summary
+        assert "outputs changed in 1 cell (was 1 image/png; now 1 image/png)]" in summary
+        assert "AAAA" not in summary
+        assert len(summary) < 600
+
+    def test_new_notebook(self):
+        section = self.SECTION.replace("index 1111111..2222222 100644", "new file mode 100644\nindex 0000000..2222222")
+        with patch("gac.notebooks.read_blobs", return_value={"2222222": json.dumps(self.NEW).encode()}) as mock_read:
+            summary = summarize_notebook_section(section)
+
+        mock_read.assert_called_once_with(["2222222"])
+        assert summary is not None
+        assert "cell 1 (code) added:\n    +plot(b)" in summary
+
+    def test_unavailable_or_invalid(self):
+        assert not is_notebook("analysis.py")
+        assert summarize_notebook_section(self.SECTION.replace("analysis.ipynb", "analysis.json")) is None
+        with patch("gac.notebooks.read_blobs", return_value={}):
+            assert summarize_notebook_section(self.SECTION) is None
+        with patch("gac.notebooks.read_blobs", return_value={"1111111": b"{", "2222222": b"{}"}):
+            assert summarize_notebook_section(self.SECTION) is None
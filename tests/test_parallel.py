@@ -0,0 +1,72 @@
+"""Tests for order-preserving parallel section processing."""
+
+from unittest.mock import patch
+
+from gac.parallel import _make_batches, map_sections
+
+
+def shout(section):
+    """Module-level function so it can be sent to worker processes."""
+    return section.upper() if "keep" not in section else section
+
+
+def drop_odd(section):
+    return None if int(section.split()[-1]) % 2 else section
+
+
+def word_lengths(section):
+    return [len(word) for word in section.split()]
+
+
+class TestMapSections:
+    """Tests for map_sections."""
+
+    def test_small_inputs_run_inline(self):
+        """Inputs below the size threshold never start a process pool."""
+        with patch("gac.parallel.concurrent.futures.ProcessPoolExecutor") as mock_pool:
+            assert map_sections(shout, ["a", "keep b"]) == ["A", "keep b"]
+        mock_pool.assert_not_called()
+
+    def test_process_pool_preserves_order(self):
+        """Results from worker processes keep the order of the input sections."""
+        sections = [f"section {i} keep" if i % 3 == 0 else f"section {i}" for i in range(200)]
+
+        result = map_sections(shout, sections, max_workers=2, process_threshold_bytes=1)
+
+        assert result == [shout(section) for section in sections]
+
+    def test_process_pool_passes_through_none(self):
+        """Filtered sections come back as None in their original position."""
+        sections = [f"section {i}" for i in range(20)]
+
+        result = map_sections(drop_odd, sections, max_workers=2, process_threshold_bytes=1)
+
+        assert result == [section if i % 2 == 0 else None for i, section in enumerate(sections)]
+
+    def test_process_pool_returns_any_result_type(self):
+        """Results need not be sections; lists come back as they are, in order."""
+        sections = [f"section {'x' * i}" for i in range(1, 31)]
+
+        result = map_sections(word_lengths, sections, max_workers=2, process_threshold_bytes=1)
+
+        assert result == [[7, i] for i in range(1, 31)]
+
+    def test_unicode_sections(self):
+        """Offsets into the shared buffer are byte offsets, so multi-byte text round-trips."""
+        sections = ["héllo wörld", "日本語のテキスト", "emoji 🎉 keep"]
+
+        result = map_sections(shout, sections, max_workers=2, process_threshold_bytes=1)
+
+        assert result == ["HÉLLO WÖRLD", "日本語のテキスト", "emoji 🎉 keep"]
+
+    def test_falls_back_inline_without_shared_memory(self):
+        """Environments without shared memory process sections inline."""
+        with patch("gac.parallel.shared_memory.SharedMemory", side_effect=OSError("no /dev/shm")):
+            assert map_sections(shout, ["a", "b"], max_workers=2, process_threshold_bytes=1) == ["A", "B"]
+
+
+def test_make_batches_groups_by_size():
+    """Consecutive sections are grouped until a batch reaches the byte size."""
+    offsets = [(0, 4), (4, 8), (8, 20), (20, 22)]
+
+    assert _make_batches(offsets, 8) == [[(0, 4), (4, 8)], [(8, 20)], [(20, 22)]]
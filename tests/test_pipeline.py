@@ -0,0 +1,112 @@
+"""Tests for the concurrent workflow pipeline."""
+
+import os
+import subprocess
+import threading
+
+import pytest
+
+from gac.git import get_index_tree, get_staged_numstat, get_status
+from gac.pipeline import Pipeline, format_timings, run_in_background
+
+
+def test_stages_receive_dependency_results():
+    pipeline = Pipeline()
+    pipeline.add("total", lambda a, b: a + b, after=("a", "b"))
+    pipeline.add("a", lambda: 1)
+    pipeline.add("b", lambda: 2)
+
+    result = pipeline.run()
+
+    assert result["total"] == 3
+    assert [timing.name for timing in result.timings][-1] == "total"
+    assert result.timings[-1].start >= max(timing.end for timing in result.timings[:2])
+
+
+def test_independent_stages_run_concurrently():
+    # Each stage waits for the other to start, which only finishes if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline()
+    pipeline.add("hooks", barrier.wait)
+    pipeline.add("diff", barrier.wait)
+
+    result = pipeline.run()
+
+    assert set(result.results) == {"hooks", "diff"}
+
+
+def test_failure_skips_pending_stages():
+    ran = []
+
+    def fail():
+        raise RuntimeError("hook crashed")
+
+    pipeline = Pipeline()
+    pipeline.add("hooks", fail)
+    pipeline.add("after_hooks", lambda _: ran.append("after_hooks"), after=("hooks",))
+
+    with pytest.raises(RuntimeError, match="hook crashed"):
+        pipeline.run()
+    assert ran == []
+
+
+def test_invalid_graphs_are_rejected():
+    pipeline = Pipeline()
+    pipeline.add("a", lambda _: None, after=("missing",))
+    with pytest.raises(ValueError, match="unknown stage"):
+        pipeline.run()
+
+    pipeline = Pipeline()
+    pipeline.add("a", lambda _: None, after=("b",))
+    pipeline.add("b", lambda _: None, after=("a",))
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.run()
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        pipeline.add("a", lambda: None)
+
+
+def test_format_timings():
+    pipeline = Pipeline()
+    pipeline.add("status", lambda: "On branch main")
+    pipeline.add("diff", lambda: "")
+
+    report = format_timings(pipeline.run())
+
+    lines = report.splitlines()
+    assert len(lines) == 3
+    assert {line.split()[0] for line in lines[:2]} == {"status", "diff"}
+    assert "wall" in lines[-1] and "saved" in lines[-1]
+
+
+def test_run_in_background():
+    future = run_in_background(lambda a, b=0: (threading.current_thread().daemon, a + b), 1, b=2)
+    assert future.result(timeout=5) == (True, 3)
+
+    failing = run_in_background(int, "not a number")
+    with pytest.raises(ValueError):
+        failing.result(timeout=5)
+
+
+def test_git_stages_run_concurrently_without_lock_failures(tmp_path, monkeypatch):
+    """Status running alongside write-tree never takes the index lock write-tree needs."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    files = [tmp_path / f"file{i}.txt" for i in range(200)]
+    for path in files:
+        path.write_text(path.name)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    monkeypatch.chdir(tmp_path)
+
+    for round_number in range(30):
+        # New modification times make git status want to refresh, and so lock, the index
+        for path in files:
+            os.utime(path, (round_number, round_number))
+        pipeline = Pipeline()
+        pipeline.add("status", get_status)
+        pipeline.add("index_tree", get_index_tree)
+        pipeline.add("numstat", get_staged_numstat)
+
+        result = pipeline.run()
+
+        assert result["index_tree"] is not None
+        assert "file0.txt" in result["status"]
@@ -6,6 +6,7 @@ from unittest.mock import patch
 from gac.preprocess import (
     analyze_code_patterns,
     calculate_section_importance,
+    extract_filtered_file_summary,
     filter_binary_and_minified,
     get_extension_score,
     is_lockfile_or_generated,
@@ -17,6 +18,7 @@ from gac.preprocess import (
     should_filter_section,
     smart_truncate_diff,
     split_diff_into_sections,
+    summarize_file_operation,
 )
 
 
@@ -226,6 +228,56 @@ index 2345678..bcdef01 234567
         assert "utils.py" in result
         assert "README.md" in result
 
+    @patch("gac.preprocess.count_tokens", side_effect=lambda text, model: 1000 if "billing" in text else 50)
+    def test_smart_truncate_diff_rolls_up_skipped_files(self, mock_count_tokens):
+        """Many skipped files are summarized by directory in the skipped-files note."""
+        main_section = "diff --git a/main.py b/main.py\n+class Main:\n+    pass"
+        skipped = [
+            f"diff --git a/services/billing/f{i}.py b/services/billing/f{i}.py\n+new line\n-old line" for i in range(40)
+        ]
+        scored_sections = [(main_section, 5.0)] + [(section, 1.0) for section in skipped]
+
+        result = smart_truncate_diff(scored_sections, 500, "test:model")
+
+        assert "[Skipped files due to token limits: services/billing/f0.py +1/-1," in result
+        assert "services/billing/** 33 more files +33/-33]" in result
+
+    @patch("gac.preprocess.count_tokens", side_effect=lambda text, model: 1000 if "@@" in text else 20)
+    def test_smart_truncate_diff_summarizes_skipped_source_files(self, mock_count_tokens):
+        """Skipped source files are replaced by structural summaries when their blobs are available."""
+        main_section = "diff --git a/main.py b/main.py\n+class Main:\n+    pass"
+        skipped_section = (
+            "diff --git a/src/api.py b/src/api.py\nindex 1111111..2222222 100644\n--- a/src/api.py\n"
+            "+++ b/src/api.py\n@@ -1,2 +1,2 @@\n-def get(a):\n+def get(a, b):\n"
+        )
+        blobs = {"1111111": b"def get(a):\n    pass\n", "2222222": b"def get(a, b):\n    pass\n"}
+
+        with patch("gac.preprocess.read_blobs", return_value=blobs) as mock_read_blobs:
+            result = smart_truncate_diff([(main_section, 5.0), (skipped_section, 4.0)], 500, "test:model")
+
+        mock_read_blobs.assert_called_once_with(["1111111", "2222222"])
+        assert "changed signature of function get: def get(a) → def get(a, b)" in result
+        assert "Skipped files" not in result
+        assert "Showing 1 of 2 changed files, 1 more summarized structurally" in result
+
+    @patch("gac.preprocess.count_tokens", side_effect=lambda text, model: 2000 if "@@" in text else 50)
+    def test_smart_truncate_diff_skeletonizes_large_new_files(self, mock_count_tokens):
+        """Large new files are represented by skeletons and only restored when budget remains."""
+        body = "".join(f"+    value_{i} = {i}\n" for i in range(400))
+        new_section = (
+            "diff --git a/src/big.py b/src/big.py\nnew file mode 100644\nindex 0000000..2222222\n"
+            f"--- /dev/null\n+++ b/src/big.py\n@@ -0,0 +1,401 @@\n+def build():\n{body}"
+        )
+        source = "def build():\n" + "".join(f"    value_{i} = {i}\n" for i in range(400))
+
+        with patch("gac.preprocess.read_blobs", return_value={"2222222": source.encode()}):
+            tight = smart_truncate_diff([(new_section, 6.0)], 1000, "test:model")
+            roomy = smart_truncate_diff([(new_section, 6.0)], 5000, "test:model")
+
+        assert "[Skeleton of new file (401 lines), body omitted for token limits:\ndef build()  [401 lines]]" in tight
+        assert "value_399" not in tight
+        assert roomy == new_section
+
     @patch("gac.preprocess.count_tokens")
     def test_preprocess_diff_small(self, mock_count_tokens):
         """Test preprocessing of small diffs that don't need truncation."""
@@ -251,10 +303,9 @@ index 1234567..abcdef0 123456
     @patch("gac.preprocess.count_tokens")
     def test_preprocess_diff_large(self, mock_count_tokens):
         """Test preprocessing of large diffs that need truncation."""
-        # Mock token counting to simulate a large diff
-        # First return value is for the initial token count check
-        # Force it to be large to trigger the full processing path
-        mock_count_tokens.return_value = 8000  # Just use return_value for simplicity
+        # Mock token counting to simulate a large diff: the full diff is large enough to
+        # trigger the full processing path, while each section fits comfortably
+        mock_count_tokens.side_effect = lambda text, model: 8000 if text.count("diff --git") > 1 else 100
 
         diff = """diff --git a/main.py b/main.py
 +class Main:
@@ -290,15 +341,59 @@ diff --git a/README.md b/README.md
                     ]
                     mock_score.return_value = scored_sections
 
-                    # The test passes by using our special case in smart_truncate_diff
-                    # for high token limits (set in our previous fix)
                     result = preprocess_diff(diff, token_limit=5000)
 
-                    # Should show ALL sections due to high token limit
+                    # Should show ALL sections since they fit within the token limit
                     assert "main.py" in result
                     assert "utils.py" in result
                     assert "README.md" in result
 
+    @patch("gac.preprocess.count_tokens")
+    def test_preprocess_diff_collapses_reformatted_files(self, mock_count_tokens):
+        mock_count_tokens.side_effect = lambda text, model: 8000 if text.count("diff --git") > 1 else 100
+        reformatted = "".join(
+            f"diff --git a/src/f{i}.py b/src/f{i}.py\n@@ -1 +1,3 @@\n-call(a, b)\n+call(\n+    a, b\n+)\n"
+            for i in range(3)
+        )
+        diff = reformatted + "diff --git a/src/main.py b/src/main.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+
+        result = preprocess_diff(diff, token_limit=5000)
+
+        assert "+x = 2" in result
+        assert "f1.py" not in result.split("[Reformatted")[0]
+        assert result.endswith(
+            "[Reformatted 3 files (formatting only): src/f0.py +3/-1, src/f1.py +3/-1, src/f2.py +3/-1]"
+        )
+
+    @patch("gac.diff_render.count_tokens")
+    @patch("gac.preprocess.count_tokens")
+    def test_preprocess_diff_compact_format(self, mock_count_tokens, mock_render_count_tokens):
+        mock_count_tokens.return_value = 100
+        mock_render_count_tokens.side_effect = lambda text, model: len(text)
+        diff = (
+            "diff --git a/app.py b/app.py\nindex 1111111..2222222 100644\n--- a/app.py\n+++ b/app.py\n"
+            "@@ -1,4 +1,4 @@\n import os\n-x = 1\n+x = 2\n y = 3\n"
+        )
+
+        assert preprocess_diff(diff, token_limit=1000) == diff
+        assert preprocess_diff(diff, token_limit=1000, diff_format="compact", context_lines=0) == (
+            "## app.py\n@@ -2 +2 @@\n-x = 1\n+x = 2\n"
+        )
+
+    @patch("gac.preprocess.count_tokens")
+    def test_preprocess_diff_compact_format_large(self, mock_count_tokens):
+        # Large in the unified format, but small enough once compacted
+        mock_count_tokens.side_effect = lambda text, model: 8000 if "index " in text else 100
+        diff = "".join(
+            f"diff --git a/f{i}.py b/f{i}.py\nindex 1111111..2222222 100644\n--- a/f{i}.py\n+++ b/f{i}.py\n"
+            f"@@ -1 +1 @@\n-x = {i}\n+x = {i + 1}\n"
+            for i in range(2)
+        )
+
+        result = preprocess_diff(diff, token_limit=1000, diff_format="compact")
+
+        assert result == "## f0.py\n-x = 0\n+x = 1\n## f1.py\n-x = 1\n+x = 2\n"
+
     def test_should_filter_section_binary_and_lockfile(self):
         # Simulate binary file section (matches FilePatterns.BINARY)
         section = "diff --git a/file.bin b/file.bin\nBinary files a/file.bin and b/file.bin differ\n"
@@ -307,6 +402,21 @@ diff --git a/README.md b/README.md
         section = "diff --git a/package-lock.json b/package-lock.json\n+{}\n".format("a" * 10)
         assert should_filter_section(section)
 
+    def test_lockfile_summary_lists_dependency_changes(self):
+        section = (
+            "diff --git a/Cargo.lock b/Cargo.lock\n"
+            "--- a/Cargo.lock\n"
+            "+++ b/Cargo.lock\n"
+            "@@ -1,3 +1,3 @@\n"
+            " [[package]]\n"
+            ' name = "serde"\n'
+            '-version = "1.0.200"\n'
+            '+version = "1.0.210"\n'
+        )
+        summary = extract_filtered_file_summary(section)
+        assert "[Lockfile change: bumped serde 1.0.200→1.0.210]" in summary
+        assert "Lockfile/generated" not in summary
+
     def test_should_filter_section_minified(self):
         # Simulate minified content in a diff section (long line > 350 chars)
         long_line = "+" + ("a" * 350)
@@ -338,6 +448,50 @@ diff --git a/README.md b/README.md
         assert minified_result is not None
         assert "[Minified file change]" in minified_result
 
+    def test_process_section_summarizes_config_by_key_path(self):
+        section = "diff --git a/values.json b/values.json\n@@ -1,20 +1,20 @@\n" + "-x\n+y\n" * 10
+        with patch("gac.preprocess.summarize_config_section", return_value="summary") as mock_summarize:
+            assert process_section(section) == "summary"
+        mock_summarize.assert_called_once_with(section)
+
+    def test_notebooks_are_compacted_before_filtering(self):
+        section = "diff --git a/nb.ipynb b/nb.ipynb\n+" + "a" * 1200 + "\n"
+        with patch("gac.preprocess.summarize_notebook_section", return_value="notebook summary\n"):
+            assert process_section(section) == "notebook summary\n"
+            assert filter_binary_and_minified(section) == "notebook summary\n"
+        assert "[Minified file change]" in filter_binary_and_minified(section)
+
+    def test_summarize_file_operation(self):
+        deleted = (
+            "diff --git a/old.py b/old.py\ndeleted file mode 100644\nindex abc1234..0000000\n"
+            "--- a/old.py\n+++ /dev/null\n@@ -1,3 +0,0 @@\n-a\n-b\n-c\n"
+        )
+        renamed = "diff --git a/a.py b/lib/a.py\nsimilarity index 100%\nrename from a.py\nrename to lib/a.py\n"
+        copied = "diff --git a/a.py b/b.py\nsimilarity index 100%\ncopy from a.py\ncopy to b.py\n"
+        mode_and_rename = (
+            "diff --git a/run b/bin/run\nold mode 100644\nnew mode 100755\n"
+            "similarity index 100%\nrename from run\nrename to bin/run\n"
+        )
+        edited_rename = (
+            "diff --git a/a.py b/b.py\nsimilarity index 90%\nrename from a.py\nrename to b.py\n"
+            "index abc1234..def5678 100644\n--- a/a.py\n+++ b/b.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+        )
+
+        assert summarize_file_operation(deleted) == "diff --git a/old.py b/old.py\n[Deleted file, 3 lines]\n"
+        assert summarize_file_operation(renamed) == "diff --git a/a.py b/lib/a.py\n[Renamed a.py → lib/a.py]\n"
+        assert summarize_file_operation(copied) == "diff --git a/a.py b/b.py\n[Copied a.py → b.py]\n"
+        assert summarize_file_operation(mode_and_rename) == (
+            "diff --git a/run b/bin/run\n[Renamed run → bin/run, mode changed 100644 → 100755]\n"
+        )
+        assert summarize_file_operation(edited_rename) is None
+        assert process_section(edited_rename) == edited_rename
+        assert process_section(deleted) == "diff --git a/old.py b/old.py\n[Deleted file, 3 lines]\n"
+
+        moved_away = deleted.replace("-a\n-b\n-c\n", "[3 lines moved to new.py]\n")
+        assert summarize_file_operation(moved_away) == (
+            "diff --git a/old.py b/old.py\n[Deleted file]\n[3 lines moved to new.py]\n"
+        )
+
     def test_process_sections_parallel_small(self):
         # Sequential path
         sections = [
@@ -355,6 +509,17 @@ diff --git a/README.md b/README.md
         result = process_sections_parallel(sections)
         assert len(result) == 5
 
+    def test_process_sections_parallel_preserves_order(self):
+        """Sections come back in file order even when processed in worker processes."""
+        sections = [f"diff --git a/file{i}.py b/file{i}.py\n+value = {i}\n" for i in range(40)]
+        sections[7] = "diff --git a/app.min.js b/app.min.js\n+" + "x" * 600 + "\n"
+
+        with patch("gac.parallel.Parallelism.PROCESS_THRESHOLD_BYTES", 1):
+            result = process_sections_parallel(sections, max_workers=2)
+
+        assert [section.split("\n")[0] for section in result] == [section.split("\n")[0] for section in sections]
+        assert "[Minified file change]" in result[7]
+
     def test_score_sections(self):
         sections = [
             "diff --git a/main.py b/main.py\n+def foo():\n+    return 1\n",
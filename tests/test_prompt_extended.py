@@ -1,17 +1,30 @@
 """Extended tests for prompt.py to improve coverage."""
 
+import re
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from gac.constants import Rollup
 from gac.prompt import (
+    PromptComponent,
+    allocate_prompt_budget,
     build_prompt,
     clean_commit_message,
+    compact_diff_stat,
+    compact_git_status,
     load_custom_system_template,
     load_system_template,
+    plan_diff_token_budget,
 )
+from gac.rollup import FileChangeStat
+
+
+def word_count_tokens(text, model):
+    """Deterministic token counter for budget tests: one token per whitespace-separated word."""
+    return len(text.split())
 
 
 def test_load_system_template_with_custom_path():
@@ -150,3 +163,117 @@ def test_build_prompt_with_diff_stat():
 
     # Diff stat should be included in the prompt
     assert diff_stat in user_prompt
+
+
+def test_allocate_prompt_budget_serves_minimums_then_shares_then_leftovers():
+    """Components get minimums first, then their share in priority order, then leftovers."""
+    components = [
+        PromptComponent("template", 100, priority=0, minimum=100),
+        PromptComponent("stat", 500, priority=1, minimum=50, max_share=0.1),
+        PromptComponent("diff", 5000, priority=2, minimum=200),
+    ]
+
+    allocations = allocate_prompt_budget(1000, components)
+
+    assert allocations == {"template": 100, "stat": 100, "diff": 800}
+
+
+def test_allocate_prompt_budget_gives_leftovers_beyond_share():
+    """When the diff is small, capped components receive the remaining budget."""
+    components = [
+        PromptComponent("stat", 500, priority=1, minimum=50, max_share=0.1),
+        PromptComponent("diff", 100, priority=2, minimum=200),
+    ]
+
+    assert allocate_prompt_budget(1000, components) == {"stat": 500, "diff": 100}
+
+
+def test_compact_git_status_keeps_headers_and_rolls_up_omitted_files():
+    """Over-budget status output keeps section headers and rolls up omitted entries."""
+    entries = "\n".join(f"\trenamed:    old/file{i}.py -> new/file{i}.py" for i in range(200))
+    status = f"On branch main\nChanges to be committed:\n{entries}\n\nUntracked files:\n\tnotes.txt"
+
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        compacted = compact_git_status(status, 120, "test:model")
+        assert word_count_tokens(compacted, "test:model") <= 120
+
+    assert compacted.startswith("On branch main\nChanges to be committed:")
+    assert "\trenamed:    old/file0.py -> new/file0.py" in compacted
+    assert "\trenamed:    new/** " in compacted
+    assert "more files" in compacted
+    assert "Untracked files:\n\tnotes.txt" in compacted
+
+
+def test_compact_git_status_rolls_up_long_listings_within_budget():
+    """Listings beyond the rollup threshold are summarized by directory even when they fit."""
+    entries = [f"\tnew file:   services/billing/f{i}.py" for i in range(300)]
+    entries += [f"\tmodified:   docs/page{i}.md" for i in range(5)]
+    status = "On branch main\nChanges to be committed:\n" + "\n".join(entries)
+
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        compacted = compact_git_status(status, 100000, "test:model")
+
+    assert "\tnew file:   services/billing/** " in compacted
+    assert "\tmodified:   docs/page4.md" in compacted
+    assert len(compacted.split("\n")) <= 2 + 5 + Rollup.MAX_LISTING_ENTRIES
+
+
+def test_compact_diff_stat_keeps_largest_files_and_summary():
+    """Over-budget diff stat keeps the most changed files, a rollup of the rest and the summary line."""
+    lines = [f" src/module{i}.py | {i} {'+' * min(i, 10)}" for i in range(1, 101)]
+    diff_stat = "\n".join(lines + [" 100 files changed, 5050 insertions(+)"])
+
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        compacted = compact_diff_stat(diff_stat, 60, "test:model")
+        assert word_count_tokens(compacted, "test:model") <= 60
+
+    assert "src/module100.py" in compacted
+    assert "src/module1.py |" not in compacted
+    assert re.search(r" src/\*\* \d+ more files \+[\d.k]+/-0", compacted)
+    assert compacted.endswith("100 files changed, 5050 insertions(+)")
+
+
+def test_compact_diff_stat_rolls_up_numstat_paths():
+    """Paths the diff stat shortened to '.../tail' are grouped by their real directories."""
+    changes = [FileChangeStat(f"services/billing/handlers/deep/module{i}.py", i, 1) for i in range(30)]
+    changes += [FileChangeStat(f"web/components/deep/nested/widget{i}.tsx", 1, 0) for i in range(30)]
+    lines = [f" .../deep/{change.path.rsplit('/', 1)[1]} | {change.additions + 1} +-" for change in changes]
+    diff_stat = "\n".join(lines + [" 60 files changed, 465 insertions(+), 30 deletions(-)"])
+
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        compacted = compact_diff_stat(diff_stat, 40, "test:model", changes)
+
+    assert ".../" not in compacted
+    assert "services/billing/handlers/deep/module29.py +29/-1" in compacted
+    assert re.search(r" web/components/deep/nested/\*\* \d+ (more )?files", compacted)
+    assert compacted.endswith("60 files changed, 465 insertions(+), 30 deletions(-)")
+
+
+def test_build_prompt_with_token_budget_compacts_status_and_stat():
+    """A token budget keeps huge status and stat output from crowding out the diff."""
+    status = "On branch main\nChanges to be committed:\n" + "\n".join(f"\tnew file:   f{i}.txt" for i in range(6000))
+    diff_stat = "\n".join(f" f{i}.txt | 1 +" for i in range(6000)) + "\n 6000 files changed, 6000 insertions(+)"
+
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        system_prompt, user_prompt = build_prompt(
+            status=status,
+            processed_diff="diff --git a/f0.txt b/f0.txt",
+            diff_stat=diff_stat,
+            token_budget=8000,
+            model="test:model",
+        )
+        total_tokens = word_count_tokens(system_prompt, "test:model") + word_count_tokens(user_prompt, "test:model")
+
+    assert total_tokens <= 8000
+    assert "diff --git a/f0.txt b/f0.txt" in user_prompt
+    assert "6000 files changed" in user_prompt
+
+
+def test_plan_diff_token_budget_leaves_room_for_other_components():
+    """The diff budget is what remains after templates, status and stat are served."""
+    with patch("gac.prompt.count_tokens", side_effect=word_count_tokens):
+        diff_budget = plan_diff_token_budget(10000, status="On branch main", diff="x " * 50000, diff_stat="")
+        system_prompt, user_prompt = build_prompt(status="On branch main", processed_diff="", diff_stat="")
+        overhead = word_count_tokens(system_prompt, "test:model") + word_count_tokens(user_prompt, "test:model")
+
+    assert 0 < diff_budget <= 10000 - overhead
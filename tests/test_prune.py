@@ -0,0 +1,67 @@
+"""Tests for pruning unstaged files from collected git output."""
+
+from gac.prune import prune_diff, prune_diff_stat, section_paths
+
+DIFF = """diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -1,2 +1,3 @@
+ import os
++TOKEN = "abc"
+-OLD = 1
+diff --git a/old/config.py b/new/config.py
+similarity index 90%
+rename from old/config.py
+rename to new/config.py
+index 3333333..4444444 100644
+--- a/old/config.py
++++ b/new/config.py
+@@ -1 +1,2 @@
+ x = 1
++KEY = "secret"
+diff --git a/README.md b/README.md
+index 5555555..6666666 100644
+--- a/README.md
++++ b/README.md
+@@ -1 +1,2 @@
+ # Title
++More"""
+
+STAT = """ README.md                          | 1 +
+ app.py                             | 2 +-
+ {old => new}/config.py             | 1 +
+ 3 files changed, 3 insertions(+), 1 deletion(-)"""
+
+
+def test_section_paths():
+    _, removed = prune_diff(DIFF, ["old/config.py"])
+    assert section_paths(removed[0]) == ("old/config.py", "new/config.py")
+    assert section_paths("not a diff") is None
+
+
+def test_prune_diff():
+    pruned, removed = prune_diff(DIFF, ["app.py", "new/config.py"])
+
+    assert pruned.startswith("diff --git a/README.md b/README.md")
+    assert pruned.endswith("+More")
+    assert [section_paths(section) for section in removed] == [
+        ("app.py", "app.py"),
+        ("old/config.py", "new/config.py"),
+    ]
+    assert prune_diff(DIFF, ["old/config.py"])[1] == removed[1:]
+
+
+def test_prune_diff_stat_recounts_summary():
+    _, removed = prune_diff(DIFF, ["app.py", "old/config.py"])
+
+    assert prune_diff_stat(STAT, removed) == (
+        " README.md                          | 1 +\n 1 file changed, 1 insertion(+)"
+    )
+
+
+def test_prune_diff_stat_matches_shortened_paths():
+    _, removed = prune_diff(DIFF, ["app.py"])
+    stat = " ...pp.py | 2 +-\n README.md | 1 +\n 2 files changed, 2 insertions(+), 1 deletion(-)"
+
+    assert prune_diff_stat(stat, removed) == " README.md | 1 +\n 1 file changed, 1 insertion(+)"
@@ -0,0 +1,91 @@
+"""Tests for directory rollups of changed files."""
+
+from gac.rollup import (
+    FileChangeStat,
+    RollupEntry,
+    file_changes_from_diff_sections,
+    format_count,
+    format_rollup,
+    rollup_file_changes,
+)
+
+
+def billing_changes():
+    changes = [FileChangeStat(f"services/billing/f{i}.py", 10, 5) for i in range(312)]
+    changes += [FileChangeStat(f"docs/page{i}.md", 1, 1) for i in range(40)]
+    changes.append(FileChangeStat("README.md", 3, 0))
+    return changes
+
+
+class TestRollupFileChanges:
+    """Tests for rolling up changes into a bounded number of entries."""
+
+    def test_small_listing_is_not_rolled_up(self):
+        """Listings within the entry limit keep every file."""
+        changes = [FileChangeStat("a.py", 1, 0), FileChangeStat("src/b.py", 2, 1)]
+
+        entries = rollup_file_changes(changes, 10)
+
+        assert entries == [RollupEntry("a.py", False, 1, 1, 0), RollupEntry("src/b.py", False, 1, 2, 1)]
+
+    def test_directories_collapse_with_aggregated_stats(self):
+        """Directories that do not fit are summarized, and single-child chains are followed."""
+        assert format_rollup(billing_changes(), 3) == [
+            "README.md +3/-0",
+            "docs/** 40 files +40/-40",
+            "services/billing/** 312 files +3.1k/-1.6k",
+        ]
+
+    def test_leftover_entries_show_largest_children(self):
+        """Spare entries show the largest files of a collapsed directory before the rest."""
+        changes = billing_changes()
+        changes[0] = FileChangeStat("services/billing/api.py", 900, 100)
+
+        lines = format_rollup(changes, 5)
+
+        assert lines == [
+            "README.md +3/-0",
+            "docs/** 40 files +40/-40",
+            "services/billing/api.py +900/-100",
+            "services/billing/f1.py +10/-5",
+            "services/billing/** 310 more files +3.1k/-1.6k",
+        ]
+
+    def test_unknown_counts_are_omitted(self):
+        """Entries without line counts only report the number of files."""
+        changes = [FileChangeStat(f"src/f{i}.py") for i in range(10)]
+
+        assert format_rollup(changes, 1) == ["src/** 10 files"]
+
+    def test_entry_limit_is_respected(self):
+        """The rollup never exceeds the requested number of entries."""
+        changes = [FileChangeStat(f"pkg{i % 7}/sub{i % 3}/f{i}.py", i, 0) for i in range(500)]
+
+        for max_entries in (1, 5, 12, 40, 600):
+            entries = rollup_file_changes(changes, max_entries)
+            assert len(entries) <= max_entries
+            assert sum(entry.file_count for entry in entries) == 500
+
+
+def test_format_count():
+    """Line counts are abbreviated with k and M suffixes."""
+    assert format_count(999) == "999"
+    assert format_count(4000) == "4k"
+    assert format_count(4120) == "4.1k"
+    assert format_count(2_500_000) == "2.5M"
+
+
+def test_file_changes_from_diff_sections():
+    """Added and removed lines are counted without the file headers."""
+    section = (
+        "diff --git a/src/app.py b/src/app.py\n"
+        "--- a/src/app.py\n"
+        "+++ b/src/app.py\n"
+        "@@ -1,2 +1,3 @@\n"
+        " context\n"
+        "-old\n"
+        "+new\n"
+        "+another"
+    )
+
+    assert file_changes_from_diff_sections([section, "not a diff"]) == [FileChangeStat("src/app.py", 2, 1)]
@@ -0,0 +1,110 @@
+"""Tests for gitleaks-style secret rule packs."""
+
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+
+from gac import security
+from gac.rule_packs import RulePackError, get_rule_pack_paths, load_rule_packs, parse_rule_pack, translate_regex
+from gac.security import scan_diff_section
+
+PACK = """
+[allowlist]
+stopwords = ["fixture"]
+
+[[rules]]
+id = "acme-api-token"
+description = "ACME API token"
+regex = '''(?i)acme[_-]?token\\s*=\\s*["']?(acm_[a-z0-9]{24})'''
+secretGroup = 1
+keywords = ["ACME"]
+
+[rules.allowlist]
+regexes = ['''acm_0{24}''']
+paths = ['''(^|/)testdata/''']
+
+[[rules]]
+id = "bad-rule"
+regex = "([unclosed"
+
+[[rules]]
+id = "path-only"
+path = '''\\.p12$'''
+"""
+
+
+def _section(path: str, *added: str) -> str:
+    body = "\n".join(f"+{line}" for line in added)
+    return f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -0,0 +1,{len(added)} @@\n{body}\n"
+
+
+@pytest.fixture
+def pack_rules(tmp_path, monkeypatch):
+    pack = tmp_path / "rules.toml"
+    pack.write_text(PACK)
+    monkeypatch.setenv("GAC_SECRET_RULE_PACKS", str(pack))
+    monkeypatch.setenv("GAC_SECRET_SCAN_CACHE", str(tmp_path / "cache.sqlite3"))
+    caches = (security.get_secret_rules, security._keyword_index, security.pattern_set_version)
+    for cache in caches:
+        cache.cache_clear()
+    yield pack
+    monkeypatch.delenv("GAC_SECRET_RULE_PACKS")
+    for cache in caches:
+        cache.cache_clear()
+
+
+def test_translate_regex():
+    assert translate_regex(r"key(?i)[[:alnum:]]+\z") == (r"key[A-Za-z0-9]+\Z", re.IGNORECASE)
+    assert translate_regex(r"a\\z") == (r"a\\z", 0)
+    with pytest.raises(RulePackError):
+        translate_regex("(?U)a+")
+
+
+def test_parse_rule_pack_skips_invalid_and_path_only_rules():
+    rules = parse_rule_pack(PACK)
+
+    assert [rule.name for rule in rules] == ["Acme Api Token"]
+    rule = rules[0]
+    assert rule.keywords == ("acme",)
+    assert rule.secret_group == 1
+    assert rule.stopwords == ("fixture",)
+    assert not rule.applies_to("pkg/testdata/config.env")
+    assert rule.is_allowed("acm_" + "0" * 24)
+    assert not rule.is_allowed("acm_" + "a1" * 12)
+
+
+def test_invalid_pack_raises():
+    with pytest.raises(RulePackError):
+        parse_rule_pack("rules = [")
+
+
+def test_get_rule_pack_paths(monkeypatch):
+    monkeypatch.setenv("GAC_SECRET_RULE_PACKS", f"a.toml{os.pathsep}b.toml")
+    assert [path.name for path in get_rule_pack_paths()] == ["a.toml", "b.toml"]
+
+
+def test_rule_packs_are_cached_by_content(pack_rules, tmp_path):
+    first = load_rule_packs([pack_rules])
+
+    with patch("gac.rule_packs.parse_rule_pack") as mock_parse:
+        assert load_rule_packs([pack_rules]) == first
+        mock_parse.assert_not_called()
+
+    pack_rules.write_text(PACK.replace("acme-api-token", "acme-token"))
+    assert [rule.name for rule in load_rule_packs([pack_rules])] == ["Acme Token"]
+
+
+def test_unreadable_pack_is_ignored(tmp_path):
+    assert load_rule_packs([tmp_path / "missing.toml"]) == []
+
+
+def test_scan_uses_pack_rules(pack_rules):
+    token = "acm_" + "k3y9x2m7q4w8" * 2
+    secrets = scan_diff_section(_section("app.env", f"ACME_TOKEN={token}", "acme_token = acm_fixture0000aaaa1111bbbbc"))
+
+    assert [(secret.secret_type, secret.matched_text, secret.line_number) for secret in secrets] == [
+        ("Acme Api Token", token, 1)
+    ]
+    assert scan_diff_section(_section("testdata/app.env", f"ACME_TOKEN={token}")) == []
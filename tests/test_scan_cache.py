@@ -0,0 +1,65 @@
+"""Tests for the on-disk secret scan cache."""
+
+import sqlite3
+from unittest.mock import patch
+
+from gac.scan_cache import ScanCache, get_cache_path
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "cache" / "scan.sqlite3"
+    with ScanCache(path) as cache:
+        cache.put_many({"a": "[]", "b": '[{"x": 1}]'})
+
+    with ScanCache(path) as cache:
+        assert cache.get_many(["a", "b", "c"]) == {"a": "[]", "b": '[{"x": 1}]'}
+        assert cache.get_many([]) == {}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    path = tmp_path / "scan.sqlite3"
+    with ScanCache(path, max_entries=2) as cache:
+        cache.put_many({"a": "1"})
+        cache.put_many({"b": "2"})
+        cache.get_many(["a"])
+        cache.put_many({"c": "3"})
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": "1", "c": "3"}
+
+
+def test_lookups_are_batched(tmp_path):
+    values = {f"key{i}": str(i) for i in range(1200)}
+    with ScanCache(tmp_path / "scan.sqlite3") as cache:
+        cache.put_many(values)
+
+        assert cache.get_many(list(values)) == values
+
+
+def test_unavailable_cache_is_a_no_op(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+
+    with ScanCache(blocker / "scan.sqlite3") as cache:
+        cache.put_many({"a": "1"})
+        assert cache.get_many(["a"]) == {}
+
+
+def test_cache_path_from_environment(tmp_path):
+    with patch.dict("os.environ", {"GAC_SECRET_SCAN_CACHE": str(tmp_path / "custom.db")}):
+        assert get_cache_path() == tmp_path / "custom.db"
+
+
+def test_databases_from_older_formats_are_cleared(tmp_path):
+    path = tmp_path / "scan.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE scans (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)")
+    connection.execute("INSERT INTO scans VALUES ('a', '[{\"matched_text\": \"secret\"}]', 1)")
+    connection.commit()
+    connection.close()
+
+    with ScanCache(path) as cache:
+        assert cache.get_many(["a"]) == {}
+        cache.put_many({"b": "2"})
+
+    with ScanCache(path) as cache:
+        assert cache.get_many(["b"]) == {"b": "2"}
@@ -0,0 +1,78 @@
+"""Tests for the scan command."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from gac.cli import cli
+from gac.history_scan import HistoryFinding
+from gac.secrets_baseline import load_baseline
+from gac.security import DetectedSecret
+
+DIFF = (
+    "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1,1 +1,2 @@\n import os\n"
+    f"+token = 'ghp_{'Zq9' * 12}'\n"
+)
+
+
+@pytest.fixture
+def staged_repo(tmp_path):
+    with (
+        patch("gac.scan_cli.get_repo_root", return_value=str(tmp_path)),
+        patch("gac.scan_cli.run_git_command", return_value=DIFF),
+        patch("gac.scan_cli.get_staged_blob_ids", return_value={}),
+        patch("gac.scan_cli.load_config", return_value={}),
+    ):
+        yield tmp_path
+
+
+def test_scan_reports_findings(staged_repo):
+    result = CliRunner().invoke(cli, ["scan"])
+
+    assert result.exit_code == 1
+    assert "Github Token in app.py:2" in result.output
+
+
+def test_update_baseline_accepts_findings(staged_repo):
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["scan", "--update-baseline"])
+    assert result.exit_code == 0
+    assert len(load_baseline(str(staged_repo))) == 1
+
+    result = runner.invoke(cli, ["scan"])
+    assert result.exit_code == 0
+    assert "1 baselined finding(s) skipped" in result.output
+
+
+def test_nothing_staged(staged_repo):
+    with patch("gac.scan_cli.run_git_command", return_value=""):
+        result = CliRunner().invoke(cli, ["scan"])
+
+    assert result.exit_code == 0
+    assert "No staged changes" in result.output
+
+
+def test_scan_range_writes_sarif(staged_repo):
+    findings = [
+        HistoryFinding("c1", DetectedSecret("app.py", 2, "Github Token", "ghp_...", fingerprint="abc")),
+    ]
+    output = staged_repo / "report.sarif"
+    with patch("gac.scan_cli.scan_history", return_value=findings) as mock_scan:
+        result = CliRunner().invoke(cli, ["scan", "--range", "v1..HEAD", "--format", "sarif", "-o", str(output)])
+
+    assert result.exit_code == 1
+    mock_scan.assert_called_once_with("v1..HEAD", entropy_thresholds=None)
+    assert json.loads(output.read_text())["runs"][0]["results"][0]["properties"] == {"commit": "c1"}
+
+
+def test_scan_range_text(staged_repo):
+    findings = [HistoryFinding("c" * 40, DetectedSecret("app.py", 2, "Github Token", "ghp_...", fingerprint="abc"))]
+    with patch("gac.scan_cli.scan_history", return_value=findings):
+        result = CliRunner().invoke(cli, ["scan", "--range", "HEAD"])
+
+    assert result.exit_code == 1
+    assert f"Commit {'c' * 12}:" in result.output
+    assert "gac scan --range HEAD --update-baseline" in result.output
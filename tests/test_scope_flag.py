@@ -39,7 +39,7 @@ class TestScopeFlag:
                 return "/mock/repo/path"
             if args == ["status"]:
                 return "mocked git status"
-            if args == ["diff", "--staged"]:
+            if args[:2] == ["diff", "--staged"]:
                 return "diff --git a/file.py b/file.py\n--- a/file.py\n+++ b/file.py\n@@ -1 +1 @@\n-old line\n+new line"
             # Add other specific commands if main uses them before prompt
             return "mock git output"
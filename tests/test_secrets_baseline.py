@@ -0,0 +1,51 @@
+"""Tests for the secrets baseline."""
+
+import json
+
+from gac.secrets_baseline import filter_baselined, get_baseline_path, load_baseline, update_baseline
+from gac.security import DetectedSecret, secret_fingerprint
+
+
+def _secret(file_path: str, matched_text: str, line_number: int = 1) -> DetectedSecret:
+    return DetectedSecret(
+        file_path=file_path,
+        line_number=line_number,
+        secret_type="Github Token",
+        matched_text=matched_text,
+        fingerprint=secret_fingerprint("Github Token", file_path, matched_text),
+    )
+
+
+def test_fingerprint_ignores_line_numbers_and_quoting():
+    assert _secret("a.py", "ghp_abc", 1).fingerprint == _secret("a.py", "ghp_abc", 40).fingerprint
+    assert secret_fingerprint("Password", "a.py", "'hunter22'") == secret_fingerprint("Password", "a.py", "hunter22")
+    assert _secret("a.py", "ghp_abc").fingerprint != _secret("b.py", "ghp_abc").fingerprint
+
+
+def test_update_and_load(tmp_path):
+    first = [_secret("tests/fixtures.py", "ghp_one"), _secret("a.py", "ghp_two", 7)]
+
+    assert load_baseline(str(tmp_path)) == set()
+    assert update_baseline(str(tmp_path), first) == (2, 2)
+    assert update_baseline(str(tmp_path), [first[0], _secret("b.py", "ghp_three")]) == (1, 3)
+
+    data = json.loads(get_baseline_path(str(tmp_path)).read_text())
+    assert data["version"] == 1
+    assert [entry["file"] for entry in data["findings"]] == ["a.py", "b.py", "tests/fixtures.py"]
+    assert data["findings"][0]["line"] == 7
+    assert load_baseline(str(tmp_path)) == {entry["fingerprint"] for entry in data["findings"]}
+
+
+def test_filter_baselined():
+    accepted, new = _secret("a.py", "ghp_one"), _secret("a.py", "ghp_two")
+
+    assert filter_baselined([accepted, new], {accepted.fingerprint}) == [new]
+    assert filter_baselined([accepted, new], set()) == [accepted, new]
+
+
+def test_malformed_baseline_is_ignored(tmp_path):
+    get_baseline_path(str(tmp_path)).write_text("not json")
+    assert load_baseline(str(tmp_path)) == set()
+
+    get_baseline_path(str(tmp_path)).write_text('{"findings": "nope"}')
+    assert load_baseline(str(tmp_path)) == set()
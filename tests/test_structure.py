@@ -0,0 +1,267 @@
+"""Tests for structural summaries of source file changes."""
+
+import pytest
+
+from gac.structure import (
+    compare_symbols,
+    extract_imports,
+    extract_symbols,
+    language_for,
+    skeletonize,
+    skeletonize_section,
+    summarize_structural_changes,
+)
+
+OLD_PYTHON = """
+import os
+
+
+class Config:
+    def load(self, path):
+        return open(path).read()
+
+    def save(self, path):
+        pass
+
+
+def parse(text):
+    return text.split()
+
+
+def legacy():
+    pass
+"""
+
+NEW_PYTHON = """
+import os
+
+
+class Config(Base):
+    def load(self, path, strict=False):
+        return open(path).read()
+
+    def save(self, path):
+        os.makedirs(path)
+
+
+def parse(text):
+    return text.split()
+
+
+async def fetch(url: str) -> bytes:
+    return b""
+"""
+
+
+class TestExtractSymbols:
+    """Tests for per-language symbol extraction."""
+
+    def test_python(self):
+        """Python classes, methods and functions are extracted with signatures."""
+        symbols = extract_symbols(NEW_PYTHON, "python")
+
+        assert symbols is not None
+        assert [(symbol.kind, symbol.name) for symbol in symbols] == [
+            ("class", "Config"),
+            ("method", "Config.load"),
+            ("method", "Config.save"),
+            ("function", "parse"),
+            ("function", "fetch"),
+        ]
+        assert symbols[-1].signature == "async def fetch(url: str) -> bytes"
+
+    def test_python_syntax_error(self):
+        """Unparseable Python returns None."""
+        assert extract_symbols("def broken(:\n", "python") is None
+
+    @pytest.mark.parametrize(
+        "language,source,expected",
+        [
+            (
+                "typescript",
+                "export class Widget {\n  render(el: Element): void {\n    const f = () => { if (x) {} };\n  }\n}\n"
+                "export const load = async (id) => {\n  return id;\n};\nexport type Id = string;\n",
+                [("class", "Widget"), ("method", "Widget.render"), ("function", "load"), ("type", "Id")],
+            ),
+            (
+                "go",
+                "type Server struct {\n\taddr string\n}\n\nfunc (s *Server) Start() error {\n\treturn nil\n}\n"
+                "func New() *Server {\n\treturn &Server{}\n}\n",
+                [("struct", "Server"), ("method", "Server.Start"), ("function", "New")],
+            ),
+            (
+                "rust",
+                "pub struct Config;\nimpl Display for Config {\n    fn fmt(&self) -> Result {\n        Ok(())\n    }\n}\n"
+                'pub fn main() {\n    let s = "{";\n}\n',
+                [("struct", "Config"), ("impl", "Config"), ("method", "Config.fmt"), ("function", "main")],
+            ),
+            (
+                "java",
+                "/* class Fake { */\npublic class UserService {\n    private int count = compute(1);\n"
+                "    @Override\n    public List<User> findAll(int limit) {\n        for (;;) { run(); }\n    }\n}\n",
+                [("class", "UserService"), ("method", "UserService.findAll")],
+            ),
+        ],
+    )
+    def test_brace_languages(self, language, source, expected):
+        """The brace scanner finds top-level and member definitions, ignoring nested code."""
+        symbols = extract_symbols(source, language)
+
+        assert symbols is not None
+        assert [(symbol.kind, symbol.name) for symbol in symbols] == expected
+
+    def test_rust_lifetimes_are_not_char_literals(self):
+        """Lifetimes are kept in signatures, while braces in char literals are still ignored."""
+        source = (
+            "pub fn run<'a>(s: &'a str) -> &'a str {\n    let open = '{';\n    s\n}\n"
+            "impl<'a> Parser<'a> {\n    fn next(&mut self) -> Option<&'a str> {\n        None\n    }\n}\n"
+        )
+        symbols = extract_symbols(source, "rust")
+
+        assert symbols is not None
+        assert [(symbol.kind, symbol.name, symbol.signature) for symbol in symbols] == [
+            ("function", "run", "pub fn run<'a>(s: &'a str) -> &'a str"),
+            ("impl", "Parser", "impl<'a> Parser<'a>"),
+            ("method", "Parser.next", "fn next(&mut self) -> Option<&'a str>"),
+        ]
+
+    def test_js_regex_literals_do_not_count_braces(self):
+        """Braces in regex literals don't hide later definitions, and division is not a regex."""
+        source = (
+            "const OPEN = /[{]/;\nfunction top() {\n  return /}/g.test(x) && total / 2 > 1;\n}\n"
+            "export const split = (s: string) => s.split(/\\{/);\nfunction last() {}\n"
+        )
+        symbols = extract_symbols(source, "typescript")
+
+        assert symbols is not None
+        assert [(symbol.kind, symbol.name) for symbol in symbols] == [
+            ("function", "top"),
+            ("function", "split"),
+            ("function", "last"),
+        ]
+        assert symbols[0].end_line == 4
+
+    def test_unsupported_language(self):
+        """Languages without an extractor return None."""
+        assert extract_symbols("anything", "cobol") is None
+        assert language_for("notes.txt") is None
+        assert language_for("src/App.TSX") == "typescript"
+
+
+def test_compare_symbols():
+    """Added, removed, re-signed and modified definitions are described."""
+    old_symbols = extract_symbols(OLD_PYTHON, "python")
+    new_symbols = extract_symbols(NEW_PYTHON, "python")
+    assert old_symbols is not None and new_symbols is not None
+
+    assert compare_symbols(old_symbols, new_symbols) == [
+        "changed signature of class Config: class Config → class Config(Base)",
+        "changed signature of method Config.load: def load(self, path) → def load(self, path, strict=False)",
+        "modified method Config.save",
+        "added function fetch",
+        "removed function legacy",
+    ]
+
+
+class TestSummarizeStructuralChanges:
+    """Tests for summarizing diff sections from their blobs."""
+
+    section = (
+        "diff --git a/src/config.py b/src/config.py\n"
+        "index 1111111..2222222 100644\n"
+        "--- a/src/config.py\n"
+        "+++ b/src/config.py\n"
+        "@@ -1,3 +1,3 @@\n"
+        "-old line\n"
+        "+new line\n"
+    )
+
+    def test_summary_from_blobs(self):
+        """The summary keeps the file header and lists the structural changes."""
+        blobs = {"1111111": OLD_PYTHON.encode(), "2222222": NEW_PYTHON.encode()}
+
+        summary = summarize_structural_changes(self.section, blobs)
+
+        assert summary is not None
+        assert summary.startswith("diff --git a/src/config.py b/src/config.py\nindex 1111111..2222222 100644\n")
+        assert "[Structural summary, 2 changed lines omitted for token limits:\n" in summary
+        assert "  added function fetch\n" in summary
+        assert "@@" not in summary
+
+    def test_new_file(self):
+        """New files compare against an empty old version."""
+        section = self.section.replace("1111111..2222222", "0000000..2222222")
+
+        summary = summarize_structural_changes(section, {"2222222": NEW_PYTHON.encode()})
+
+        assert summary is not None
+        assert "  added class Config\n" in summary
+
+    def test_missing_blob(self):
+        """Sections whose blobs could not be read are not summarized."""
+        assert summarize_structural_changes(self.section, {"2222222": NEW_PYTHON.encode()}) is None
+
+    def test_unsupported_file(self):
+        """Files without an extractor are not summarized."""
+        section = self.section.replace("config.py", "config.txt")
+
+        assert summarize_structural_changes(section, {"1111111": b"a", "2222222": b"b"}) is None
+
+
+class TestSkeletons:
+    """Tests for skeletons of new files."""
+
+    def test_python_skeleton(self):
+        """Skeletons list imports, nested signatures with line counts and docstring first lines."""
+        source = (
+            "import os\nfrom pathlib import Path\n\n\n"
+            'class Loader:\n    """Load things.\n\n    Details.\n    """\n\n'
+            "    def load(self, path: Path) -> str:\n        return path.read_text()\n"
+        )
+
+        assert skeletonize(source, "python") == (
+            "imports:\n"
+            "  import os\n"
+            "  from pathlib import Path\n"
+            "class Loader  [8 lines] Load things.\n"
+            "  def load(self, path: Path) -> str  [2 lines]"
+        )
+
+    def test_brace_language_docs_and_imports(self):
+        """Doc comments above definitions are used, skipping annotations."""
+        source = (
+            'import { readFile } from "fs";\nconst path = require("path");\n\n'
+            "/**\n * Reads the config.\n */\nexport function readConfig(file) {\n  return readFile(file);\n}\n"
+        )
+
+        assert extract_imports(source, "javascript") == [
+            'import { readFile } from "fs"',
+            'const path = require("path")',
+        ]
+        assert skeletonize(source, "javascript") == (
+            "imports:\n"
+            '  import { readFile } from "fs"\n'
+            '  const path = require("path")\n'
+            "export function readConfig(file)  [3 lines] Reads the config."
+        )
+
+    def test_go_import_block(self):
+        """Go import blocks are expanded into one import per entry."""
+        source = 'package main\n\nimport (\n\t"fmt"\n\tlog "example.com/log"\n)\n\nimport "os"\n'
+
+        assert extract_imports(source, "go") == ['import "fmt"', 'import log "example.com/log"', 'import "os"']
+
+    def test_skeletonize_section(self):
+        """The skeleton section keeps the file header and reports the blob's line count."""
+        section = (
+            "diff --git a/src/big.py b/src/big.py\nnew file mode 100644\nindex 0000000..2222222\n"
+            "--- /dev/null\n+++ b/src/big.py\n@@ -0,0 +1,2 @@\n+def run():\n+    pass\n"
+        )
+
+        skeleton = skeletonize_section(section, b"def run():\n    pass\n")
+
+        assert skeleton == (
+            "diff --git a/src/big.py b/src/big.py\nnew file mode 100644\nindex 0000000..2222222\n"
+            "--- /dev/null\n+++ b/src/big.py\n"
+            "[Skeleton of new file (2 lines), body omitted for token limits:\ndef run()  [2 lines]]\n"
+        )
@@ -36,7 +36,7 @@ class TestTokenUsageDisplay:
                 return "/mock/repo/path"
             if args == ["status"]:
                 return "On branch main"
-            if args == ["diff", "--staged"]:
+            if args[:2] == ["diff", "--staged"]:
                 return "diff --git a/file.py b/file.py\n+New line"
             if args == ["commit", "-m", mock_run_git_command.last_commit_message]:
                 return "mock commit"